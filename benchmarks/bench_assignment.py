@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Greedy vs optimal (max-weight assignment) matching on synthetic data.
+
+    PYTHONPATH=src python3 benchmarks/bench_assignment.py --sizes 5000x50000
+"""
+
+import argparse
+import time
+
+from synthetic import make_needs, make_organs
+
+from openapi_server.services.assignment_service import optimal_pairs
+from openapi_server.services.scoring_engine import ScoringEngine
+from openapi_server.services.waitlist_index import greedy_pairs
+
+
+def run(organs_count: int, needs_count: int):
+    organs = make_organs(organs_count)
+    needs = make_needs(needs_count)
+
+    start = time.perf_counter()
+    engine = ScoringEngine()
+    priorities = engine.need_priority(engine.encode_needs(needs))
+    greedy = greedy_pairs(organs, needs, priorities, engine.blood_bonus)
+    greedy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    optimal = optimal_pairs(organs, needs)
+    optimal_s = time.perf_counter() - start
+
+    greedy_score = sum(score for *_, score in greedy)
+    optimal_score = sum(score for *_, score in optimal)
+    print(
+        f"organs={organs_count:>6} needs={needs_count:>7}  "
+        f"greedy: {len(greedy):>6} matches, score={greedy_score:10.2f}, "
+        f"{greedy_s * 1000:8.1f} ms  |  "
+        f"optimal: {len(optimal):>6} matches, score={optimal_score:10.2f}, "
+        f"{optimal_s * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="500x600,5000x6000,5000x50000",
+                        help="comma-separated ORGANSxNEEDS pairs")
+    args = parser.parse_args()
+
+    for size in args.sizes.split(","):
+        organs_count, needs_count = (int(x) for x in size.split("x"))
+        run(organs_count, needs_count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Latency of concurrent offers_service reads while slow queries are running,
+with queries on the event loop (blocking) vs on the DB executor (run_db).
+
+Needs a reachable MySQL with the offers table (DB_HOST, DB_USER, ...):
+
+    PYTHONPATH=src python3 benchmarks/bench_async_db.py --concurrency 64
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from openapi_server.db import async_db
+from openapi_server.db.connection import db_cursor
+from openapi_server.services import offers_service
+
+
+async def _blocking_run_db(fn, *args, **kwargs):
+    # Pre-executor behaviour: the driver call runs on the event loop
+    return fn(*args, **kwargs)
+
+
+def _slow_query(seconds: float) -> None:
+    with db_cursor() as cur:
+        cur.execute("SELECT SLEEP(%s)", (seconds,))
+        cur.fetchall()
+
+
+def _offer_ids(limit: int):
+    with db_cursor() as cur:
+        cur.execute("SELECT id FROM offers ORDER BY id LIMIT %s", (limit,))
+        return [row[0] for row in cur.fetchall()] or [1]
+
+
+async def _reader(ids, requests: int, rate: float, latencies):
+    # Open loop: latency counts from when the request was due, so time spent
+    # waiting for a blocked event loop is included
+    start = time.perf_counter()
+    for i in range(requests):
+        due = start + i / rate
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        await offers_service.get_offer(ids[i % len(ids)])
+        latencies.append(time.perf_counter() - due)
+
+
+async def _slow_writer(run, seconds: float, stop: asyncio.Event):
+    while not stop.is_set():
+        await run(_slow_query, seconds)
+        await asyncio.sleep(0)
+
+
+async def run(
+    mode: str, concurrency: int, requests: int, rate: float, slow: int, slow_s: float
+):
+    run_db = async_db.run_db if mode == "executor" else _blocking_run_db
+    offers_service.run_db = run_db
+
+    ids = _offer_ids(1000)
+    latencies = []
+    stop = asyncio.Event()
+    slow_tasks = [
+        asyncio.create_task(_slow_writer(run_db, slow_s, stop)) for _ in range(slow)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(_reader(ids, requests, rate, latencies) for _ in range(concurrency))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*slow_tasks)
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{mode:>8}: {len(latencies):>6} reads in {elapsed:6.2f} s  "
+        f"p50={statistics.median(latencies) * 1000:8.1f} ms  "
+        f"p99={p99 * 1000:8.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20,
+                        help="reads per concurrent reader")
+    parser.add_argument("--rate", type=float, default=20,
+                        help="reads per second per reader")
+    parser.add_argument("--slow", type=int, default=2,
+                        help="concurrent slow queries kept running")
+    parser.add_argument("--slow-seconds", type=float, default=0.2)
+    args = parser.parse_args()
+
+    for mode in ("blocking", "executor"):
+        asyncio.run(
+            run(
+                mode,
+                args.concurrency,
+                args.requests,
+                args.rate,
+                args.slow,
+                args.slow_seconds,
+            )
+        )
+    async_db.shutdown_db_executor()
+
+
+if __name__ == "__main__":
+    main()
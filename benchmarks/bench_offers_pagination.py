@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+GET /offers page latency at increasing depth: OFFSET vs keyset (after=).
+
+Needs a MySQL with migration6 applied; point DB_NAME at a scratch database.
+The offers table is topped up to --rows with synthetic rows first
+(match_id 'bench-N'):
+
+    PYTHONPATH=src python3 benchmarks/bench_offers_pagination.py --rows 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+from openapi_server.db.bulk import insert_rows
+from openapi_server.db.connection import db_cursor
+from openapi_server.services.offers_service import _select_offers
+
+STATUSES = ["pending", "accepted", "declined"]
+
+
+def seed(rows: int, batch: int = 5000) -> int:
+    with db_cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM offers")
+        existing = cur.fetchone()[0]
+
+    for start in range(existing, rows, batch):
+        stop = min(start + batch, rows)
+        with db_cursor(commit=True) as cur:
+            insert_rows(
+                cur,
+                "offers",
+                ("match_id", "recipient_id", "status"),
+                [
+                    (f"bench-{i}", f"recipient-{i % 50000}", STATUSES[i % 3])
+                    for i in range(start, stop)
+                ],
+            )
+    return max(existing, rows)
+
+
+def _id_at(depth: int, status=None) -> int:
+    """Id of the row just before `depth`, i.e. the cursor of that page."""
+    where = "WHERE status = %s" if status else ""
+    params = [status] if status else []
+    with db_cursor() as cur:
+        cur.execute(
+            f"SELECT id FROM offers {where} ORDER BY id LIMIT 1 OFFSET %s",
+            (*params, depth - 1),
+        )
+        row = cur.fetchone()
+    return row[0] if row else 0
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def run(depths, page: int, repeat: int, status=None):
+    label = f"status={status}" if status else "unfiltered"
+    for depth in depths:
+        offset_s = _time(
+            lambda: _select_offers(page + 1, offset=depth, status=status), repeat
+        )
+        after_id = _id_at(depth, status) if depth else None
+        keyset_s = _time(
+            lambda: _select_offers(page + 1, after_id=after_id, status=status),
+            repeat,
+        )
+        print(
+            f"{label:>16} depth={depth:>8}  "
+            f"offset: {offset_s * 1000:8.2f} ms  keyset: {keyset_s * 1000:6.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--depths", default="0,10000,100000,500000,990000")
+    args = parser.parse_args()
+
+    total = seed(args.rows)
+    depths = [int(d) for d in args.depths.split(",") if int(d) < total]
+    print(f"offers rows: {total}, page size {args.page}")
+    run(depths, args.page, args.repeat)
+    run([d // 3 for d in depths], args.page, args.repeat, status="pending")
+
+
+if __name__ == "__main__":
+    main()
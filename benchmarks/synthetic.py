@@ -0,0 +1,43 @@
+"""
+Synthetic MS1 organs / MS2 needs for the benchmarks.
+
+Records use the same flat shape the clients return, so the matcher code runs
+on them unchanged.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+ORGAN_TYPES = ["kidney", "heart", "liver", "lung"]
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+
+
+def make_organs(count: int, seed: int = 1) -> List[Dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "id": f"organ-{i}",
+            "donor_id": f"donor-{i}",
+            "organ_type": rng.choice(ORGAN_TYPES),
+            "blood_type": rng.choice(BLOOD_TYPES),
+        }
+        for i in range(count)
+    ]
+
+
+def make_needs(count: int, seed: int = 2) -> List[Dict]:
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    return [
+        {
+            "id": f"need-{i}",
+            "recipient_id": f"recipient-{i}",
+            "organ_type": rng.choice(ORGAN_TYPES),
+            "blood_type": rng.choice(BLOOD_TYPES),
+            "urgency": rng.randint(1, 5),
+            "status": "waiting",
+            "created_at": (now - timedelta(days=rng.randint(0, 2000))).isoformat(),
+        }
+        for i in range(count)
+    ]
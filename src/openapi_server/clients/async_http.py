@@ -0,0 +1,142 @@
+"""
+Shared httpx.AsyncClient for the async MS1/MS2 clients.
+
+One client (one connection pool) per process, a per-host concurrency limit,
+connect/read timeouts, and retry with backoff on idempotent verbs, mirroring
+clients/http_session.py for the event loop. Requests and the connections
+opened for them are counted per host (GET /internal/http-pools).
+"""
+
+import os
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from openapi_server.clients.http_session import (
+    HTTP_BACKOFF_FACTOR,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_READ_TIMEOUT,
+    IDEMPOTENT_METHODS,
+    RETRY_STATUS,
+)
+
+ASYNC_HTTP_MAX_CONNECTIONS = int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", 200))
+ASYNC_HTTP_PER_HOST_LIMIT = int(os.getenv("ASYNC_HTTP_PER_HOST_LIMIT", 100))
+
+_client: Optional[httpx.AsyncClient] = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+_host_stats: Dict[str, Dict[str, int]] = {}
+_host_traces: Dict[str, Callable[[str, Dict[str, Any]], Awaitable[None]]] = {}
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Process-wide AsyncClient, created on first use inside the event loop."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_HTTP_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_async_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _host_limits.clear()
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _host_limit(key: str) -> asyncio.Semaphore:
+    limit = _host_limits.get(key)
+    if limit is None:
+        limit = _host_limits[key] = asyncio.Semaphore(ASYNC_HTTP_PER_HOST_LIMIT)
+    return limit
+
+
+def _host_trace(key: str) -> Callable[[str, Dict[str, Any]], Awaitable[None]]:
+    """httpcore trace hook counting the connections opened for `key`."""
+    trace = _host_traces.get(key)
+    if trace is None:
+        stats = _host_stats.setdefault(key, {"connections_opened": 0, "requests": 0})
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            if event == "connection.connect_tcp.complete":
+                stats["connections_opened"] += 1
+
+        _host_traces[key] = trace
+    return trace
+
+
+def connection_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Per-host counters of the shared client. `reused` is requests served on
+    an already open keep-alive connection, i.e. handshakes saved.
+    """
+    return {
+        key: {
+            **stats,
+            "reused": max(stats["requests"] - stats["connections_opened"], 0),
+        }
+        for key, stats in _host_stats.items()
+    }
+
+
+class AsyncPooledHTTPClient:
+    """Base for the async MS1/MS2 clients: JSON helpers on the shared client."""
+
+    def __init__(self, base_url: str, client: Optional[httpx.AsyncClient] = None):
+        self.base_url = base_url.rstrip("/")
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_async_client()
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        url = f"{self.base_url}{path}"
+        key = _host_key(url)
+        trace = _host_trace(key)
+        retries = HTTP_MAX_RETRIES if method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+
+        while True:
+            try:
+                async with _host_limit(key):
+                    _host_stats[key]["requests"] += 1
+                    r = await self.client.request(
+                        method, url, extensions={"trace": trace}, **kwargs
+                    )
+                if r.status_code not in RETRY_STATUS or attempt >= retries:
+                    r.raise_for_status()
+                    return r
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+            attempt += 1
+            await asyncio.sleep(HTTP_BACKOFF_FACTOR * 2 ** (attempt - 1))
+
+    async def _get(self, path):
+        return (await self._request("GET", path)).json()
+
+    async def _post(self, path, payload):
+        return (await self._request("POST", path, json=payload)).json()
+
+    async def _put(self, path, payload):
+        return (await self._request("PUT", path, json=payload)).json()
+
+    async def _delete(self, path):
+        await self._request("DELETE", path)
+        return True
@@ -0,0 +1,138 @@
+import asyncio
+from typing import Dict, List
+
+from openapi_server.clients.async_http import AsyncPooledHTTPClient
+from openapi_server.clients.ms1_client import (
+    DONOR_FETCH_WORKERS,
+    donor_blood_types,
+    flatten_items,
+)
+
+
+class AsyncMS1Client(AsyncPooledHTTPClient):
+    """
+    Event-loop version of MS1Client. Shares the donor blood-type cache with
+    the sync client.
+    """
+
+    donor_cache = donor_blood_types
+
+    # ---------------------------------------------------------
+    # Donors
+    # ---------------------------------------------------------
+    async def list_donors(self):
+        """Return donors as a flat list of dicts."""
+        donors = flatten_items(await self._get("/donors"))
+        self.prime_donor_cache(donors)
+        return donors
+
+    async def get_donor(self, donor_id):
+        """Return a single donor's FLAT data."""
+        donor = await self._get(f"/donors/{donor_id}")
+        self.prime_donor_cache([donor])
+        return donor
+
+    # ---------------------------------------------------------
+    # Donor blood-type enrichment (cached, one fetch per donor)
+    # ---------------------------------------------------------
+    def prime_donor_cache(self, donors: List[Dict]):
+        for donor in donors:
+            if isinstance(donor, dict) and donor.get("blood_type"):
+                self.donor_cache.set(str(donor["id"]), donor["blood_type"])
+
+    def invalidate_donor(self, donor_id=None):
+        """Forget one donor's cached blood type, or all of them."""
+        if donor_id is None:
+            self.donor_cache.clear()
+        else:
+            self.donor_cache.invalidate(str(donor_id))
+
+    async def _donor_blood_types(self, donor_ids) -> Dict[str, str]:
+        found: Dict[str, str] = {}
+        missing = []
+        for donor_id in dict.fromkeys(str(d) for d in donor_ids):
+            blood_type = self.donor_cache.get(donor_id)
+            if blood_type is None:
+                missing.append(donor_id)
+            else:
+                found[donor_id] = blood_type
+
+        if missing:
+            limit = asyncio.Semaphore(DONOR_FETCH_WORKERS)
+
+            async def fetch(donor_id):
+                async with limit:
+                    return await self._get(f"/donors/{donor_id}")
+
+            donors = await asyncio.gather(*(fetch(d) for d in missing))
+            for donor_id, donor in zip(missing, donors):
+                found[donor_id] = donor["blood_type"]
+                self.donor_cache.set(donor_id, donor["blood_type"])
+
+        return found
+
+    async def attach_blood_types(self, organs: List[Dict]) -> List[Dict]:
+        blood_types = await self._donor_blood_types(o["donor_id"] for o in organs)
+        for organ in organs:
+            organ["blood_type"] = blood_types[str(organ["donor_id"])]
+        return organs
+
+    # ---------------------------------------------------------
+    # Organs
+    # ---------------------------------------------------------
+    async def list_organs(self, enrich: bool = True):
+        """
+        Return organs as FLAT objects AND attach donor blood type
+        so the matcher has a complete organ record.
+        enrich=False skips the blood types (caller enriches later).
+        """
+        organs = flatten_items(await self._get("/organs"))
+        if not enrich:
+            return organs
+        return await self.attach_blood_types(organs)
+
+    async def get_organ(self, organ_id):
+        organ = await self._get(f"/organs/{organ_id}")
+        if "data" in organ:
+            organ = organ["data"]
+        await self.attach_blood_types([organ])
+        return organ
+
+    async def create_organ(self, donor_id, payload):
+        return await self._post(f"/donors/{donor_id}/organs", payload)
+
+    async def update_organ(self, organ_id, payload):
+        return await self._put(f"/organs/{organ_id}", payload)
+
+    async def delete_organ(self, organ_id):
+        return await self._delete(f"/organs/{organ_id}")
+
+    async def list_organs_for_donor(self, donor_id):
+        raw = await self._get(f"/donors/{donor_id}/organs")
+        return await self.attach_blood_types(flatten_items(raw))
+
+    # ---------------------------------------------------------
+    # Consents
+    # ---------------------------------------------------------
+    async def list_consents(self):
+        return flatten_items(await self._get("/consents"))
+
+    async def get_consent(self, consent_id):
+        c = await self._get(f"/consents/{consent_id}")
+        return c["data"] if "data" in c else c
+
+    async def create_consent(self, donor_id, payload):
+        return await self._post(f"/donors/{donor_id}/consents", payload)
+
+    async def update_consent(self, consent_id, payload):
+        return await self._put(f"/consents/{consent_id}", payload)
+
+    async def delete_consent(self, consent_id):
+        return await self._delete(f"/consents/{consent_id}")
+
+    # ---------------------------------------------------------
+    # Snapshot
+    # ---------------------------------------------------------
+    async def snapshot_inventory(self):
+        """Return MS1's full inventory snapshot as served (no flattening)."""
+        return await self._get("/snapshot/inventory")
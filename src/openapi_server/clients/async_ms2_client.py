@@ -0,0 +1,68 @@
+from openapi_server.clients.async_http import AsyncPooledHTTPClient
+
+
+class AsyncMS2Client(AsyncPooledHTTPClient):
+    """Event-loop version of MS2Client."""
+
+    # -----------------------------
+    # Recipients
+    # -----------------------------
+
+    async def list_recipients(self):
+        return await self._get("/recipients")
+
+    async def get_recipient(self, recipient_id):
+        return await self._get(f"/recipients/{recipient_id}")
+
+    async def create_recipient(self, payload):
+        return await self._post("/recipients", payload)
+
+    async def update_recipient(self, recipient_id, payload):
+        return await self._put(f"/recipients/{recipient_id}", payload)
+
+    async def delete_recipient(self, recipient_id):
+        return await self._delete(f"/recipients/{recipient_id}")
+
+    # -----------------------------
+    # Needs (organ needs)
+    # -----------------------------
+
+    async def list_needs(self):
+        return await self._get("/needs")
+
+    async def get_need(self, need_id):
+        return await self._get(f"/needs/{need_id}")
+
+    async def create_need(self, payload):
+        return await self._post("/needs", payload)
+
+    async def update_need(self, need_id, payload):
+        return await self._put(f"/needs/{need_id}", payload)
+
+    async def delete_need(self, need_id):
+        return await self._delete(f"/needs/{need_id}")
+
+    async def list_needs_for_recipient(self, recipient_id):
+        return await self._get(f"/recipients/{recipient_id}/needs")
+
+    async def create_need_for_recipient(self, recipient_id, payload):
+        return await self._post(f"/recipients/{recipient_id}/needs", payload)
+
+    # -----------------------------
+    # Hospitals
+    # -----------------------------
+
+    async def list_hospitals(self):
+        return await self._get("/hospitals")
+
+    async def get_hospital(self, hospital_id):
+        return await self._get(f"/hospitals/{hospital_id}")
+
+    async def create_hospital(self, payload):
+        return await self._post("/hospitals", payload)
+
+    async def update_hospital(self, hospital_id, payload):
+        return await self._put(f"/hospitals/{hospital_id}", payload)
+
+    async def delete_hospital(self, hospital_id):
+        return await self._delete(f"/hospitals/{hospital_id}")
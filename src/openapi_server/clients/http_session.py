@@ -0,0 +1,98 @@
+"""
+Shared, pooled HTTP sessions for the MS1/MS2 clients.
+
+One keep-alive requests.Session per upstream host, with a bounded connection
+pool, connect/read timeouts and retry with backoff on idempotent verbs.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 32))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", 30))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", 3))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", 0.3))
+
+# POST is not retried: the composite service may have applied it already
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+def build_session(
+    pool_size: int = HTTP_POOL_SIZE,
+    max_retries: int = HTTP_MAX_RETRIES,
+    backoff_factor: float = HTTP_BACKOFF_FACTOR,
+) -> requests.Session:
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(base_url: str) -> requests.Session:
+    """Process-wide session for the host of base_url (shared by all clients)."""
+    parts = urlsplit(base_url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = _sessions[key] = build_session()
+        return session
+
+
+class PooledHTTPClient:
+    """Base for the MS1/MS2 clients: JSON helpers on the shared session."""
+
+    def __init__(
+        self,
+        base_url: str,
+        session: Optional[requests.Session] = None,
+        timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or get_session(self.base_url)
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, **kwargs) -> requests.Response:
+        r = self.session.request(
+            method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs
+        )
+        r.raise_for_status()
+        return r
+
+    def _get(self, path):
+        return self._request("GET", path).json()
+
+    def _post(self, path, payload):
+        return self._request("POST", path, json=payload).json()
+
+    def _put(self, path, payload):
+        return self._request("PUT", path, json=payload).json()
+
+    def _delete(self, path):
+        self._request("DELETE", path)
+        return True
@@ -1,50 +1,96 @@
-import requests
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
+from openapi_server.clients.http_session import PooledHTTPClient
+from openapi_server.utils.ttl_cache import TTLCache
 
-class MS1Client:
-    def __init__(self, base_url: str):
-        self.base = base_url.rstrip("/")
+DONOR_CACHE_SIZE = int(os.getenv("DONOR_CACHE_SIZE", 50000))
+DONOR_CACHE_TTL = float(os.getenv("DONOR_CACHE_TTL", 3600))
+DONOR_FETCH_WORKERS = int(os.getenv("DONOR_FETCH_WORKERS", 16))
+
+# donor_id -> blood_type. A donor's blood type never changes, so this is shared
+# by every MS1Client in the process.
+donor_blood_types = TTLCache(maxsize=DONOR_CACHE_SIZE, ttl=DONOR_CACHE_TTL)
+
+
+def flatten_items(wrapper) -> List[Dict]:
+    """HAL-style {"items": [{"data": {...}}, ...]} -> [{...}, ...]"""
+    if not isinstance(wrapper, dict):
+        return []
+    if "items" not in wrapper:
+        return []
+    return [item["data"] for item in wrapper["items"]]
 
-    # ---------------------------------------------------------
-    # Internal request helpers
-    # ---------------------------------------------------------
-    def _get(self, path):
-        r = requests.get(f"{self.base}{path}")
-        r.raise_for_status()
-        return r.json()
-
-    def _post(self, path, payload):
-        r = requests.post(f"{self.base}{path}", json=payload)
-        r.raise_for_status()
-        return r.json()
-
-    def _put(self, path, payload):
-        r = requests.put(f"{self.base}{path}", json=payload)
-        r.raise_for_status()
-        return r.json()
-
-    def _delete(self, path):
-        r = requests.delete(f"{self.base}{path}")
-        r.raise_for_status()
-        return True
+
+class MS1Client(PooledHTTPClient):
+    # _get/_post/_put/_delete come from PooledHTTPClient (shared keep-alive
+    # session with timeouts and retries)
+
+    donor_cache = donor_blood_types
 
     def _flat(self, wrapper):
-        if not isinstance(wrapper, dict):
-            return []
-        if "items" not in wrapper:
-            return []
-        return [item["data"] for item in wrapper["items"]]
+        return flatten_items(wrapper)
 
     # ---------------------------------------------------------
     # Donors
     # ---------------------------------------------------------
     def list_donors(self):
         """Return donors as a flat list of dicts."""
-        return self._flat(self._get("/donors"))
+        donors = self._flat(self._get("/donors"))
+        self.prime_donor_cache(donors)
+        return donors
 
     def get_donor(self, donor_id):
         """Return a single donor's FLAT data."""
-        return self._get(f"/donors/{donor_id}")
+        donor = self._get(f"/donors/{donor_id}")
+        self.prime_donor_cache([donor])
+        return donor
+
+    # ---------------------------------------------------------
+    # Donor blood-type enrichment (cached, one fetch per donor)
+    # ---------------------------------------------------------
+    def prime_donor_cache(self, donors: List[Dict]):
+        for donor in donors:
+            if isinstance(donor, dict) and donor.get("blood_type"):
+                self.donor_cache.set(str(donor["id"]), donor["blood_type"])
+
+    def invalidate_donor(self, donor_id=None):
+        """Forget one donor's cached blood type, or all of them."""
+        if donor_id is None:
+            self.donor_cache.clear()
+        else:
+            self.donor_cache.invalidate(str(donor_id))
+
+    def _donor_blood_types(self, donor_ids) -> Dict[str, str]:
+        """
+        donor_id -> blood_type for every distinct donor, hitting the cache
+        first and fetching the misses concurrently.
+        """
+        found: Dict[str, str] = {}
+        missing = []
+        for donor_id in dict.fromkeys(str(d) for d in donor_ids):
+            blood_type = self.donor_cache.get(donor_id)
+            if blood_type is None:
+                missing.append(donor_id)
+            else:
+                found[donor_id] = blood_type
+
+        if missing:
+            workers = max(1, min(DONOR_FETCH_WORKERS, len(missing)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                donors = pool.map(lambda d: self._get(f"/donors/{d}"), missing)
+                for donor_id, donor in zip(missing, donors):
+                    found[donor_id] = donor["blood_type"]
+                    self.donor_cache.set(donor_id, donor["blood_type"])
+
+        return found
+
+    def _attach_blood_types(self, organs: List[Dict]) -> List[Dict]:
+        blood_types = self._donor_blood_types(o["donor_id"] for o in organs)
+        for organ in organs:
+            organ["blood_type"] = blood_types[str(organ["donor_id"])]
+        return organs
 
     # ---------------------------------------------------------
     # Organs
@@ -55,13 +101,7 @@ class MS1Client:
         so the matcher has a complete organ record.
         """
         raw = self._get("/organs")
-        organs = self._flat(raw)
-
-        for organ in organs:
-            donor = self.get_donor(organ["donor_id"])
-            organ["blood_type"] = donor["blood_type"]
-
-        return organs
+        return self._attach_blood_types(self._flat(raw))
 
     def get_organ(self, organ_id):
         organ = self._get(f"/organs/{organ_id}")
@@ -69,8 +109,7 @@ class MS1Client:
         if "data" in organ:
             organ = organ["data"]
         # attach donor blood type
-        donor = self.get_donor(organ["donor_id"])
-        organ["blood_type"] = donor["blood_type"]
+        self._attach_blood_types([organ])
         return organ
 
     def create_organ(self, donor_id, payload):
@@ -84,11 +123,7 @@ class MS1Client:
 
     def list_organs_for_donor(self, donor_id):
         raw = self._get(f"/donors/{donor_id}/organs")
-        organs = self._flat(raw)
-        for organ in organs:
-            donor = self.get_donor(organ["donor_id"])
-            organ["blood_type"] = donor["blood_type"]
-        return organs
+        return self._attach_blood_types(self._flat(raw))
 
     # ---------------------------------------------------------
     # Consents
@@ -1,29 +1,10 @@
 # ms2_client.py
-import requests
-
-class MS2Client:
-    def __init__(self, base_url: str):
-        self.base_url = base_url.rstrip("/")
-
-    def _get(self, path):
-        r = requests.get(f"{self.base_url}{path}")
-        r.raise_for_status()
-        return r.json()
-
-    def _post(self, path, payload):
-        r = requests.post(f"{self.base_url}{path}", json=payload)
-        r.raise_for_status()
-        return r.json()
-
-    def _put(self, path, payload):
-        r = requests.put(f"{self.base_url}{path}", json=payload)
-        r.raise_for_status()
-        return r.json()
-
-    def _delete(self, path):
-        r = requests.delete(f"{self.base_url}{path}")
-        r.raise_for_status()
-        return True
+from openapi_server.clients.http_session import PooledHTTPClient
+
+
+class MS2Client(PooledHTTPClient):
+    # _get/_post/_put/_delete come from PooledHTTPClient (shared keep-alive
+    # session with timeouts and retries)
 
     # -----------------------------
     # Recipients
@@ -1,16 +1,79 @@
-from google.cloud import pubsub_v1
+import os
 import json
+import threading
+import uuid
+from concurrent.futures import Future
+from typing import Dict, List, Optional
 
-publisher = pubsub_v1.PublisherClient()
+from google.cloud import pubsub_v1
 
 PROJECT_ID = "matchmaking-services"
 TOPIC = "matchmaking-events"
 
-topic_path = publisher.topic_path(PROJECT_ID, TOPIC)
+# Client-side batching: messages are grouped until one of these limits is hit
+BATCH_SETTINGS = pubsub_v1.types.BatchSettings(
+    max_messages=int(os.getenv("PUBSUB_MAX_MESSAGES", 100)),
+    max_bytes=int(os.getenv("PUBSUB_MAX_BYTES", 1024 * 1024)),
+    max_latency=float(os.getenv("PUBSUB_MAX_LATENCY", 0.05)),
+)
+
+topic_path = pubsub_v1.PublisherClient.topic_path(PROJECT_ID, TOPIC)
+
+
+class LocalPublisher:
+    """
+    In-process stand-in for PublisherClient (tests, benchmarks, local runs).
+    Keeps published messages in memory and resolves futures immediately.
+    """
+
+    def __init__(self):
+        self.messages: List[Dict] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def topic_path(project: str, topic: str) -> str:
+        return pubsub_v1.PublisherClient.topic_path(project, topic)
+
+    def publish(self, topic: str, data: bytes, **attrs) -> Future:
+        message_id = uuid.uuid4().hex
+        with self._lock:
+            self.messages.append(
+                {"id": message_id, "topic": topic, "data": data, "attributes": attrs}
+            )
+        future = Future()
+        future.set_result(message_id)
+        return future
+
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher():
+    """
+    Process-wide publisher, created on first use.
+    PUBSUB_PUBLISHER=local selects the in-process LocalPublisher.
+    """
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                if os.getenv("PUBSUB_PUBLISHER", "pubsub") == "local":
+                    _publisher = LocalPublisher()
+                else:
+                    _publisher = pubsub_v1.PublisherClient(
+                        batch_settings=BATCH_SETTINGS
+                    )
+    return _publisher
+
+
+def set_publisher(publisher) -> None:
+    """Swap the process-wide publisher (e.g. a LocalPublisher in tests)."""
+    global _publisher
+    _publisher = publisher
 
-def publish_event(payload: dict):
-    data = json.dumps(payload).encode("utf-8")
-    future = publisher.publish(topic_path, data)
-    print("Published event ID:", future.result())
-    print("MATCH EVENT RECEIVED:", payload)
 
+def publish_event(payload: dict, topic: Optional[str] = None) -> Future:
+    """Queue one event on the batching publisher; does not wait for the ack."""
+    data = json.dumps(payload, default=str).encode("utf-8")
+    return get_publisher().publish(topic or topic_path, data)
@@ -0,0 +1,49 @@
+"""
+Async access to the blocking mysql.connector driver.
+
+Queries run on a bounded thread pool sized to the connection pool, so the
+event loop never blocks on the database and run_db callers alone never ask
+for more connections than the pool holds; beyond DB_EXECUTOR_WORKERS they
+wait in the executor queue. The connection pool is still shared with the
+sync routes (FastAPI's threadpool) and the background workers, so this is
+not a per-process cap on queries in flight: when those hold connections,
+executor threads wait in get_connection (up to DB_POOL_TIMEOUT) as well.
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from openapi_server.db.connection import DB_POOL_SIZE
+
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", DB_POOL_SIZE))
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db"
+        )
+    return _executor
+
+
+async def run_db(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking DB function on the DB executor and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_db_executor(), functools.partial(fn, *args, **kwargs)
+    )
+
+
+def shutdown_db_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,42 @@
+"""
+Helpers for multi-row statements.
+"""
+
+import os
+from typing import Iterator, Sequence, Tuple
+
+# Rows per statement (keeps statements well under max_allowed_packet)
+CHUNK_SIZE = 500
+# Items accepted by one POST /<collection>:batch request
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 5000))
+
+
+def chunks(items: Sequence, size: int = CHUNK_SIZE) -> Iterator[Sequence]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def placeholders(count: int) -> str:
+    """'%s, %s, %s' for an IN (...) list."""
+    return ", ".join(["%s"] * count)
+
+
+def insert_rows(
+    cur,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[Tuple],
+    suffix: str = "",
+):
+    """
+    INSERT rows with one multi-row statement per chunk. `suffix` is appended
+    to every statement (e.g. an ON DUPLICATE KEY UPDATE clause).
+    """
+    row_sql = "(" + placeholders(len(columns)) + ")"
+    for chunk in chunks(rows):
+        sql = (
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+            + ", ".join([row_sql] * len(chunk))
+            + (f" {suffix}" if suffix else "")
+        )
+        cur.execute(sql, [value for row in chunk for value in row])
@@ -1,18 +1,135 @@
+"""
+Process-wide MySQL connection pool.
+
+Connections are borrowed from one mysql.connector pool, pinged on checkout
+(reconnecting if the server dropped them) and reset when returned, so the
+session state of one request never leaks into the next.
+"""
+
 import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
 import mysql.connector
+from mysql.connector import errors, pooling
+
+DB_POOL_NAME = os.getenv("DB_POOL_NAME", "matcher")
+# mysql.connector caps a pool at 32 connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+# How long a caller waits for a free connection before giving up
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+# Streaming exports: how long the server waits on a slow reader
+DB_STREAM_WRITE_TIMEOUT = int(os.getenv("DB_STREAM_WRITE_TIMEOUT", 600))
+
+_pool: Optional[pooling.MySQLConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def _db_settings() -> dict:
+    return {
+        "host": os.getenv("DB_HOST"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "database": os.getenv("DB_NAME"),
+        "port": int(os.getenv("DB_PORT", 3306)),
+    }
+
+
+def get_pool() -> pooling.MySQLConnectionPool:
+    """Create the pool on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                settings = _db_settings()
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=DB_POOL_NAME,
+                    pool_size=DB_POOL_SIZE,
+                    pool_reset_session=True,
+                    **settings,
+                )
+                print(
+                    f"DB POOL READY: {settings['user']}@{settings['host']}:"
+                    f"{settings['port']}/{settings['database']} "
+                    f"size={DB_POOL_SIZE}"
+                )
+    return _pool
+
 
 def get_connection():
-    print("DEBUG DB SETTINGS:", {
-        "DB_HOST": os.getenv("DB_HOST"),
-        "DB_USER": os.getenv("DB_USER"),
-        "DB_NAME": os.getenv("DB_NAME"),
-        "DB_PORT": os.getenv("DB_PORT"),
-    })
-
-    return mysql.connector.connect(
-        host=os.getenv("DB_HOST"),
-        user=os.getenv("DB_USER"),
-        password=os.getenv("DB_PASSWORD"),
-        database=os.getenv("DB_NAME"),
-        port=int(os.getenv("DB_PORT", 3306)),
-    )
+    """
+    Borrow a pooled connection. close() hands it back to the pool.
+    Waits up to DB_POOL_TIMEOUT seconds when every connection is in use.
+    """
+    pool = get_pool()
+    deadline = time.monotonic() + DB_POOL_TIMEOUT
+
+    while True:
+        try:
+            conn = pool.get_connection()
+            break
+        except errors.PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
+    try:
+        # Health check: revive connections the server closed while idle
+        conn.ping(reconnect=True, attempts=2, delay=0)
+    except mysql.connector.Error:
+        conn.close()
+        raise
+    return conn
+
+
+@contextmanager
+def db_connection() -> Iterator:
+    """Pooled connection for a block; rolled back on error, always returned."""
+    conn = get_connection()
+    try:
+        yield conn
+    except Exception:
+        try:
+            conn.rollback()
+        except mysql.connector.Error:
+            # Dead connection: report what failed in the block, not this
+            pass
+        raise
+    finally:
+        conn.close()
+
+
+@contextmanager
+def db_cursor(dictionary: bool = False, commit: bool = False) -> Iterator:
+    """
+    Cursor on a pooled connection. With commit=True the transaction is
+    committed when the block exits cleanly.
+    """
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=dictionary)
+        try:
+            yield cur
+            if commit:
+                conn.commit()
+        finally:
+            cur.close()
+
+
+@contextmanager
+def streaming_cursor(dictionary: bool = False) -> Iterator:
+    """
+    Unbuffered cursor on a dedicated connection, outside the pool, for
+    long exports: rows are read from the server as they are fetched, so
+    memory stays flat and no pool slot is held for the duration.
+    """
+    conn = mysql.connector.connect(**_db_settings())
+    try:
+        cur = conn.cursor(dictionary=dictionary, buffered=False)
+        cur.execute(f"SET SESSION net_write_timeout = {DB_STREAM_WRITE_TIMEOUT}")
+        yield cur
+    finally:
+        # Closing the connection (not the cursor) abandons unread rows
+        # instead of draining them
+        conn.close()
@@ -0,0 +1,36 @@
+"""
+Parameterized WHERE clauses for list, page and export queries.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Filter keys that map to a created_at range rather than an equality
+RANGE_FILTERS = {
+    "created_from": "created_at >= %s",
+    "created_to": "created_at < %s",
+}
+
+
+def where_clause(
+    filters: Optional[Dict[str, Any]] = None,
+    extra: Sequence[Tuple[str, Sequence[Any]]] = (),
+) -> Tuple[str, List[Any]]:
+    """
+    ("WHERE ...", params) for the non-None filters, ANDed together.
+    Keys are trusted column names (equality) or created_from / created_to
+    (half-open created_at range); `extra` adds (sql, params) conditions
+    such as a keyset seek. Returns ("", []) when nothing applies.
+    """
+    conditions, params = [], []
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        conditions.append(RANGE_FILTERS.get(key, f"{key} = %s"))
+        params.append(value)
+    for sql, values in extra:
+        conditions.append(f"({sql})")
+        params.extend(values)
+
+    if not conditions:
+        return "", []
+    return "WHERE " + " AND ".join(conditions), params
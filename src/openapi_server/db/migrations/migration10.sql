@@ -0,0 +1,39 @@
+-- ============================================================
+-- Migration 10: Indexes for filtered GET /matches
+-- ============================================================
+
+-- ?status= and ?organ_type= seek on the filter and read pages in
+-- (created_at, id) order. ?donor_id= and ?recipient_id= use
+-- idx_matches_donor / idx_matches_recipient from migration 1.
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'matches'
+      AND index_name = 'idx_matches_status_created'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_matches_status_created ON matches (status, created_at, id);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'matches'
+      AND index_name = 'idx_matches_organ_created'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_matches_organ_created ON matches (organ_type, created_at, id);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
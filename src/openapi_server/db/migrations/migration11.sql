@@ -0,0 +1,92 @@
+-- ============================================================
+-- Migration 11: Leases for the async task worker pool
+-- ============================================================
+
+-- Workers claim 'queued' rows with FOR UPDATE SKIP LOCKED and hold them
+-- as 'running' under a lease (owner + expiry) that heartbeats extend.
+-- Rows whose lease expired, including 'running' rows from before this
+-- migration (no lease at all), are requeued.
+
+SET @col_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'async_tasks'
+      AND column_name = 'attempts'
+);
+
+SET @sql := IF(@col_exists = 0,
+               'ALTER TABLE async_tasks ADD COLUMN attempts INT NOT NULL DEFAULT 0;',
+               'SELECT "Column already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @col_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'async_tasks'
+      AND column_name = 'lease_owner'
+);
+
+SET @sql := IF(@col_exists = 0,
+               'ALTER TABLE async_tasks ADD COLUMN lease_owner VARCHAR(64) NULL;',
+               'SELECT "Column already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @col_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'async_tasks'
+      AND column_name = 'lease_expires_at'
+);
+
+SET @sql := IF(@col_exists = 0,
+               'ALTER TABLE async_tasks ADD COLUMN lease_expires_at TIMESTAMP NULL;',
+               'SELECT "Column already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @col_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'async_tasks'
+      AND column_name = 'last_error'
+);
+
+SET @sql := IF(@col_exists = 0,
+               'ALTER TABLE async_tasks ADD COLUMN last_error VARCHAR(512) NULL;',
+               'SELECT "Column already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+ALTER TABLE async_tasks ALTER COLUMN status SET DEFAULT 'queued';
+
+-- Claims scan status = 'queued'; requeues scan expired 'running' leases
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'async_tasks'
+      AND index_name = 'idx_async_tasks_status_lease'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_async_tasks_status_lease ON async_tasks (status, lease_expires_at);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
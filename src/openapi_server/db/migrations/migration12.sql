@@ -0,0 +1,31 @@
+-- ============================================================
+-- Migration 12: jobs table for JOB_STORE_BACKEND=db
+-- ============================================================
+
+-- Every job carries expires_at (pending ones JOB_PENDING_TTL_SECONDS
+-- after creation) and is purged in expiry order
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(64) NOT NULL PRIMARY KEY,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    result JSON NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP NULL,
+    expires_at TIMESTAMP NULL
+);
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'jobs'
+      AND index_name = 'idx_jobs_expires'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_jobs_expires ON jobs (expires_at);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,43 @@
+-- ============================================================
+-- Migration 13: Retention of finished async tasks and outbox rows
+-- ============================================================
+
+-- The retention job deletes finished rows older than a cutoff in small
+-- chunks; these indexes make each chunk a short range read
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'async_tasks'
+      AND index_name = 'idx_async_tasks_status_updated'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_async_tasks_status_updated ON async_tasks (status, updated_at);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'event_outbox'
+      AND index_name = 'idx_event_outbox_status_published'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_event_outbox_status_published ON event_outbox (status, published_at);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+-- Finished tasks are moved here instead of deleted when
+-- RETENTION_ARCHIVE_TASKS=true
+
+CREATE TABLE IF NOT EXISTS async_tasks_archive LIKE async_tasks;
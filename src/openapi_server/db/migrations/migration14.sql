@@ -0,0 +1,24 @@
+-- ============================================================
+-- Migration 14: Offer expiry deadlines
+-- ============================================================
+
+-- Optional per-offer deadline. NULL means created_at + OFFER_TTL_SECONDS.
+-- The expiry scheduler loads pending offers through idx_offers_status_id
+-- (migration 6) and keeps the deadlines in memory, so no index on
+-- expires_at is needed.
+
+SET @col_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'offers'
+      AND column_name = 'expires_at'
+);
+
+SET @sql := IF(@col_exists = 0,
+               'ALTER TABLE offers ADD COLUMN expires_at TIMESTAMP NULL;',
+               'SELECT "Column already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,32 @@
+-- ============================================================
+-- Migration 4: Transactional outbox for Pub/Sub events
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS event_outbox (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    topic VARCHAR(255) NOT NULL,
+    payload JSON NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    last_error VARCHAR(512) NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    published_at TIMESTAMP NULL
+);
+
+-- The publisher scans pending rows in id order
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'event_outbox'
+      AND index_name = 'idx_event_outbox_status'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_event_outbox_status ON event_outbox (status, id);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
@@ -0,0 +1,21 @@
+-- ============================================================
+-- Migration 5: Keyset pagination index for GET /matches
+-- ============================================================
+
+-- Pages are read newest first on (created_at, id)
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'matches'
+      AND index_name = 'idx_matches_created_id'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_matches_created_id ON matches (created_at, id);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
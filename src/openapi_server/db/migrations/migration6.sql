@@ -0,0 +1,37 @@
+-- ============================================================
+-- Migration 6: Indexes for keyset-paginated, filtered GET /offers
+-- ============================================================
+
+-- ?status= and ?recipientId= seek on the filter and read pages in id order
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'offers'
+      AND index_name = 'idx_offers_status_id'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_offers_status_id ON offers (status, id);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'offers'
+      AND index_name = 'idx_offers_recipient_id'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_offers_recipient_id ON offers (recipient_id, id);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
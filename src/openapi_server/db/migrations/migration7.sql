@@ -0,0 +1,13 @@
+-- ============================================================
+-- Migration 7: Collection version stamps for cheap ETags
+-- ============================================================
+
+-- Bumped in the same transaction as every write to the collection
+
+CREATE TABLE IF NOT EXISTS collection_versions (
+    name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT IGNORE INTO collection_versions (name, version) VALUES ('offers', 0);
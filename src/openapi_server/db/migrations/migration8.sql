@@ -0,0 +1,19 @@
+-- ============================================================
+-- Migration 8: matches.updated_at for Last-Modified
+-- ============================================================
+
+SET @col_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.COLUMNS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'matches'
+      AND column_name = 'updated_at'
+);
+
+SET @sql := IF(@col_exists = 0,
+               'ALTER TABLE matches ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP;',
+               'SELECT "Column already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
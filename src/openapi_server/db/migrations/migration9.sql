@@ -0,0 +1,21 @@
+-- ============================================================
+-- Migration 9: created_at range index for GET /offers/export
+-- ============================================================
+
+-- Exports stream offers in (created_at, id) order without a filesort
+
+SET @idx_exists := (
+    SELECT COUNT(1)
+    FROM INFORMATION_SCHEMA.STATISTICS
+    WHERE table_schema = DATABASE()
+      AND table_name = 'offers'
+      AND index_name = 'idx_offers_created_id'
+);
+
+SET @sql := IF(@idx_exists = 0,
+               'CREATE INDEX idx_offers_created_id ON offers (created_at, id);',
+               'SELECT "Index already exists";');
+
+PREPARE stmt FROM @sql;
+EXECUTE stmt;
+DEALLOCATE PREPARE stmt;
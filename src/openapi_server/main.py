@@ -6,14 +6,28 @@ Matchmaking and Notification Service API
 Entrypoint for the FastAPI microservice.
 """
 
+import os
+from typing import Literal
+
 import requests
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+
+# Shared async HTTP client (MS1/MS2)
+from openapi_server.clients.async_http import close_async_client
 
 # Internal DB
-from openapi_server.db.connection import get_connection
+from openapi_server.db.async_db import shutdown_db_executor
+from openapi_server.db.connection import db_cursor
 
 # Matcher service (business logic)
+from openapi_server.services.jobs_service import job_stats
 from openapi_server.services.matcher_service import Matcher
+from openapi_server.services.offer_expiry import offer_expiry
+from openapi_server.services.outbox_service import outbox_publisher
+from openapi_server.services.read_cache import cache_stats
+from openapi_server.services.retention_service import retention_service
+from openapi_server.services.task_events import task_hub
+from openapi_server.services.task_worker import task_worker
 
 # Routers
 from openapi_server.routers.matches_route import router as MatchesRouter
@@ -42,38 +56,107 @@ matcher = Matcher(
 )
 
 
+# ===============================================================
+# BACKGROUND WORKERS
+# ===============================================================
+# "false" runs the API only (e.g. a read replica, or local runs without MySQL)
+BACKGROUND_WORKERS_ENABLED = os.getenv("BACKGROUND_WORKERS_ENABLED", "true") == "true"
+
+
+@app.on_event("startup")
+def start_background_workers():
+    if not BACKGROUND_WORKERS_ENABLED:
+        print("BACKGROUND WORKERS DISABLED")
+        return
+    outbox_publisher.start()
+    task_worker.start()
+    retention_service.start()
+    offer_expiry.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    if BACKGROUND_WORKERS_ENABLED:
+        outbox_publisher.stop()
+        task_worker.stop()
+        retention_service.stop()
+        offer_expiry.stop()
+    await close_async_client()
+    shutdown_db_executor()
+
+
 # ===============================================================
 # HEALTH CHECK
 # ===============================================================
 @app.get("/db-test-c", tags=["Health"])
 def db_test_c():
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("SELECT DATABASE()")
-    value = cur.fetchone()[0]
-    cur.close()
-    conn.close()
+    with db_cursor() as cur:
+        cur.execute("SELECT DATABASE()")
+        value = cur.fetchone()[0]
     return {"connected_to": value}
 
 
+@app.get("/internal/cache/stats", tags=["Health"])
+def read_cache_stats():
+    """Hit/miss counters of the match/offer read cache."""
+    return cache_stats()
+
+
+@app.get("/internal/tasks/stats", tags=["Health"])
+def task_worker_stats():
+    """Async task worker counters and long-poll/SSE waiters of this instance."""
+    return {**task_worker.stats(), "waiters": task_hub.stats()}
+
+
+@app.get("/internal/jobs/stats", tags=["Health"])
+async def jobs_stats():
+    """Size, TTL and eviction counters of the job store."""
+    return await job_stats()
+
+
+@app.get("/internal/retention/stats", tags=["Health"])
+def retention_stats():
+    """Retention policies and rows reclaimed per run."""
+    return retention_service.stats()
+
+
+@app.post("/internal/retention/run", status_code=202, tags=["Health"])
+def run_retention(response: Response):
+    """Start a retention run in the background; results in the stats."""
+    started = retention_service.trigger()
+    response.headers["Location"] = "/internal/retention/stats"
+    return {"status": "started" if started else "already_running"}
+
+
+@app.get("/internal/offers/expiry/stats", tags=["Health"])
+def offer_expiry_stats():
+    """Offers scheduled for expiry and expired so far by this instance."""
+    return offer_expiry.stats()
+
+
 # ===============================================================
 # MATCHMAKING ENDPOINT (BUSINESS LOGIC)
 # ===============================================================
 @app.post("/match/do-match", tags=["Matches"])
-def run_matching():
+async def run_matching(mode: Literal["greedy", "optimal"] = "greedy"):
     """
     Perform donor-organ <-> recipient-need matching:
     - Fetch organs from MS1
     - Fetch needs from MS2
     - Match based on organ_type + blood-type compatibility
-    - Save match + create offer
-    - Publish Pub/Sub event
+      (mode=greedy: MS1 order, best remaining need per organ;
+       mode=optimal: max-weight assignment over the whole run)
+    - Save matches + offers + outbox events in one transaction
+    - Publish Pub/Sub events (background outbox publisher)
     - Delete consumed resources
     """
-    matches = matcher.match_and_consume()
+    matches, skipped = await matcher.match_and_consume(mode)
     return {
+        "mode": mode,
         "match_count": len(matches),
         "matches": matches,
+        # Pairs that already had a match: not written, not consumed
+        "skipped": skipped,
     }
 
 
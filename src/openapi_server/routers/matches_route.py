@@ -1,68 +1,119 @@
-from fastapi import APIRouter, HTTPException, Response, BackgroundTasks
-from typing import List
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Header,
+    Query,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+from urllib.parse import urlencode
 import uuid
-import time
 
+from openapi_server.db.async_db import run_db
+from openapi_server.db.bulk import BATCH_MAX_ITEMS
 from openapi_server.models.match import Match, MatchCreate, MatchUpdate
 from openapi_server.services.matcher_service import (
     list_matches,
     create_match,
+    create_matches_batch,
     get_match,
     update_match,
     delete_match,
-    get_full_match,
+    get_full_match_resource,
+    get_full_matches,
+    get_match_resource,
+)
+from openapi_server.utils.http_cache import conditional_response
+
+from openapi_server.services.export_service import (
+    MEDIA_TYPES,
+    ExportsBusy,
+    export_matches,
 )
 
 # NEW async task service
 from openapi_server.services.async_tasks_service import (
     create_async_task,
-    update_async_task,
     get_async_task,
+    task_event_stream,
+    wait_for_task,
 )
+from openapi_server.services.task_worker import task_worker
 
 router = APIRouter()
 
-
-# ===============================================================
-# BACKGROUND WORKER (runs async tasks)
-# ===============================================================
-def simulate_long_match_process(task_id: str, match_id: int):
+MAX_PAGE_SIZE = 500
+MAX_FULL_BATCH = 200
+MAX_TASK_WAIT = 60
+
+
+def match_filters(
+    donor_id: Optional[str] = None,
+    recipient_id: Optional[str] = None,
+    organ_type: Optional[str] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Dict:
+    """Shared GET /matches and /matches/export filters (created_to exclusive)."""
+    return {
+        "donor_id": donor_id,
+        "recipient_id": recipient_id,
+        "organ_type": organ_type,
+        "status": status,
+        "created_from": created_from,
+        "created_to": created_to,
+    }
+
+
+def export_match_filters(
+    filters: Dict = Depends(match_filters),
+    created_from_alias: Optional[datetime] = Query(None, alias="createdFrom"),
+    created_to_alias: Optional[datetime] = Query(None, alias="createdTo"),
+) -> Dict:
     """
-    Simulates a long-running workload (5 seconds).
-    When complete, updates task row in DB.
+    /matches/export filters: those of GET /matches, plus the camelCase
+    createdFrom/createdTo the export has always accepted (as /offers/export).
     """
-    time.sleep(5)
-
-    update_async_task(
-        task_id,
-        "completed",
-        {
-            "message": f"Async processing complete for match {match_id}",
-            "match_id": match_id,
-        },
-    )
+    if filters["created_from"] is None:
+        filters["created_from"] = created_from_alias
+    if filters["created_to"] is None:
+        filters["created_to"] = created_to_alias
+    return filters
 
 
 # ===============================================================
-# GET /matches — list all matches + basic pagination
+# GET /matches — filtered, keyset pagination (newest first)
 # ===============================================================
 @router.get("/matches", response_model=List[Match], tags=["Matches"])
-def route_list_matches(limit: int = 25, offset: int = 0, response: Response = None):
-    rows = list_matches()
-
-    # Manual slice
-    sliced = rows[offset : offset + limit]
-
-    # Pagination Link header
-    next_offset = offset + limit
-    if next_offset < len(rows):
-        response.headers["Link"] = (
-            f'</matches?limit={limit}&offset={next_offset}>; rel="next"'
+def route_list_matches(
+    limit: int = Query(25, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    offset: int = Query(0, ge=0),  # legacy; ignored when `after` is given
+    filters: Dict = Depends(match_filters),
+    response: Response = None,
+):
+    try:
+        rows, next_cursor = list_matches(
+            limit, after=after, offset=offset, filters=filters
         )
-    else:
-        response.headers["Link"] = ""
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'after' cursor")
+
+    # Pagination Link header, only when there is a next page
+    if next_cursor:
+        query = {
+            name: value.isoformat() if isinstance(value, datetime) else value
+            for name, value in filters.items()
+            if value is not None
+        }
+        query.update(limit=limit, after=next_cursor)
+        response.headers["Link"] = f'</matches?{urlencode(query)}>; rel="next"'
 
-    return sliced
+    return rows
 
 
 # ===============================================================
@@ -81,15 +132,79 @@ def route_create_match(payload: MatchCreate, response: Response):
     return new_match
 
 
+# ===============================================================
+# POST /matches:batch — bulk upsert on unique_match_pair
+# ===============================================================
+@router.post("/matches:batch", tags=["Matches"])
+def route_create_matches_batch(payload: List[MatchCreate]):
+    if not payload or len(payload) > BATCH_MAX_ITEMS:
+        raise HTTPException(400, f"Send 1 to {BATCH_MAX_ITEMS} matches per batch")
+    try:
+        results = create_matches_batch(payload)
+    except ValueError as exc:
+        raise HTTPException(422, str(exc))
+
+    created = sum(1 for r in results if r["result"] == "created")
+    return {"created": created, "updated": len(results) - created, "items": results}
+
+
+# ===============================================================
+# GET /matches/export — streamed NDJSON/CSV (constant memory)
+# ===============================================================
+@router.get("/matches/export", tags=["Matches"])
+def route_export_matches(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    filters: Dict = Depends(export_match_filters),
+):
+    try:
+        stream = export_matches(format, filters)
+    except ExportsBusy as exc:
+        raise HTTPException(503, str(exc), headers={"Retry-After": "5"})
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="matches.{format}"'
+        },
+    )
+
+
+# ===============================================================
+# GET /matches/full?ids=1,2,3 — many dossiers in one round trip
+# (declared before /matches/{match_id}, which would capture "full")
+# ===============================================================
+@router.get("/matches/full", tags=["Matches"])
+def route_get_full_matches(ids: str = Query(..., description="comma-separated ids")):
+    try:
+        match_ids = list(dict.fromkeys(int(i) for i in ids.split(",") if i.strip()))
+    except ValueError:
+        raise HTTPException(400, "ids must be comma-separated integers")
+    if not match_ids or len(match_ids) > MAX_FULL_BATCH:
+        raise HTTPException(400, f"ids must list 1 to {MAX_FULL_BATCH} matches")
+
+    dossiers = get_full_matches(match_ids)
+    return {
+        "items": [dossiers[i] for i in match_ids if i in dossiers],
+        "missing": [i for i in match_ids if i not in dossiers],
+    }
+
+
 # ===============================================================
 # GET /matches/{match_id}
 # ===============================================================
 @router.get("/matches/{match_id}", response_model=Match, tags=["Matches"])
-def route_get_match(match_id: int):
-    match = get_match(match_id)
-    if match is None:
+def route_get_match(
+    match_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+):
+    resource = get_match_resource(match_id)
+    if resource is None:
         raise HTTPException(404, f"Match {match_id} not found")
-    return match
+    return conditional_response(
+        resource, response, if_none_match, if_modified_since
+    )
 
 
 # ===============================================================
@@ -119,22 +234,25 @@ def route_delete_match(match_id: int):
 # GET /matches/{match_id}/full
 # ===============================================================
 @router.get("/matches/{match_id}/full", tags=["Matches"])
-def route_get_full_match(match_id: int):
-    result = get_full_match(match_id)
-    if result is None:
+def route_get_full_match(
+    match_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+):
+    resource = get_full_match_resource(match_id)
+    if resource is None:
         raise HTTPException(404, f"Match {match_id} not found")
-    return result
+    return conditional_response(
+        resource, response, if_none_match, if_modified_since
+    )
 
 
 # ===============================================================
 # POST /matches/{match_id}/async — 202 Accepted (DB-backed)
 # ===============================================================
 @router.post("/matches/{match_id}/async", status_code=202, tags=["Matches"])
-def route_async_process_match(
-    match_id: int,
-    background: BackgroundTasks,
-    response: Response,
-):
+def route_async_process_match(match_id: int, response: Response):
     match = get_match(match_id)
     if match is None:
         raise HTTPException(404, f"Match {match_id} not found")
@@ -142,25 +260,46 @@ def route_async_process_match(
     # Create new task ID
     task_id = str(uuid.uuid4())
 
-    # Insert into DB
+    # Queue it in the DB; a task worker (any instance) leases and runs it
     create_async_task(task_id, match_id)
-
-    # Run background process
-    background.add_task(simulate_long_match_process, task_id, match_id)
+    task_worker.wake()
 
     # REST 202 headers
     response.headers["Location"] = f"/matches/async/tasks/{task_id}"
     response.headers["Retry-After"] = "3"
+    response.headers["Link"] = (
+        f'</matches/async/tasks/{task_id}?wait={MAX_TASK_WAIT}>; rel="monitor", '
+        f'</matches/async/tasks/{task_id}/events>; rel="alternate"'
+    )
 
-    return {"task_id": task_id, "status": "running"}
+    return {"task_id": task_id, "status": "queued"}
 
 
 # ===============================================================
-# GET /matches/async/tasks/{task_id}
+# GET /matches/async/tasks/{task_id} — ?wait=N long-polls
 # ===============================================================
 @router.get("/matches/async/tasks/{task_id}", tags=["Matches"])
-def route_async_task_status(task_id: str):
-    task = get_async_task(task_id)
+async def route_async_task_status(
+    task_id: str, wait: float = Query(0, ge=0, le=MAX_TASK_WAIT)
+):
+    if wait:
+        task = await wait_for_task(task_id, wait)
+    else:
+        task = await run_db(get_async_task, task_id)
     if task is None:
         raise HTTPException(404, "Task not found")
     return task
+
+
+# ===============================================================
+# GET /matches/async/tasks/{task_id}/events — Server-Sent Events
+# ===============================================================
+@router.get("/matches/async/tasks/{task_id}/events", tags=["Matches"])
+async def route_async_task_events(task_id: str):
+    if await run_db(get_async_task, task_id) is None:
+        raise HTTPException(404, "Task not found")
+    return StreamingResponse(
+        task_event_stream(task_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
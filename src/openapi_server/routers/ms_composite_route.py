@@ -1,69 +1,130 @@
+import asyncio
+from typing import Awaitable, Dict
+
+import httpx
 from fastapi import APIRouter
-import requests
 
-from openapi_server.clients.ms1_client import MS1Client
-from openapi_server.clients.ms2_client import MS2Client
+from openapi_server.clients.async_http import connection_stats
+from openapi_server.clients.async_ms1_client import AsyncMS1Client
+from openapi_server.clients.async_ms2_client import AsyncMS2Client
 
 router = APIRouter()
 
 # Shared base URL for MS1 + MS2
 COMPOSITE_BASE = "https://composite-service-730071231868.us-central1.run.app"
 
-ms1 = MS1Client(COMPOSITE_BASE)
-ms2 = MS2Client(COMPOSITE_BASE)
+# Async clients on the shared httpx.AsyncClient: proxied calls don't hold a
+# threadpool worker while waiting on the composite service.
+ms1 = AsyncMS1Client(COMPOSITE_BASE)
+ms2 = AsyncMS2Client(COMPOSITE_BASE)
+
+
+def _section_error(exc: BaseException) -> Dict:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return {"status": exc.response.status_code, "detail": str(exc)}
+    return {"status": 502, "detail": repr(exc)}
+
+
+async def _fan_out(sections: Dict[str, Awaitable]) -> Dict:
+    """
+    Await all sections concurrently. A failed section is returned as None
+    and described under "errors" instead of failing the whole response.
+    """
+    names = list(sections)
+    values = await asyncio.gather(*sections.values(), return_exceptions=True)
+
+    result: Dict = {}
+    errors: Dict = {}
+    for name, value in zip(names, values):
+        if isinstance(value, BaseException):
+            if not isinstance(value, Exception):
+                raise value
+            result[name] = None
+            errors[name] = _section_error(value)
+        else:
+            result[name] = value
+    if errors:
+        result["errors"] = errors
+    return result
 
 
 # ===============================================================
 # MS1: Donor Registry
 # ===============================================================
 @router.get("/ms1/health", tags=["Composite"])
-def ms1_health():
-    return ms1.list_donors()
+async def ms1_health():
+    return await ms1.list_donors()
 
 
 @router.get("/ms1/donors", tags=["Composite"])
-def ms1_list_donors():
-    return ms1.list_donors()
+async def ms1_list_donors():
+    return await ms1.list_donors()
 
 
 @router.get("/ms1/donors/{donor_id}", tags=["Composite"])
-def ms1_get_donor(donor_id: str):
-    return ms1.get_donor(donor_id)
+async def ms1_get_donor(donor_id: str):
+    return await ms1.get_donor(donor_id)
 
 
 @router.get("/ms1/donors/{donor_id}/organs", tags=["Composite"])
-def ms1_organs_for_donor(donor_id: str):
-    return ms1.list_organs_for_donor(donor_id)
+async def ms1_organs_for_donor(donor_id: str):
+    return await ms1.list_organs_for_donor(donor_id)
 
 
 @router.get("/ms1/organs", tags=["Composite"])
-def ms1_list_organs():
-    return ms1.list_organs()
+async def ms1_list_organs():
+    return await ms1.list_organs()
 
 
 @router.get("/ms1/consents", tags=["Composite"])
-def ms1_list_consents():
-    return ms1.list_consents()
+async def ms1_list_consents():
+    return await ms1.list_consents()
 
 
 @router.get("/ms1/consents/{consent_id}", tags=["Composite"])
-def ms1_get_consent(consent_id: str):
-    return ms1.get_consent(consent_id)
+async def ms1_get_consent(consent_id: str):
+    return await ms1.get_consent(consent_id)
 
 
 @router.get("/ms1/all", tags=["Composite"])
-def ms1_all():
-    return {
+async def ms1_all():
+    # list_donors primes the donor cache, so organs are enriched from it
+    # afterwards instead of issuing their own per-donor calls.
+    result = await _fan_out({
         "donors": ms1.list_donors(),
-        "organs": ms1.list_organs(),
+        "organs": ms1.list_organs(enrich=False),
         "consents": ms1.list_consents(),
-    }
+    })
+    if result["organs"] is not None:
+        enriched = await _fan_out({"organs": ms1.attach_blood_types(result["organs"])})
+        if "errors" in enriched:
+            # Keep the organs, without blood types, and report the failure
+            result.setdefault("errors", {}).update(enriched["errors"])
+        else:
+            result["organs"] = enriched["organs"]
+    return result
+
+
+# ---------- Donor blood-type cache ----------
+@router.get("/ms1/donor-cache", tags=["Composite"])
+async def ms1_donor_cache_stats():
+    return ms1.donor_cache.stats()
+
+
+@router.delete("/ms1/donor-cache", status_code=204, tags=["Composite"])
+async def ms1_donor_cache_clear():
+    ms1.invalidate_donor()
+
+
+@router.delete("/ms1/donor-cache/{donor_id}", status_code=204, tags=["Composite"])
+async def ms1_donor_cache_invalidate(donor_id: str):
+    ms1.invalidate_donor(donor_id)
 
 
 # ---------- NEW: DELETE organ ----------
 @router.delete("/ms1/organs/{organ_id}", tags=["Composite"])
-def ms1_delete_organ(organ_id: str):
-    return ms1.delete_organ(organ_id)
+async def ms1_delete_organ(organ_id: str):
+    return await ms1.delete_organ(organ_id)
 
 
 
@@ -71,53 +132,53 @@ def ms1_delete_organ(organ_id: str):
 # MS2: Recipient Registry
 # ===============================================================
 @router.get("/ms2/recipients", tags=["Composite"])
-def ms2_list_recipients():
-    return ms2.list_recipients()
+async def ms2_list_recipients():
+    return await ms2.list_recipients()
 
 
 @router.get("/ms2/recipients/{recipient_id}", tags=["Composite"])
-def ms2_get_recipient(recipient_id: str):
-    return ms2.get_recipient(recipient_id)
+async def ms2_get_recipient(recipient_id: str):
+    return await ms2.get_recipient(recipient_id)
 
 
 @router.get("/ms2/recipients/{recipient_id}/needs", tags=["Composite"])
-def ms2_needs_for_recipient(recipient_id: str):
-    return ms2.list_needs_for_recipient(recipient_id)
+async def ms2_needs_for_recipient(recipient_id: str):
+    return await ms2.list_needs_for_recipient(recipient_id)
 
 
 @router.get("/ms2/needs", tags=["Composite"])
-def ms2_list_needs():
-    return ms2.list_needs()
+async def ms2_list_needs():
+    return await ms2.list_needs()
 
 
 @router.get("/ms2/needs/{need_id}", tags=["Composite"])
-def ms2_get_need(need_id: str):
-    return ms2.get_need(need_id)
+async def ms2_get_need(need_id: str):
+    return await ms2.get_need(need_id)
 
 
 @router.get("/ms2/hospitals", tags=["Composite"])
-def ms2_list_hospitals():
-    return ms2.list_hospitals()
+async def ms2_list_hospitals():
+    return await ms2.list_hospitals()
 
 
 @router.get("/ms2/hospitals/{hospital_id}", tags=["Composite"])
-def ms2_get_hospital(hospital_id: str):
-    return ms2.get_hospital(hospital_id)
+async def ms2_get_hospital(hospital_id: str):
+    return await ms2.get_hospital(hospital_id)
 
 
 @router.get("/ms2/all", tags=["Composite"])
-def ms2_all():
-    return {
+async def ms2_all():
+    return await _fan_out({
         "recipients": ms2.list_recipients(),
         "needs": ms2.list_needs(),
         "hospitals": ms2.list_hospitals(),
-    }
+    })
 
 
 # ---------- NEW: DELETE need ----------
 @router.delete("/ms2/needs/{need_id}", tags=["Composite"])
-def ms2_delete_need(need_id: str):
-    return ms2.delete_need(need_id)
+async def ms2_delete_need(need_id: str):
+    return await ms2.delete_need(need_id)
 
 
 
@@ -125,7 +186,13 @@ def ms2_delete_need(need_id: str):
 # COMPOSITE SNAPSHOT
 # ===============================================================
 @router.get("/aggregate/full-snapshot", tags=["Composite"])
-def aggregate_full_snapshot():
-    r = requests.get(f"{COMPOSITE_BASE}/snapshot/inventory")
-    r.raise_for_status()
-    return r.json()
+async def aggregate_full_snapshot():
+    return await ms1.snapshot_inventory()
+
+
+# ===============================================================
+# UPSTREAM CONNECTION POOL COUNTERS
+# ===============================================================
+@router.get("/internal/http-pools", tags=["Composite"])
+def http_pool_stats():
+    return connection_stats()
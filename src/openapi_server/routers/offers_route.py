@@ -1,47 +1,102 @@
 # src/openapi_server/routers/offers_route.py
 
-from typing import List
-from fastapi import APIRouter, Response, HTTPException, Header
+from datetime import datetime
+from typing import List, Literal, Optional
+from urllib.parse import urlencode
 
+from fastapi import APIRouter, Response, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+
+from openapi_server.db.bulk import BATCH_MAX_ITEMS
 from openapi_server.models.offer import Offer, OfferCreate, OfferUpdate
+from openapi_server.services.export_service import (
+    MEDIA_TYPES,
+    ExportsBusy,
+    export_offers,
+)
 from openapi_server.services.offers_service import (
     get_offers,
+    get_offers_etag,
+    parse_offers_cursor,
     create_offer,
-    get_offer,
+    create_offers_batch,
+    get_offer_resource,
     update_offer,
     delete_offer,
 )
+from openapi_server.utils.http_cache import conditional_response, etag_matches
 
 router = APIRouter()
 
+MAX_PAGE_SIZE = 500
+
 
 @router.get("/offers", response_model=List[Offer], tags=["Offers"])
 async def offers_get(
-    limit: int = 10,
-    offset: int = 0,
+    limit: int = Query(10, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),  # legacy; ignored when `after` is given
+    after: Optional[str] = None,
+    status: Optional[str] = None,
+    recipient_id: Optional[str] = Query(default=None, alias="recipientId"),
     response: Response = None,
     if_none_match: str = Header(default=None),
 ):
 
-    offers, etag = await get_offers(limit, offset)
+    # A bad cursor is a 400 even when the client's ETag would match
+    try:
+        parse_offers_cursor(after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid 'after' cursor")
 
-    # Conditional GET check
-    if etag and if_none_match == etag:
-        return Response(status_code=304)
+    # Conditional GET check: validated from the version stamp, before
+    # any row is fetched
+    etag = await get_offers_etag(limit, offset, after, status, recipient_id)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    offers, next_cursor = await get_offers(limit, offset, after, status, recipient_id)
 
     # Send ETag back
-    if etag:
-        response.headers["ETag"] = etag
+    response.headers["ETag"] = etag
 
-    # Pagination header
-    response.headers["Link"] = (
-        f'</offers?limit={limit}&offset={offset + limit}>; rel="next"'
-    )
+    # Pagination header, only when there is a next page
+    if next_cursor:
+        query = {"limit": limit, "after": next_cursor}
+        if status is not None:
+            query["status"] = status
+        if recipient_id is not None:
+            query["recipientId"] = recipient_id
+        response.headers["Link"] = f'</offers?{urlencode(query)}>; rel="next"'
 
     return offers
 
 
 
+# ---------------------------------------------------------
+# GET /offers/export  (streamed NDJSON/CSV, constant memory)
+# ---------------------------------------------------------
+@router.get("/offers/export", tags=["Offers"])
+async def offers_export(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    created_from: Optional[datetime] = Query(default=None, alias="createdFrom"),
+    created_to: Optional[datetime] = Query(default=None, alias="createdTo"),
+):
+
+    try:
+        stream = export_offers(format, created_from, created_to)
+    except ExportsBusy as exc:
+        raise HTTPException(
+            status_code=503, detail=str(exc), headers={"Retry-After": "5"}
+        )
+
+    # Sync generator: StreamingResponse iterates it on the threadpool
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="offers.{format}"'},
+    )
+
+
 # ---------------------------------------------------------
 # POST /offers  (201 Created + Location header)
 # ---------------------------------------------------------
@@ -66,18 +121,43 @@ async def offers_post(offer: OfferCreate, response: Response):
     return new_offer
 
 
+# ---------------------------------------------------------
+# POST /offers:batch  (bulk upsert on unique_offer_per_match)
+# ---------------------------------------------------------
+@router.post("/offers:batch", tags=["Offers"])
+async def offers_post_batch(payload: List[OfferCreate]):
+
+    if not payload or len(payload) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Send 1 to {BATCH_MAX_ITEMS} offers per batch",
+        )
+
+    results = await create_offers_batch(payload)
+
+    created = sum(1 for r in results if r["result"] == "created")
+    return {"created": created, "updated": len(results) - created, "items": results}
+
+
 # ---------------------------------------------------------
 # GET /offers/{offer_id}
 # ---------------------------------------------------------
 @router.get("/offers/{offer_id}", response_model=Offer, tags=["Offers"])
-async def offers_get_one(offer_id: int):
+async def offers_get_one(
+    offer_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None),
+    if_modified_since: Optional[str] = Header(default=None),
+):
 
-    offer = await get_offer(offer_id)
+    resource = await get_offer_resource(offer_id)
 
-    if offer is None:
+    if resource is None:
         raise HTTPException(status_code=404, detail=f"Offer {offer_id} not found")
 
-    return offer
+    return conditional_response(
+        resource, response, if_none_match, if_modified_since
+    )
 
 
 # ---------------------------------------------------------
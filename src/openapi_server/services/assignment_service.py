@@ -0,0 +1,108 @@
+"""
+Globally optimal organ -> need assignment (max-weight bipartite matching).
+
+Opt-in alternative to the greedy matcher. Organs of different types can never
+be paired, so the problem is solved independently per organ-type block with
+scipy's linear_sum_assignment. The objective is lexicographic: as many matches
+as possible first, then the highest total score.
+
+Blocks are pruned before solving. Needs in the same (ABO, Rh) class have
+identical compatibility and blood bonus for every organ and differ only by
+priority, so an optimal solution never needs more than the top-k of a class,
+k being the number of organs in the block compatible with it. That keeps each
+block at most (organs x 8 * organs) regardless of waitlist size.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from openapi_server.services.scoring_engine import (
+    ABO_COMPATIBLE,
+    EncodedNeeds,
+    EncodedOrgans,
+    ScoringEngine,
+)
+
+
+def _candidate_needs(
+    organs: EncodedOrgans,
+    needs: EncodedNeeds,
+    need_idx: np.ndarray,
+    priority: np.ndarray,
+) -> np.ndarray:
+    """Per (ABO, Rh) class keep only the top-k needs by priority."""
+    keep = []
+    n_abo = needs.abo[need_idx]
+    n_rh = needs.rh[need_idx]
+    known_organs = organs.abo[organs.abo >= 0]
+
+    for abo in range(ABO_COMPATIBLE.shape[0]):
+        k = int(ABO_COMPATIBLE[known_organs, abo].sum())
+        if k == 0:
+            continue
+        for rh in (0, 1):
+            members = need_idx[(n_abo == abo) & (n_rh == rh)]
+            if len(members) > k:
+                top = np.argpartition(-priority[members], k - 1)[:k]
+                members = members[top]
+            keep.append(members)
+
+    if not keep:
+        return need_idx[:0]
+    return np.sort(np.concatenate(keep))
+
+
+def optimal_pairs(
+    organs: Sequence[Dict],
+    needs: Sequence[Dict],
+    engine: Optional[ScoringEngine] = None,
+) -> List[Tuple[Dict, Dict, float]]:
+    """
+    Max-weight assignment of organs to needs. Returns (organ, need, score)
+    tuples in MS1 organ order, same shape as greedy_pairs.
+    """
+    engine = engine or ScoringEngine()
+    organs = [o.get("data", o) for o in organs]
+    if not organs or not needs:
+        return []
+
+    o_arr = engine.encode_organs(organs)
+    n_arr = engine.encode_needs(needs)
+    priority = engine.need_priority(n_arr)
+
+    assigned: List[Tuple[int, int, float]] = []
+
+    for organ_type in np.unique(o_arr.organ_type):
+        organ_idx = np.flatnonzero(o_arr.organ_type == organ_type)
+        block_organs = o_arr.take(organ_idx)
+        need_idx = _candidate_needs(
+            block_organs,
+            n_arr,
+            np.flatnonzero(n_arr.organ_type == organ_type),
+            priority,
+        )
+        if len(need_idx) == 0:
+            continue
+
+        mask, scores = engine.score_matrix(
+            block_organs, n_arr.take(need_idx), priority[need_idx]
+        )
+        if not mask.any():
+            continue
+
+        # Every match is worth more than any possible score total of the block,
+        # so the solver maximises the match count first, then the score.
+        match_bonus = float(len(organ_idx) + 1)
+        weight = np.where(mask, scores.astype(np.float64) + match_bonus, 0.0)
+
+        rows, cols = linear_sum_assignment(weight, maximize=True)
+        for r, c in zip(rows, cols):
+            if mask[r, c]:
+                assigned.append(
+                    (int(organ_idx[r]), int(need_idx[c]), float(scores[r, c]))
+                )
+
+    assigned.sort()
+    return [(organs[o], needs[n], score) for o, n, score in assigned]
@@ -1,45 +1,315 @@
+import asyncio
 import json
-from openapi_server.db.connection import get_connection
+import os
+import time
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 
+from openapi_server.db.async_db import run_db
+from openapi_server.db.bulk import placeholders
+from openapi_server.db.connection import db_connection, db_cursor
+from openapi_server.services.task_events import next_change, task_hub
 
-def create_async_task(task_id: str, match_id: int):
-    conn = get_connection()
-    cur = conn.cursor()
+# Simulated workload of POST /matches/{id}/async, run by the task workers
+ASYNC_TASK_WORK_SECONDS = float(os.getenv("ASYNC_TASK_WORK_SECONDS", 5))
+
+_LEASE_EXPIRY = "TIMESTAMPADD(SECOND, %s, CURRENT_TIMESTAMP)"
+
+TERMINAL_STATUSES = ("completed", "failed")
+# SSE comment sent while nothing changes, so proxies keep the stream open
+TASK_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("TASK_EVENTS_KEEPALIVE_SECONDS", 15))
+# Streams end after this long; EventSource clients reconnect on their own
+TASK_EVENTS_MAX_SECONDS = float(os.getenv("TASK_EVENTS_MAX_SECONDS", 300))
 
+
+def create_async_task(task_id: str, match_id: int):
     sql = """
         INSERT INTO async_tasks (id, match_id, status)
         VALUES (%s, %s, %s)
     """
 
-    cur.execute(sql, (task_id, match_id, "running"))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(commit=True) as cur:
+        cur.execute(sql, (task_id, match_id, "queued"))
 
 
 def update_async_task(task_id: str, status: str, result: dict = None):
-    conn = get_connection()
-    cur = conn.cursor()
-
     sql = """
         UPDATE async_tasks
         SET status = %s, result = %s
         WHERE id = %s
     """
 
-    cur.execute(sql, (status, json.dumps(result) if result else None, task_id))
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(commit=True) as cur:
+        cur.execute(sql, (status, json.dumps(result) if result else None, task_id))
+    task_hub.notify(task_id)
 
 
 def get_async_task(task_id: str):
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
+    with db_cursor(dictionary=True) as cur:
+        cur.execute("SELECT * FROM async_tasks WHERE id = %s", (task_id,))
+        return cur.fetchone()
+
+
+def process_match_task(task: Dict) -> Dict:
+    """Task body for POST /matches/{id}/async (blocks a worker thread)."""
+    time.sleep(ASYNC_TASK_WORK_SECONDS)
+    match_id = task["match_id"]
+    return {
+        "message": f"Async processing complete for match {match_id}",
+        "match_id": match_id,
+    }
+
+
+# ---------------------------------------------------------
+# LEASES (task worker pool, see services/task_worker.py)
+# ---------------------------------------------------------
+def claim_tasks(owner: str, limit: int, lease_seconds: float) -> List[Dict]:
+    """
+    Lease up to `limit` queued tasks, oldest first. SKIP LOCKED lets
+    several instances claim concurrently without handing out a row twice.
+    """
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(
+                """
+                SELECT id, match_id, attempts
+                FROM async_tasks
+                WHERE status = 'queued'
+                ORDER BY created_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (limit,),
+            )
+            tasks = cur.fetchall()
+            if tasks:
+                ids = [t["id"] for t in tasks]
+                cur.execute(
+                    f"""
+                    UPDATE async_tasks
+                    SET status = 'running', lease_owner = %s,
+                        lease_expires_at = {_LEASE_EXPIRY},
+                        attempts = attempts + 1
+                    WHERE id IN ({placeholders(len(ids))})
+                    """,
+                    (owner, lease_seconds, *ids),
+                )
+            conn.commit()
+        finally:
+            cur.close()
+
+    for task in tasks:
+        task["attempts"] += 1
+        task_hub.notify(task["id"])
+    return tasks
+
+
+def heartbeat_tasks(owner: str, task_ids: Sequence[str], lease_seconds: float) -> int:
+    """Extend the leases `owner` still holds. Returns how many were extended."""
+    if not task_ids:
+        return 0
+    with db_cursor(commit=True) as cur:
+        cur.execute(
+            f"""
+            UPDATE async_tasks
+            SET lease_expires_at = {_LEASE_EXPIRY}
+            WHERE lease_owner = %s AND status = 'running'
+              AND id IN ({placeholders(len(task_ids))})
+            """,
+            (lease_seconds, owner, *task_ids),
+        )
+        return cur.rowcount
+
+
+def finish_task(owner: str, task_id: str, result: Dict) -> bool:
+    """
+    Mark a leased task completed. False if the lease was lost (expired and
+    requeued), in which case the row belongs to another attempt.
+    """
+    with db_cursor(commit=True) as cur:
+        cur.execute(
+            """
+            UPDATE async_tasks
+            SET status = 'completed', result = %s,
+                lease_owner = NULL, lease_expires_at = NULL
+            WHERE id = %s AND lease_owner = %s AND status = 'running'
+            """,
+            (json.dumps(result, default=str), task_id, owner),
+        )
+        owned = cur.rowcount == 1
+    if owned:
+        task_hub.notify(task_id)
+    return owned
+
+
+def _retry_status(attempts: int, max_attempts: int) -> str:
+    """Back to 'queued' until the task has used max_attempts claims."""
+    return "failed" if attempts >= max_attempts else "queued"
+
+
+def fail_task(
+    owner: str, task_id: str, error: str, max_attempts: int
+) -> Optional[str]:
+    """
+    Requeue a leased task after an error, or fail it for good. Returns the
+    new status ('queued' or 'failed'), None if the lease was lost.
+    """
+    with db_cursor(commit=True) as cur:
+        cur.execute(
+            """
+            SELECT attempts FROM async_tasks
+            WHERE id = %s AND lease_owner = %s AND status = 'running'
+            FOR UPDATE
+            """,
+            (task_id, owner),
+        )
+        row = cur.fetchone()
+        if row is None:
+            return None
+        status = _retry_status(row[0], max_attempts)
+        cur.execute(
+            """
+            UPDATE async_tasks
+            SET status = %s, last_error = %s,
+                lease_owner = NULL, lease_expires_at = NULL
+            WHERE id = %s
+            """,
+            (status, error[:512], task_id),
+        )
+    task_hub.notify(task_id)
+    return status
+
+
+def requeue_expired_tasks(max_attempts: int) -> Dict[str, List[str]]:
+    """
+    Return running tasks whose lease ran out (crashed or stalled worker,
+    or rows from before leases existed) to the queue, or fail the ones out
+    of attempts. Returns their ids by new status, "queued" and "failed".
+    """
+    outcome: Dict[str, List[str]] = {"queued": [], "failed": []}
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                """
+                SELECT id, attempts
+                FROM async_tasks
+                WHERE status = 'running'
+                  AND (lease_expires_at IS NULL
+                       OR lease_expires_at < CURRENT_TIMESTAMP)
+                FOR UPDATE SKIP LOCKED
+                """
+            )
+            for task_id, attempts in cur.fetchall():
+                outcome[_retry_status(attempts, max_attempts)].append(task_id)
+            for status, task_ids in outcome.items():
+                if task_ids:
+                    cur.execute(
+                        f"""
+                        UPDATE async_tasks
+                        SET status = %s, last_error = 'lease expired',
+                            lease_owner = NULL, lease_expires_at = NULL
+                        WHERE id IN ({placeholders(len(task_ids))})
+                        """,
+                        (status, *task_ids),
+                    )
+            conn.commit()
+        finally:
+            cur.close()
+
+    for task_ids in outcome.values():
+        for task_id in task_ids:
+            task_hub.notify(task_id)
+    return outcome
+
+
+def release_tasks(owner: str) -> List[str]:
+    """
+    Hand every task `owner` still leases back to the queue (shutdown).
+    Returns their ids.
+    """
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(
+                """
+                SELECT id FROM async_tasks
+                WHERE lease_owner = %s AND status = 'running'
+                FOR UPDATE
+                """,
+                (owner,),
+            )
+            task_ids = [row[0] for row in cur.fetchall()]
+            if task_ids:
+                cur.execute(
+                    f"""
+                    UPDATE async_tasks
+                    SET status = 'queued', attempts = GREATEST(attempts - 1, 0),
+                        lease_owner = NULL, lease_expires_at = NULL
+                    WHERE id IN ({placeholders(len(task_ids))})
+                    """,
+                    task_ids,
+                )
+            conn.commit()
+        finally:
+            cur.close()
+
+    for task_id in task_ids:
+        task_hub.notify(task_id)
+    return task_ids
+
+
+# ---------------------------------------------------------
+# WAITING (long-poll and SSE, woken by services/task_events.py)
+# ---------------------------------------------------------
+async def wait_for_task(task_id: str, wait: float) -> Optional[Dict]:
+    """
+    The task once it reaches a terminal status, or as it is after `wait`
+    seconds. The row is re-read only when notified (or at the re-check
+    interval), not in a polling loop. None if the task does not exist.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait
+    # Subscribe before reading so a change in between is not missed
+    with task_hub.subscribe(task_id) as changes:
+        task = await run_db(get_async_task, task_id)
+        while task is not None and task["status"] not in TERMINAL_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            await next_change(changes, remaining)
+            task = await run_db(get_async_task, task_id)
+    return task
+
+
+def _sse(event: str, data: Dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+async def task_event_stream(task_id: str) -> AsyncIterator[bytes]:
+    """
+    Server-Sent Events for one task: a `status` event with the row on
+    every status change, ending after the terminal one.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + TASK_EVENTS_MAX_SECONDS
+    last_status = None
+    with task_hub.subscribe(task_id) as changes:
+        task = await run_db(get_async_task, task_id)
+        keepalive_at = loop.time() + TASK_EVENTS_KEEPALIVE_SECONDS
+        while task is not None:
+            if task["status"] != last_status:
+                last_status = task["status"]
+                yield _sse("status", task)
+                if last_status in TERMINAL_STATUSES:
+                    return
 
-    cur.execute("SELECT * FROM async_tasks WHERE id = %s", (task_id,))
-    row = cur.fetchone()
+            now = loop.time()
+            if now >= deadline:
+                return
+            if now >= keepalive_at:
+                yield b": keepalive\n\n"
+                keepalive_at = now + TASK_EVENTS_KEEPALIVE_SECONDS
 
-    cur.close()
-    conn.close()
-    return row
+            await next_change(changes, min(deadline, keepalive_at) - now)
+            task = await run_db(get_async_task, task_id)
@@ -0,0 +1,33 @@
+"""
+Per-collection change counters for cheap conditional GETs.
+
+Every write to a collection bumps its row in `collection_versions` with the
+writer's cursor, so the counter commits or rolls back with the change. A
+list ETag derived from (version, query) can then be validated with one
+primary-key lookup instead of fetching and hashing the page.
+"""
+
+from openapi_server.db.connection import db_cursor
+
+OFFERS_COLLECTION = "offers"
+
+
+def bump_version(cur, collection: str) -> None:
+    """Increment the collection's version inside the caller's transaction."""
+    cur.execute(
+        """
+        INSERT INTO collection_versions (name, version) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+        """,
+        (collection,),
+    )
+
+
+def read_version(collection: str) -> int:
+    with db_cursor() as cur:
+        cur.execute(
+            "SELECT version FROM collection_versions WHERE name = %s",
+            (collection,),
+        )
+        row = cur.fetchone()
+    return row[0] if row else 0
@@ -0,0 +1,76 @@
+"""
+Consume stage of a matcher run: delete matched organs (MS1) and needs (MS2).
+
+Deletes run at the end of the run with bounded concurrency on the event loop,
+with retries on transient errors, and every item's outcome is reported back
+to the caller.
+"""
+
+import os
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Sequence, Tuple
+
+import httpx
+
+CONSUME_MAX_CONCURRENCY = int(os.getenv("CONSUME_MAX_CONCURRENCY", 16))
+# On top of the HTTP client's own retries (see clients/async_http.py)
+CONSUME_MAX_ATTEMPTS = int(os.getenv("CONSUME_MAX_ATTEMPTS", 2))
+CONSUME_BACKOFF_SECONDS = float(os.getenv("CONSUME_BACKOFF_SECONDS", 0.2))
+
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+
+def _status_code(exc: Exception):
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_transient(exc: Exception) -> bool:
+    if isinstance(exc, httpx.TransportError):
+        return True
+    return _status_code(exc) in TRANSIENT_STATUS
+
+
+async def _delete_with_retries(
+    delete: Callable[[str], Awaitable], item_id, limit: asyncio.Semaphore
+) -> Dict:
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            async with limit:
+                await delete(item_id)
+            return {"status": "deleted", "attempts": attempt}
+        except Exception as exc:
+            if _status_code(exc) == 404:
+                # Already gone upstream: nothing left to consume
+                return {"status": "not_found", "attempts": attempt}
+            if attempt >= CONSUME_MAX_ATTEMPTS or not is_transient(exc):
+                return {"status": "failed", "attempts": attempt, "error": repr(exc)}
+            await asyncio.sleep(CONSUME_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+
+async def consume_matched(
+    ms1,
+    ms2,
+    pairs: Sequence[Tuple[str, str]],
+    max_concurrency: int = CONSUME_MAX_CONCURRENCY,
+) -> List[Dict]:
+    """
+    Delete each (organ_id, need_id) pair's organ and need concurrently.
+    Returns one {"organ": {...}, "need": {...}} outcome per pair, in order.
+    """
+    if not pairs:
+        return []
+
+    limit = asyncio.Semaphore(max(1, max_concurrency))
+    jobs = []
+    for organ_id, need_id in pairs:
+        jobs.append(_delete_with_retries(ms1.delete_organ, organ_id, limit))
+        jobs.append(_delete_with_retries(ms2.delete_need, need_id, limit))
+
+    outcomes = await asyncio.gather(*jobs)
+    return [
+        {"organ": outcomes[i], "need": outcomes[i + 1]}
+        for i in range(0, len(outcomes), 2)
+    ]
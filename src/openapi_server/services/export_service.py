@@ -0,0 +1,173 @@
+"""
+Streaming exports of matches and offers as NDJSON or CSV.
+
+Rows come from an unbuffered cursor on a dedicated connection and are
+encoded a batch at a time, so memory stays flat however many rows match.
+The generators are synchronous; StreamingResponse iterates them on the
+threadpool, off the event loop. Each export holds one of
+EXPORT_MAX_CONCURRENT slots (and so at most that many dedicated
+connections and threadpool workers); beyond that ExportsBusy is raised.
+"""
+
+import csv
+import io
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from openapi_server.db.connection import streaming_cursor
+from openapi_server.db.filters import where_clause
+from openapi_server.services.matcher_service import MATCH_FILTERS, convert_match_row
+from openapi_server.services.offers_service import OFFER_COLUMNS, convert_offer_row
+
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", 1000))
+# Exports streaming at once per process
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", 4))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+MATCH_EXPORT_FIELDS = [
+    "id",
+    "donorId",
+    "organId",
+    "recipientId",
+    "donorBloodType",
+    "recipientBloodType",
+    "organType",
+    "score",
+    "status",
+    "createdAt",
+]
+OFFER_EXPORT_FIELDS = [
+    "id",
+    "matchId",
+    "recipientId",
+    "status",
+    "createdAt",
+    "updatedAt",
+]
+
+
+class ExportsBusy(RuntimeError):
+    """Every export slot is in use."""
+
+
+_export_slots = threading.BoundedSemaphore(EXPORT_MAX_CONCURRENT)
+
+
+class _ExportStream:
+    """
+    Iterator holding an export slot until it is exhausted, fails or is
+    garbage collected (a client that disconnects before the first chunk
+    leaves an unstarted generator, whose finally would never run).
+    """
+
+    def __init__(self, stream: Iterator[bytes]):
+        self._stream = stream
+        self._lock = threading.Lock()
+        self._held = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self._stream)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            held, self._held = self._held, False
+        if held:
+            self._stream.close()
+            _export_slots.release()
+
+    __del__ = close
+
+
+def _start_export(stream: Iterator[bytes]) -> Iterator[bytes]:
+    if not _export_slots.acquire(blocking=False):
+        raise ExportsBusy(f"All {EXPORT_MAX_CONCURRENT} export slots are in use")
+    return _ExportStream(stream)
+
+
+def _stream_rows(sql: str, params: Sequence[Any]) -> Iterator[List[Dict]]:
+    with streaming_cursor(dictionary=True) as cur:
+        cur.execute(sql, params)
+        while True:
+            batch = cur.fetchmany(EXPORT_FETCH_SIZE)
+            if not batch:
+                return
+            yield batch
+
+
+def _encode(
+    batches: Iterator[List[Dict]],
+    convert: Callable[[Dict], Dict],
+    fields: List[str],
+    fmt: str,
+) -> Iterator[bytes]:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for batch in batches:
+            writer.writerows(convert(row) for row in batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+
+    for batch in batches:
+        yield "".join(
+            json.dumps(convert(row), default=str) + "\n" for row in batch
+        ).encode()
+
+
+def _match_export_row(row: Dict) -> Dict:
+    created_at = row.get("created_at")
+    return {
+        **convert_match_row(row),
+        "createdAt": (
+            created_at.isoformat() if isinstance(created_at, datetime) else created_at
+        ),
+    }
+
+
+def export_matches(fmt: str, filters: Optional[Dict] = None) -> Iterator[bytes]:
+    """
+    Matches in (created_at, id) order, walking idx_matches_created_id or
+    the filter's index. `filters` takes the same names as GET /matches.
+    Raises ExportsBusy when every export slot is taken.
+    """
+    where, params = where_clause(
+        {name: (filters or {}).get(name) for name in MATCH_FILTERS}
+    )
+    sql = f"SELECT * FROM matches {where} ORDER BY created_at, id"
+    return _start_export(
+        _encode(_stream_rows(sql, params), _match_export_row, MATCH_EXPORT_FIELDS, fmt)
+    )
+
+
+def export_offers(
+    fmt: str,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Iterator[bytes]:
+    """
+    Offers in (created_at, id) order, walking idx_offers_created_id.
+    Raises ExportsBusy when every export slot is taken.
+    """
+    where, params = where_clause(
+        {"created_from": created_from, "created_to": created_to}
+    )
+    sql = f"SELECT {OFFER_COLUMNS} FROM offers {where} ORDER BY created_at, id"
+    return _start_export(
+        _encode(_stream_rows(sql, params), convert_offer_row, OFFER_EXPORT_FIELDS, fmt)
+    )
@@ -0,0 +1,289 @@
+"""
+Storage for jobs_service job status, with bounded memory.
+
+Finished jobs expire JOB_TTL_SECONDS after finishing. Both backends hold
+at most JOB_STORE_MAX_JOBS jobs; a store that is full of pending jobs
+rejects new ones instead of dropping one that is still running. Pick the
+backend with JOB_STORE_BACKEND: "memory" (default, per process) or "db"
+(the `jobs` table, migration 12, shared by every instance).
+"""
+
+import abc
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from openapi_server.db.connection import db_cursor
+
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "memory")
+JOB_STORE_MAX_JOBS = int(os.getenv("JOB_STORE_MAX_JOBS", 10000))
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", 3600))
+# db backend: a row still pending after this long was orphaned by a restart
+JOB_PENDING_TTL_SECONDS = float(os.getenv("JOB_PENDING_TTL_SECONDS", 86400))
+# db backend: the jobs table is counted on every Nth insert, not each one
+JOB_STORE_CAP_CHECK_EVERY = int(os.getenv("JOB_STORE_CAP_CHECK_EVERY", 100))
+
+
+class JobStoreFull(RuntimeError):
+    """Every slot holds a pending job."""
+
+
+class JobStore(abc.ABC):
+    """Backend interface. `blocking` stores are called off the event loop."""
+
+    blocking = False
+
+    @abc.abstractmethod
+    def create(self, job_id: str) -> None:
+        """Add a pending job. Raises JobStoreFull when there is no room."""
+
+    @abc.abstractmethod
+    def finish(self, job_id: str, status: str, result: Any = None) -> None:
+        """Record the outcome; the job expires `ttl` seconds later."""
+
+    @abc.abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        """The job's status (and result once finished), None if unknown."""
+
+    @abc.abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Size and counters for /internal/jobs/stats."""
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Jobs in a dict plus an OrderedDict of finished ids in finish order.
+    With one TTL, finish order is expiry order, so expiry only ever pops
+    from the front: O(1) per expired job, no scan. When full, the oldest
+    finished job is evicted early.
+    """
+
+    def __init__(
+        self,
+        max_jobs: int = JOB_STORE_MAX_JOBS,
+        ttl: float = JOB_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._clock = clock
+        self._jobs: Dict[str, Dict] = {}
+        self._finished: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.finished = 0
+        self.expired = 0
+        self.evicted = 0
+        self.rejected = 0
+
+    def _expire(self) -> None:
+        now = self._clock()
+        while self._finished:
+            job_id, expires_at = next(iter(self._finished.items()))
+            if expires_at > now:
+                return
+            self._finished.popitem(last=False)
+            self._jobs.pop(job_id, None)
+            self.expired += 1
+
+    def create(self, job_id: str) -> None:
+        with self._lock:
+            self._expire()
+            if len(self._jobs) >= self.max_jobs:
+                if not self._finished:
+                    self.rejected += 1
+                    raise JobStoreFull(f"{self.max_jobs} jobs are pending")
+                evicted_id, _ = self._finished.popitem(last=False)
+                del self._jobs[evicted_id]
+                self.evicted += 1
+            self._jobs[job_id] = {"status": "pending"}
+            self.created += 1
+
+    def finish(self, job_id: str, status: str, result: Any = None) -> None:
+        with self._lock:
+            if job_id not in self._jobs:
+                return
+            self._jobs[job_id] = {"status": status, "result": result}
+            self._finished.pop(job_id, None)
+            self._finished[job_id] = self._clock() + self.ttl
+            self.finished += 1
+            self._expire()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire()
+            return {
+                "backend": "memory",
+                "size": len(self._jobs),
+                "pending": len(self._jobs) - len(self._finished),
+                "max_jobs": self.max_jobs,
+                "ttl_seconds": self.ttl,
+                "created": self.created,
+                "finished": self.finished,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "rejected": self.rejected,
+            }
+
+
+class DbJobStore(JobStore):
+    """
+    Jobs in the `jobs` table. Expired rows are hidden from get() at once
+    and deleted in expiry order, walking idx_jobs_expires. Pending rows
+    expire too, after `pending_ttl`, so jobs orphaned by a restart do not
+    stay forever. The `max_jobs` cap is checked on every `cap_check_every`th
+    insert of an instance (and on every insert while the table is full of
+    pending jobs), so the table can overshoot it by up to that many rows per
+    instance between checks; each check evicts back down to the cap.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        max_jobs: int = JOB_STORE_MAX_JOBS,
+        ttl: float = JOB_TTL_SECONDS,
+        pending_ttl: float = JOB_PENDING_TTL_SECONDS,
+        cap_check_every: int = JOB_STORE_CAP_CHECK_EVERY,
+    ):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.pending_ttl = pending_ttl
+        self.cap_check_every = max(cap_check_every, 1)
+        self._creates = 0
+        self._full = False
+        self._lock = threading.Lock()
+
+    def _cap_check_due(self) -> bool:
+        with self._lock:
+            self._creates += 1
+            if self._full or self._creates >= self.cap_check_every:
+                self._creates = 0
+                return True
+            return False
+
+    def create(self, job_id: str) -> None:
+        with db_cursor(commit=True) as cur:
+            # Each insert deletes up to two expired rows, so the table cannot
+            # outgrow the live jobs by more than a bounded backlog
+            self._purge(cur, 2)
+            if self._cap_check_due():
+                self._enforce_cap(cur)
+            cur.execute(
+                """
+                INSERT INTO jobs (id, status, expires_at)
+                VALUES (%s, 'pending', TIMESTAMPADD(SECOND, %s, CURRENT_TIMESTAMP))
+                """,
+                (job_id, self.pending_ttl),
+            )
+
+    def _enforce_cap(self, cur) -> None:
+        """Make room for one insert, or raise JobStoreFull."""
+        cur.execute("SELECT COUNT(*) FROM jobs")
+        excess = cur.fetchone()[0] - self.max_jobs + 1
+        if excess > 0:
+            # Evict the finished (or expired) jobs closest to expiry
+            cur.execute(
+                """
+                DELETE FROM jobs
+                WHERE status <> 'pending' OR expires_at <= CURRENT_TIMESTAMP
+                ORDER BY expires_at
+                LIMIT %s
+                """,
+                (excess,),
+            )
+            excess -= cur.rowcount
+        self._full = excess > 0
+        if self._full:
+            raise JobStoreFull(f"{self.max_jobs} jobs are pending")
+
+    @staticmethod
+    def _purge(cur, limit: int) -> int:
+        cur.execute(
+            """
+            DELETE FROM jobs
+            WHERE expires_at <= CURRENT_TIMESTAMP
+            ORDER BY expires_at
+            LIMIT %s
+            """,
+            (limit,),
+        )
+        return cur.rowcount
+
+    def finish(self, job_id: str, status: str, result: Any = None) -> None:
+        with db_cursor(commit=True) as cur:
+            cur.execute(
+                """
+                UPDATE jobs
+                SET status = %s, result = %s, finished_at = CURRENT_TIMESTAMP,
+                    expires_at = TIMESTAMPADD(SECOND, %s, CURRENT_TIMESTAMP)
+                WHERE id = %s
+                """,
+                (status, json.dumps(result, default=str), self.ttl, job_id),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with db_cursor(dictionary=True) as cur:
+            cur.execute(
+                """
+                SELECT status, result
+                FROM jobs
+                WHERE id = %s
+                  AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
+                """,
+                (job_id,),
+            )
+            row = cur.fetchone()
+        if row is None:
+            return None
+        if row["status"] == "pending":
+            return {"status": "pending"}
+        result = row["result"]
+        return {
+            "status": row["status"],
+            "result": json.loads(result) if isinstance(result, str) else result,
+        }
+
+    def purge_expired(self, limit: int = 1000) -> int:
+        """Delete up to `limit` expired jobs. Returns how many."""
+        with db_cursor(commit=True) as cur:
+            return self._purge(cur, limit)
+
+    def stats(self) -> Dict[str, Any]:
+        with db_cursor(dictionary=True) as cur:
+            cur.execute(
+                """
+                SELECT COUNT(*) AS size,
+                       COALESCE(SUM(status = 'pending'), 0) AS pending,
+                       COALESCE(SUM(expires_at <= CURRENT_TIMESTAMP), 0) AS expired
+                FROM jobs
+                """
+            )
+            row = cur.fetchone()
+        return {
+            "backend": "db",
+            "size": int(row["size"]),
+            "pending": int(row["pending"]),
+            "expired_unpurged": int(row["expired"]),
+            "max_jobs": self.max_jobs,
+            "ttl_seconds": self.ttl,
+            "pending_ttl_seconds": self.pending_ttl,
+            "cap_check_every": self.cap_check_every,
+        }
+
+
+def make_job_store(backend: str = JOB_STORE_BACKEND) -> JobStore:
+    if backend == "db":
+        return DbJobStore()
+    if backend == "memory":
+        return InMemoryJobStore()
+    raise ValueError(f"Unknown JOB_STORE_BACKEND {backend!r}")
@@ -1,17 +1,40 @@
 import asyncio
 from uuid import uuid4
 
-JOBS = {}
+from openapi_server.db.async_db import run_db
+from openapi_server.services.job_store import make_job_store
+
+job_store = make_job_store()
+
+# Strong references, so pending jobs are not garbage collected mid-run
+_running = set()
+
+
+async def _call(method, *args):
+    if job_store.blocking:
+        return await run_db(method, *args)
+    return method(*args)
+
 
 async def start_job():
+    """Raises JobStoreFull when the store has no room for another job."""
     job_id = str(uuid4())
-    JOBS[job_id] = {"status": "pending"}
-    asyncio.create_task(_complete_job(job_id))
+    await _call(job_store.create, job_id)
+    task = asyncio.create_task(_complete_job(job_id))
+    _running.add(task)
+    task.add_done_callback(_running.discard)
     return job_id
 
+
 async def _complete_job(job_id):
     await asyncio.sleep(3)
-    JOBS[job_id] = {"status": "done", "result": "Job completed successfully"}
+    await _call(job_store.finish, job_id, "done", "Job completed successfully")
+
 
 async def get_job_status(job_id):
-    return JOBS.get(job_id, {"status": "not_found"})
+    job = await _call(job_store.get, job_id)
+    return job if job is not None else {"status": "not_found"}
+
+
+async def job_stats():
+    return await _call(job_store.stats)
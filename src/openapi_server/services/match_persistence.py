@@ -0,0 +1,160 @@
+"""
+Batched persistence for matcher runs.
+
+All matches of a run, their pending offers and their outbox events are written
+with multi-row INSERTs on one connection and committed once, so the cost of a
+run no longer grows with DB round trips per match.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Sequence, Tuple
+
+from openapi_server.db.bulk import chunks, insert_rows, placeholders
+from openapi_server.db.connection import db_connection
+from openapi_server.services.collection_versions import (
+    OFFERS_COLLECTION,
+    bump_version,
+)
+from openapi_server.services.outbox_service import enqueue_events, outbox_publisher
+from openapi_server.services.read_cache import invalidate_match
+
+MATCH_COLUMNS = (
+    "donor_id",
+    "organ_id",
+    "recipient_id",
+    "donor_blood_type",
+    "recipient_blood_type",
+    "organ_type",
+    "score",
+    "status",
+)
+
+
+def match_ids_by_pair(
+    cur, pairs: Sequence[Tuple[str, str]]
+) -> Dict[Tuple[str, str], int]:
+    """(donor_id, recipient_id) -> newest match id, via unique_match_pair."""
+    ids: Dict[Tuple[str, str], int] = {}
+    for chunk in chunks(pairs):
+        cur.execute(
+            "SELECT id, donor_id, recipient_id FROM matches "
+            "WHERE (donor_id, recipient_id) IN ("
+            + ", ".join(["(%s, %s)"] * len(chunk))
+            + ")",
+            [value for pair in chunk for value in pair],
+        )
+        for match_id, donor_id, recipient_id in cur.fetchall():
+            key = (str(donor_id), str(recipient_id))
+            ids[key] = max(match_id, ids.get(key, match_id))
+    return ids
+
+
+def offer_ids_by_match(cur, match_ids: Sequence[str]) -> Dict[str, int]:
+    """match_id -> offer id, via unique_offer_per_match."""
+    ids: Dict[str, int] = {}
+    for chunk in chunks(match_ids):
+        cur.execute(
+            "SELECT id, match_id FROM offers "
+            f"WHERE match_id IN ({placeholders(len(chunk))})",
+            list(chunk),
+        )
+        for offer_id, match_id in cur.fetchall():
+            ids[str(match_id)] = offer_id
+    return ids
+
+
+def _match_event(entry: Dict) -> Dict:
+    return {
+        "match_id": entry["match_id"],
+        "offer_id": entry["offer_id"],
+        "donor_id": entry["donor_id"],
+        "organ_id": entry["organ_id"],
+        "recipient_id": entry["recipient_id"],
+        "organ_type": entry["organ_type"],
+        "message": "New donor-recipient match created",
+    }
+
+
+def persist_matches(entries: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Insert matches, one pending offer per match and one outbox event per match
+    in a single transaction. Sets "match_id" and "offer_id" on each written
+    entry. Nothing is written if any statement fails.
+
+    A (donor_id, recipient_id) pair that already has a match, or repeats
+    within the run, is left alone (the existing match keeps its status and
+    offer) and returned as skipped, with "skipped" set to the reason.
+    Returns (written, skipped). A concurrent run inserting the same pair
+    between the check and the insert still fails the transaction.
+    """
+    if not entries:
+        return [], []
+
+    rows: List[Dict] = []
+    skipped: List[Dict] = []
+    seen = set()
+    for entry in entries:
+        pair = (str(entry["donor_id"]), str(entry["recipient_id"]))
+        if pair in seen:
+            entry["skipped"] = "duplicate_pair"
+            skipped.append(entry)
+        else:
+            seen.add(pair)
+            rows.append(entry)
+
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            existing = match_ids_by_pair(cur, list(seen))
+            if existing:
+                fresh = []
+                for entry in rows:
+                    pair = (str(entry["donor_id"]), str(entry["recipient_id"]))
+                    if pair in existing:
+                        entry["skipped"] = "match_exists"
+                        skipped.append(entry)
+                    else:
+                        fresh.append(entry)
+                rows = fresh
+
+            if rows:
+                insert_rows(
+                    cur,
+                    "matches",
+                    MATCH_COLUMNS,
+                    [tuple(e[c] for c in MATCH_COLUMNS) for e in rows],
+                )
+                pairs = [(str(e["donor_id"]), str(e["recipient_id"])) for e in rows]
+                match_ids = match_ids_by_pair(cur, pairs)
+                for entry, pair in zip(rows, pairs):
+                    entry["match_id"] = match_ids[pair]
+
+                # Naive UTC like offers_service, which offer_expiry relies on
+                now = datetime.utcnow()
+                insert_rows(
+                    cur,
+                    "offers",
+                    ("match_id", "recipient_id", "status", "created_at", "updated_at"),
+                    [
+                        (str(e["match_id"]), e["recipient_id"], "pending", now, now)
+                        for e in rows
+                    ],
+                )
+
+                bump_version(cur, OFFERS_COLLECTION)
+
+                offer_ids = offer_ids_by_match(cur, [str(e["match_id"]) for e in rows])
+                for entry in rows:
+                    entry["offer_id"] = offer_ids.get(str(entry["match_id"]))
+
+                enqueue_events(cur, [_match_event(e) for e in rows])
+
+            conn.commit()
+        finally:
+            cur.close()
+
+    for entry in rows:
+        invalidate_match(entry["match_id"])
+    if rows:
+        outbox_publisher.wake()
+    return rows, skipped
@@ -1,15 +1,43 @@
-from typing import List, Dict, Optional
-from openapi_server.clients.ms1_client import MS1Client
-from openapi_server.clients.ms2_client import MS2Client
-from openapi_server.db.connection import get_connection
-from openapi_server.clients.pubsub_client import publish_event
+import asyncio
+from datetime import datetime
+from typing import List, Dict, Optional, Sequence, Tuple
+from openapi_server.clients.async_ms1_client import AsyncMS1Client
+from openapi_server.clients.async_ms2_client import AsyncMS2Client
+from openapi_server.db.async_db import run_db
+from openapi_server.db.bulk import chunks, insert_rows, placeholders
+from openapi_server.db.connection import db_connection, db_cursor
+from openapi_server.db.filters import where_clause
+from openapi_server.services.assignment_service import optimal_pairs
+from openapi_server.services.consume_service import consume_matched
+from openapi_server.services.match_persistence import (
+    MATCH_COLUMNS,
+    match_ids_by_pair,
+    persist_matches,
+)
+from openapi_server.services.offers_service import convert_offer_row
+from openapi_server.services.read_cache import (
+    CachedResource,
+    full_match_key,
+    get_or_load,
+    get_or_load_many,
+    invalidate_match,
+    make_resource,
+    match_key,
+)
+from openapi_server.services.scoring_engine import ScoringEngine
+from openapi_server.services.waitlist_index import (
+    ABO_COMPATIBILITY,
+    abo_group,
+    greedy_pairs,
+)
+from openapi_server.utils.cursors import decode_cursor, encode_cursor
 from openapi_server.models.match import Match, MatchCreate, MatchUpdate
 
 
 # ===============================================================
 # INTERNAL HELPER — Convert DB row → API Match format
 # ===============================================================
-def _convert_match_row(row: Dict) -> Optional[Dict]:
+def convert_match_row(row: Dict) -> Optional[Dict]:
     if not row:
         return None
 
@@ -32,159 +60,173 @@ class Matcher:
     """
 
     def __init__(self, ms1_base_url: str, ms2_base_url: str):
-        self.ms1 = MS1Client(ms1_base_url)
-        self.ms2 = MS2Client(ms2_base_url)
+        self.ms1 = AsyncMS1Client(ms1_base_url)
+        self.ms2 = AsyncMS2Client(ms2_base_url)
 
     # ---------------------------------------------------------
     # BLOOD COMPATIBILITY
     # ---------------------------------------------------------
     def is_compatible(self, donor_bt: str, recipient_bt: str) -> bool:
-        d = donor_bt.replace("+", "").replace("-", "")
-        r = recipient_bt.replace("+", "").replace("-", "")
-        rules = {
-            "O": ["O", "A", "B", "AB"],
-            "A": ["A", "AB"],
-            "B": ["B", "AB"],
-            "AB": ["AB"],
-        }
-        return d in rules and r in rules[d]
+        return abo_group(recipient_bt) in ABO_COMPATIBILITY.get(abo_group(donor_bt), ())
 
     # ---------------------------------------------------------
-    # SQL INSERT FOR AUTOMATIC MATCHING
+    # MATCHING LOGIC
     # ---------------------------------------------------------
-    def save_to_db(self, match: Dict) -> int:
-        conn = get_connection()
-        cur = conn.cursor()
-
-        sql = """
-            INSERT INTO matches
-            (donor_id, organ_id, recipient_id,
-             donor_blood_type, recipient_blood_type,
-             organ_type, score, status)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    def pair(self, organs: List[Dict], needs: List[Dict], mode: str = "greedy"):
         """
-
-        cur.execute(sql, (
-            match["donor_id"],
-            match["organ_id"],
-            match["recipient_id"],
-            match["donor_blood_type"],
-            match["recipient_blood_type"],
-            match["organ_type"],
-            match["score"],
-            match["status"]
-        ))
-
-        match_id = cur.lastrowid
-        conn.commit()
-        cur.close()
-        conn.close()
-        return match_id
-
-    # ---------------------------------------------------------
-    # CREATE OFFER
-    # ---------------------------------------------------------
-    def create_offer(self, match_id: int, recipient_id: str):
-        conn = get_connection()
-        cur = conn.cursor()
-
-        sql = """
-            INSERT INTO offers (match_id, recipient_id, status)
-            VALUES (%s, %s, %s)
+        greedy  — organs in MS1 order each take their best remaining need (fast)
+        optimal — max-weight assignment over the whole run
         """
-
-        cur.execute(sql, (match_id, recipient_id, "pending"))
-        conn.commit()
-        cur.close()
-        conn.close()
-
-    # ---------------------------------------------------------
-    # MATCHING LOGIC
-    # ---------------------------------------------------------
-    def match_and_consume(self) -> List[Dict]:
-        organs_raw = self.ms1.list_organs()
-        needs = self.ms2.list_needs()
+        engine = ScoringEngine()
+        if mode == "optimal":
+            return optimal_pairs(organs, needs, engine)
+        if mode != "greedy":
+            raise ValueError(f"unknown matching mode: {mode}")
+
+        priorities = engine.need_priority(engine.encode_needs(needs))
+        return greedy_pairs(organs, needs, priorities, engine.blood_bonus)
+
+    async def match_and_consume(
+        self, mode: str = "greedy"
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Pair, persist and consume one run. Returns (matches, skipped): pairs
+        that already had a match are neither written nor consumed upstream.
+        """
+        organs_raw, needs = await asyncio.gather(
+            self.ms1.list_organs(), self.ms2.list_needs()
+        )
         results: List[Dict] = []
 
-        for organ in organs_raw:
-            o = organ.get("data", organ)
-            organ_type = o["organ_type"]
-            donor_bt = o.get("blood_type", "O+")
-            donor_id = o["donor_id"]
-            organ_id = o["id"]
-
-            need = next((
-                n for n in needs
-                if n["organ_type"] == organ_type
-                and self.is_compatible(donor_bt, n["blood_type"])
-            ), None)
-
-            if not need:
-                continue
-
-            match_entry = {
-                "donor_id": donor_id,
-                "organ_id": organ_id,
+        # CPU-bound (NumPy / scipy): keep it off the event loop
+        pairs = await asyncio.to_thread(self.pair, organs_raw, needs, mode)
+
+        for o, need, score in pairs:
+            results.append({
+                "donor_id": o["donor_id"],
+                "organ_id": o["id"],
                 "recipient_id": need["recipient_id"],
-                "donor_blood_type": donor_bt,
+                "donor_blood_type": o.get("blood_type", "O+"),
                 "recipient_blood_type": need["blood_type"],
-                "organ_type": organ_type,
-                "score": 1.0,
+                "organ_type": o["organ_type"],
+                "score": round(score, 4),
                 "status": "matched",
-            }
-
-            match_id = self.save_to_db(match_entry)
-            self.create_offer(match_id, need["recipient_id"])
-
-            publish_event({
-                "match_id": match_id,
-                "donor_id": donor_id,
-                "organ_id": organ_id,
-                "recipient_id": need["recipient_id"],
-                "organ_type": organ_type,
-                "message": "New donor-recipient match created"
             })
 
-            match_entry["match_id"] = match_id
-            results.append(match_entry)
+        # One transaction for every match + offer + outbox event of the run;
+        # the outbox publisher sends the Pub/Sub events in the background.
+        written, skipped = await run_db(persist_matches, results)
 
-            self.ms1.delete_organ(organ_id)
-            self.ms2.delete_need(need["id"])
-            needs = [n for n in needs if n["id"] != need["id"]]
+        # Only organs and needs that now have a match row and an offer
+        need_ids = {
+            id(entry): need["id"] for entry, (_, need, _) in zip(results, pairs)
+        }
+        outcomes = await consume_matched(
+            self.ms1,
+            self.ms2,
+            [(entry["organ_id"], need_ids[id(entry)]) for entry in written],
+        )
+        for entry, outcome in zip(written, outcomes):
+            entry["consumed"] = outcome
 
-        return results
+        return written, skipped
 
 
 # ==========================================================
 # =============== CRUD FUNCTIONS ===========================
 # ==========================================================
 
-def list_matches():
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM matches ORDER BY created_at DESC")
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+# GET /matches filters; each one is an index seek (migrations 1 and 10)
+MATCH_FILTERS = (
+    "donor_id",
+    "recipient_id",
+    "organ_type",
+    "status",
+    "created_from",
+    "created_to",
+)
+
+
+def list_matches(
+    limit: int,
+    after: Optional[str] = None,
+    offset: int = 0,
+    filters: Optional[Dict] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of matches, newest first, ordered by (created_at, id).
+    `filters` maps MATCH_FILTERS names to values (None = not filtered).
+    `after` is the cursor returned with the previous page; offset is only
+    honoured without a cursor. Returns (matches, next_cursor or None).
+    Raises ValueError for a malformed cursor.
+    """
+    seek = []
+    if after:
+        created_at, last_id = decode_cursor(after, 2)
+        try:
+            created_at, last_id = datetime.fromisoformat(created_at), int(last_id)
+        except (TypeError, ValueError) as exc:
+            # Well-formed JSON, wrong value types (e.g. [null, null])
+            raise ValueError("malformed cursor") from exc
+        seek = [
+            (
+                "created_at < %s OR (created_at = %s AND id < %s)",
+                [created_at, created_at, last_id],
+            )
+        ]
+        offset = 0
+    filters = {name: (filters or {}).get(name) for name in MATCH_FILTERS}
+    where, params = where_clause(filters, seek)
+
+    # One extra row tells whether a next page exists
+    with db_cursor(dictionary=True) as cur:
+        cur.execute(
+            f"SELECT * FROM matches {where} "
+            "ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s",
+            (*params, limit + 1, offset),
+        )
+        rows = cur.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([last["created_at"], last["id"]])
+
+    return [convert_match_row(r) for r in rows], next_cursor
+
+
+def _fetch_match_row(cur, match_id: int) -> Optional[Dict]:
+    cur.execute("SELECT * FROM matches WHERE id = %s", (match_id,))
+    return cur.fetchone()
 
-    return [_convert_match_row(r) for r in rows]
+
+def _fetch_match(cur, match_id: int) -> Optional[Dict]:
+    return convert_match_row(_fetch_match_row(cur, match_id))
+
+
+def _modified_at(row: Dict):
+    return row.get("updated_at") or row.get("created_at")
 
 
 def get_match(match_id: int) -> Optional[Dict]:
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-    cur.execute("SELECT * FROM matches WHERE id = %s", (match_id,))
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
+    with db_cursor(dictionary=True) as cur:
+        return _fetch_match(cur, match_id)
 
-    return _convert_match_row(row)
 
+def get_match_resource(match_id: int) -> Optional[CachedResource]:
+    """Match body + ETag/Last-Modified, served from the read cache."""
+    def load():
+        with db_cursor(dictionary=True) as cur:
+            row = _fetch_match_row(cur, match_id)
+        if not row:
+            return None
+        return make_resource(convert_match_row(row), _modified_at(row))
+
+    return get_or_load(match_key(match_id), load)
 
-def create_match(payload: MatchCreate) -> Dict:
-    conn = get_connection()
-    cur = conn.cursor()
 
+def create_match(payload: MatchCreate) -> Dict:
     sql = """
         INSERT INTO matches
         (donor_id, organ_id, recipient_id,
@@ -195,18 +237,78 @@ def create_match(payload: MatchCreate) -> Dict:
 
     data = payload.model_dump(by_alias=True)
 
-    cur.execute(sql, (
-        data["donorId"], data["organId"], data.get("recipientId"),
-        data.get("donorBloodType"), data.get("recipientBloodType"),
-        data.get("organType"), data.get("score"), data.get("status")
-    ))
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute(sql, (
+            data["donorId"], data["organId"], data.get("recipientId"),
+            data.get("donorBloodType"), data.get("recipientBloodType"),
+            data.get("organType"), data.get("score"), data.get("status")
+        ))
+        match_id = cur.lastrowid
+        conn.commit()
+
+        # Read back on the same connection instead of borrowing another
+        match = _fetch_match(cur, match_id)
+        cur.close()
+
+    return match
 
-    match_id = cur.lastrowid
-    conn.commit()
-    cur.close()
-    conn.close()
 
-    return get_match(match_id)
+def create_matches_batch(payloads: Sequence[MatchCreate]) -> List[Dict]:
+    """
+    Upsert many matches in one transaction with multi-row statements.
+    unique_match_pair decides create vs update: an existing (donorId,
+    recipientId) pair, or one repeated earlier in the batch, is updated in
+    place. Returns one {"index", "id", "result"} per payload, in order.
+    Raises ValueError (nothing written) if an item lacks recipientId.
+    """
+    if not payloads:
+        return []
+
+    rows = []
+    for payload in payloads:
+        data = payload.model_dump(by_alias=True)
+        rows.append((
+            data["donorId"], data["organId"], data.get("recipientId"),
+            data.get("donorBloodType"), data.get("recipientBloodType"),
+            data.get("organType"), data.get("score"), data.get("status"),
+        ))
+    missing = [i for i, row in enumerate(rows) if row[2] is None]
+    if missing:
+        # matches.recipient_id is NOT NULL and part of unique_match_pair
+        raise ValueError(f"recipientId is required (items {missing[:20]})")
+    pairs = [(str(row[0]), str(row[2])) for row in rows]
+
+    updates = ", ".join(
+        f"{column} = VALUES({column})"
+        for column in MATCH_COLUMNS
+        if column not in ("donor_id", "recipient_id")
+    )
+
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            existing = set(match_ids_by_pair(cur, pairs))
+            insert_rows(
+                cur, "matches", MATCH_COLUMNS, rows,
+                suffix=f"ON DUPLICATE KEY UPDATE {updates}",
+            )
+            ids = match_ids_by_pair(cur, pairs)
+            conn.commit()
+        finally:
+            cur.close()
+
+    results = []
+    for index, pair in enumerate(pairs):
+        results.append({
+            "index": index,
+            "id": str(ids[pair]),
+            "result": "updated" if pair in existing else "created",
+        })
+        if pair in existing:
+            invalidate_match(ids[pair])
+        existing.add(pair)
+    return results
 
 
 def update_match(match_id: int, payload: MatchUpdate) -> Optional[Dict]:
@@ -217,48 +319,98 @@ def update_match(match_id: int, payload: MatchUpdate) -> Optional[Dict]:
     set_clause = ", ".join([f"{key}=%s" for key in updates.keys()])
     values = list(updates.values())
 
-    conn = get_connection()
-    cur = conn.cursor()
-
-    sql = f"UPDATE matches SET {set_clause} WHERE id = %s"
-    cur.execute(sql, (*values, match_id))
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        sql = f"UPDATE matches SET {set_clause} WHERE id = %s"
+        cur.execute(sql, (*values, match_id))
+        conn.commit()
+        invalidate_match(match_id)
 
-    conn.commit()
-    cur.close()
-    conn.close()
+        match = _fetch_match(cur, match_id)
+        cur.close()
 
-    return get_match(match_id)
+    return match
 
 
 def delete_match(match_id: int) -> bool:
-    conn = get_connection()
-    cur = conn.cursor()
-    cur.execute("DELETE FROM matches WHERE id = %s", (match_id,))
-    deleted = cur.rowcount > 0
-    conn.commit()
-    cur.close()
-    conn.close()
+    with db_cursor(commit=True) as cur:
+        cur.execute("DELETE FROM matches WHERE id = %s", (match_id,))
+        deleted = cur.rowcount > 0
+
+    invalidate_match(match_id)
     return deleted
 
 
-def get_full_match(match_id: int):
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
+FULL_MATCH_SQL = """
+    SELECT
+        m.*,
+        o.id AS offer_id,
+        o.match_id AS offer_match_id,
+        o.recipient_id AS offer_recipient_id,
+        o.status AS offer_status,
+        o.created_at AS offer_created_at,
+        o.updated_at AS offer_updated_at
+    FROM matches m
+    LEFT JOIN offers o ON o.match_id = CAST(m.id AS CHAR)
+    WHERE m.id IN ({ids})
+    ORDER BY m.id, o.id
+"""
 
-    cur.execute("SELECT * FROM matches WHERE id = %s", (match_id,))
-    match = cur.fetchone()
 
-    if not match:
-        cur.close()
-        conn.close()
-        return None
+def _select_full_matches(match_ids: Sequence[int]) -> Dict[int, CachedResource]:
+    """
+    Match + converted offers for many ids with one JOIN per chunk.
+    offers.match_id is VARCHAR, so the join compares strings and stays on
+    the unique_offer_per_match index.
+    """
+    grouped: Dict[int, Dict] = {}
+    with db_cursor(dictionary=True) as cur:
+        for chunk in chunks(list(match_ids)):
+            cur.execute(
+                FULL_MATCH_SQL.format(ids=placeholders(len(chunk))), list(chunk)
+            )
+            for row in cur.fetchall():
+                dossier = grouped.setdefault(row["id"], {"row": row, "offers": []})
+                if row["offer_id"] is not None:
+                    dossier["offers"].append(row)
+
+    resources = {}
+    for match_id, dossier in grouped.items():
+        row, offer_rows = dossier["row"], dossier["offers"]
+        stamps = [_modified_at(row)] + [r["offer_updated_at"] for r in offer_rows]
+        stamps = [stamp for stamp in stamps if stamp]
+        body = {
+            "match": convert_match_row(row),
+            "offers": [
+                convert_offer_row({
+                    "id": r["offer_id"],
+                    "matchId": r["offer_match_id"],
+                    "recipientId": r["offer_recipient_id"],
+                    "status": r["offer_status"],
+                    "createdAt": r["offer_created_at"],
+                    "updatedAt": r["offer_updated_at"],
+                })
+                for r in offer_rows
+            ],
+        }
+        resources[match_id] = make_resource(body, max(stamps) if stamps else None)
+    return resources
+
+
+def get_full_match(match_id: int):
+    resource = _select_full_matches([match_id]).get(match_id)
+    return resource.body if resource else None
 
-    match = _convert_match_row(match)
 
-    cur.execute("SELECT * FROM offers WHERE match_id = %s", (match_id,))
-    offers = cur.fetchall()
+def get_full_match_resource(match_id: int) -> Optional[CachedResource]:
+    """Full match + ETag/Last-Modified (newest of match and offers), cached."""
+    return get_or_load(
+        full_match_key(match_id),
+        lambda: _select_full_matches([match_id]).get(match_id),
+    )
 
-    cur.close()
-    conn.close()
 
-    return {"match": match, "offers": offers}
+def get_full_matches(match_ids: Sequence[int]) -> Dict[int, Dict]:
+    """Dossiers for many matches: cache hits plus one batched query for misses."""
+    resources = get_or_load_many(match_ids, full_match_key, _select_full_matches)
+    return {match_id: resource.body for match_id, resource in resources.items()}
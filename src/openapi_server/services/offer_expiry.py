@@ -0,0 +1,299 @@
+"""
+Expiry of pending offers at their deadline.
+
+Deadlines of pending offers are kept in a min-heap. New offers are loaded
+incrementally (id above a high-water mark, through idx_offers_status_id), so
+steady state costs one indexed query per poll plus O(log n) per offer; the
+table is never scanned for due rows. Due offers are flipped to 'expired' in
+batches, each with its outbox event, an offers version bump and read cache
+invalidation. A periodic resync rebuilds the heap to pick up offers the
+high-water mark cannot see (committed out of id order, or set back to
+pending).
+"""
+
+import heapq
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from openapi_server.db.bulk import placeholders
+from openapi_server.db.connection import db_connection, db_cursor
+from openapi_server.services.collection_versions import (
+    OFFERS_COLLECTION,
+    bump_version,
+)
+from openapi_server.services.outbox_service import enqueue_events, outbox_publisher
+from openapi_server.services.read_cache import invalidate_offer
+from openapi_server.utils.backoff import FailureBackoff
+
+# Deadline of offers without their own expires_at, from created_at
+OFFER_TTL_SECONDS = float(os.getenv("OFFER_TTL_SECONDS", 4 * 3600))
+OFFER_EXPIRY_POLL_SECONDS = float(os.getenv("OFFER_EXPIRY_POLL_SECONDS", 5))
+OFFER_EXPIRY_RESYNC_SECONDS = float(os.getenv("OFFER_EXPIRY_RESYNC_SECONDS", 600))
+OFFER_EXPIRY_BATCH_SIZE = int(os.getenv("OFFER_EXPIRY_BATCH_SIZE", 500))
+
+# Seconds from the DB's now to the offer's deadline (negative once due).
+# Offer timestamps are written as naive UTC, so compare in UTC, not in the
+# session time zone.
+_REMAINING = (
+    "TIMESTAMPDIFF(SECOND, UTC_TIMESTAMP(), "
+    "COALESCE(expires_at, TIMESTAMPADD(SECOND, %s, created_at)))"
+)
+
+
+def _expired_event(row: Dict) -> Dict:
+    return {
+        "offer_id": row["id"],
+        "match_id": row["match_id"],
+        "recipient_id": row["recipient_id"],
+        "status": "expired",
+        "message": "Offer expired without a response",
+    }
+
+
+class OfferExpiryScheduler:
+    """
+    Background thread expiring pending offers. Deadlines are converted to
+    local monotonic time from the DB's own clock, so skew between this host
+    and MySQL does not matter. The heap is guarded by a lock, as stats()
+    reads it from request threads.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = OFFER_TTL_SECONDS,
+        poll_seconds: float = OFFER_EXPIRY_POLL_SECONDS,
+        resync_seconds: float = OFFER_EXPIRY_RESYNC_SECONDS,
+        batch_size: int = OFFER_EXPIRY_BATCH_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self.resync_seconds = resync_seconds
+        self.batch_size = batch_size
+        self._clock = clock
+        self._heap_lock = threading.Lock()
+        self._heap: List[Tuple[float, int]] = []
+        self._queued: set = set()
+        self._high_water = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backoff = FailureBackoff("OFFER EXPIRY")
+        self.loaded = 0
+        self.expired = 0
+        self.resyncs = 0
+
+    # -----------------------------------------------------
+    # Heap
+    # -----------------------------------------------------
+    def _push(self, offer_id: int, remaining: float) -> None:
+        with self._heap_lock:
+            if offer_id in self._queued:
+                return
+            heapq.heappush(self._heap, (self._clock() + remaining, offer_id))
+            self._queued.add(offer_id)
+
+    def _pop_due(self) -> List[int]:
+        now = self._clock()
+        due = []
+        with self._heap_lock:
+            while (
+                self._heap and self._heap[0][0] <= now and len(due) < self.batch_size
+            ):
+                _, offer_id = heapq.heappop(self._heap)
+                self._queued.discard(offer_id)
+                due.append(offer_id)
+        return due
+
+    def next_due_in(self) -> Optional[float]:
+        with self._heap_lock:
+            if not self._heap:
+                return None
+            return self._heap[0][0] - self._clock()
+
+    # -----------------------------------------------------
+    # DB
+    # -----------------------------------------------------
+    def load_new(self) -> int:
+        """Push pending offers above the high-water id. Returns how many."""
+        count = 0
+        while True:
+            with db_cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT id, {_REMAINING}
+                    FROM offers
+                    WHERE status = 'pending' AND id > %s
+                    ORDER BY id
+                    LIMIT %s
+                    """,
+                    (self.ttl_seconds, self._high_water, self.batch_size),
+                )
+                rows = cur.fetchall()
+            for offer_id, remaining in rows:
+                self._push(offer_id, float(remaining))
+            if rows:
+                self._high_water = rows[-1][0]
+            count += len(rows)
+            if len(rows) < self.batch_size:
+                break
+        self.loaded += count
+        return count
+
+    def resync(self) -> int:
+        """Rebuild the heap from every pending offer."""
+        with self._heap_lock:
+            self._heap, self._queued = [], set()
+        self._high_water = 0
+        self.resyncs += 1
+        return self.load_new()
+
+    def expire_due(self) -> int:
+        """
+        Expire one batch of due offers. Offers no longer pending are
+        dropped; ones whose deadline moved, or that another transaction
+        holds locked, are pushed back. If the batch fails, every offer of
+        it is pushed back as still due. Returns how many were expired.
+        """
+        offer_ids = self._pop_due()
+        if not offer_ids:
+            return 0
+
+        try:
+            due = self._expire_batch(offer_ids)
+        except Exception:
+            for offer_id in offer_ids:
+                self._push(offer_id, 0.0)
+            raise
+
+        for row in due:
+            invalidate_offer(row["id"], row["match_id"])
+        if due:
+            outbox_publisher.wake()
+        self.expired += len(due)
+        return len(due)
+
+    def _expire_batch(self, offer_ids: List[int]) -> List[Dict]:
+        with db_connection() as conn:
+            cur = conn.cursor(dictionary=True)
+            try:
+                # SKIP LOCKED: rows another instance or a writer holds are
+                # not waited for; they are retried below
+                cur.execute(
+                    f"""
+                    SELECT id, match_id, recipient_id, {_REMAINING} AS remaining
+                    FROM offers
+                    WHERE id IN ({placeholders(len(offer_ids))})
+                      AND status = 'pending'
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    (self.ttl_seconds, *offer_ids),
+                )
+                rows = cur.fetchall()
+                due = [r for r in rows if r["remaining"] <= 0]
+                for row in rows:
+                    if row["remaining"] > 0:
+                        self._push(row["id"], float(row["remaining"]))
+
+                # Skipped rows are either no longer pending or locked; a
+                # plain (non-locking) read tells them apart
+                found = {row["id"] for row in rows}
+                skipped = [i for i in offer_ids if i not in found]
+                if skipped:
+                    cur.execute(
+                        f"""
+                        SELECT id FROM offers
+                        WHERE id IN ({placeholders(len(skipped))})
+                          AND status = 'pending'
+                        """,
+                        skipped,
+                    )
+                    for row in cur.fetchall():
+                        self._push(row["id"], self.poll_seconds)
+
+                if due:
+                    cur.execute(
+                        f"""
+                        UPDATE offers
+                        SET status = 'expired', updated_at = UTC_TIMESTAMP()
+                        WHERE id IN ({placeholders(len(due))})
+                        """,
+                        [r["id"] for r in due],
+                    )
+                    bump_version(cur, OFFERS_COLLECTION)
+                    enqueue_events(cur, [_expired_event(r) for r in due])
+                conn.commit()
+            finally:
+                cur.close()
+        return due
+
+    # -----------------------------------------------------
+    # Thread
+    # -----------------------------------------------------
+    def _run(self):
+        next_load = next_resync = 0.0
+        while not self._stop.is_set():
+            try:
+                now = self._clock()
+                if now >= next_resync:
+                    self.resync()
+                    next_resync = now + self.resync_seconds
+                    next_load = now + self.poll_seconds
+                elif now >= next_load:
+                    self.load_new()
+                    next_load = now + self.poll_seconds
+                expired = self.expire_due()
+            except Exception as exc:
+                # DB down: retry on the backoff, ignoring wakes
+                self._backoff.failed(exc)
+                self._stop.wait(self._backoff.delay(self.poll_seconds))
+                continue
+            self._backoff.succeeded()
+
+            # A full batch means more offers are already due
+            if expired >= self.batch_size:
+                continue
+
+            wait = self.poll_seconds
+            due_in = self.next_due_in()
+            if due_in is not None:
+                wait = min(wait, max(due_in, 0.0))
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="offer-expiry", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        due_in = self.next_due_in()
+        with self._heap_lock:
+            scheduled = len(self._heap)
+        return {
+            "scheduled": scheduled,
+            "high_water_id": self._high_water,
+            "next_due_in_seconds": round(due_in, 3) if due_in is not None else None,
+            "loaded": self.loaded,
+            "expired": self.expired,
+            "resyncs": self.resyncs,
+        }
+
+
+offer_expiry = OfferExpiryScheduler()
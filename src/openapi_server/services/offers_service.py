@@ -1,16 +1,34 @@
-import json
-import hashlib
+import functools
 from datetime import datetime
 from typing import List, Dict, Any, Tuple, Optional
 
-from openapi_server.db.connection import get_connection
+from openapi_server.db.async_db import run_db
+from openapi_server.db.bulk import insert_rows
+from openapi_server.db.connection import db_connection, db_cursor
+from openapi_server.db.filters import where_clause
 from openapi_server.models.offer import Offer, OfferCreate, OfferUpdate
+from openapi_server.services.collection_versions import (
+    OFFERS_COLLECTION,
+    bump_version,
+    read_version,
+)
+from openapi_server.services.match_persistence import offer_ids_by_match
+from openapi_server.services.read_cache import (
+    CachedResource,
+    invalidate_offer,
+    load_resource,
+    make_resource,
+    offer_key,
+    resource_cache,
+)
+from openapi_server.utils.cursors import decode_cursor, encode_cursor
+from openapi_server.utils.http_cache import make_etag
 
 
 # ---------------------------------------------------------
 # Convert a raw DB row into Offer model-compatible dict
 # ---------------------------------------------------------
-def _convert_row(row: Dict[str, Any]) -> Dict[str, Any]:
+def convert_offer_row(row: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "id": str(row.get("id")) if row.get("id") is not None else None,
         "matchId": str(row.get("matchId")),
@@ -33,136 +51,312 @@ def _convert_row(row: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+OFFER_COLUMNS = """
+    id,
+    match_id AS matchId,
+    recipient_id AS recipientId,
+    status,
+    created_at AS createdAt,
+    updated_at AS updatedAt
+"""
+
+
+def _fetch_offer_row(cur, offer_id: int) -> Optional[Dict[str, Any]]:
+    cur.execute(
+        f"SELECT {OFFER_COLUMNS} FROM offers WHERE id = %s",
+        (offer_id,),
+    )
+    return cur.fetchone()
+
+
+def _fetch_offer(cur, offer_id: int) -> Optional[Offer]:
+    row = _fetch_offer_row(cur, offer_id)
+    if not row:
+        return None
+    return Offer.model_validate(convert_offer_row(row))
+
+
 # ---------------------------------------------------------
-# GET /offers
+# Blocking queries (run on the DB executor, see db/async_db.py)
 # ---------------------------------------------------------
-async def get_offers(limit: int, offset: int) -> Tuple[List[Offer], str]:
+def _select_offers(
+    limit: int,
+    offset: int = 0,
+    after_id: Optional[int] = None,
+    status: Optional[str] = None,
+    recipient_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
     """
-    Fetch offers from DB + generate ETag.
-    Returns: (list of Offer, etag)
+    Rows in id order. Filters are served by (status, id) and
+    (recipient_id, id); after_id seeks instead of skipping rows.
     """
+    seek = []
+    if after_id is not None:
+        seek = [("id > %s", [after_id])]
+        offset = 0
+    where, params = where_clause(
+        {"status": status, "recipient_id": recipient_id}, seek
+    )
 
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
+    with db_cursor(dictionary=True) as cur:
+        cur.execute(
+            f"""
+            SELECT {OFFER_COLUMNS}
+            FROM offers
+            {where}
+            ORDER BY id ASC
+            LIMIT %s OFFSET %s
+            """,
+            (*params, limit, offset),
+        )
+        return cur.fetchall()
 
-    cur.execute(
-        """
-        SELECT
-            id,
-            match_id AS matchId,
-            recipient_id AS recipientId,
-            status,
-            created_at AS createdAt,
-            updated_at AS updatedAt
-        FROM offers
-        ORDER BY id ASC
-        LIMIT %s OFFSET %s
-        """,
-        (limit, offset),
-    )
 
-    rows = cur.fetchall()
+def _select_offer(offer_id: int) -> Optional[Offer]:
+    with db_cursor(dictionary=True) as cur:
+        return _fetch_offer(cur, offer_id)
 
-    cur.close()
-    conn.close()
 
-    converted = [_convert_row(r) for r in rows]
-    offers = [Offer.model_validate(c) for c in converted]
+def _select_offer_resource(offer_id: int) -> Optional[CachedResource]:
+    with db_cursor(dictionary=True) as cur:
+        row = _fetch_offer_row(cur, offer_id)
+    if not row:
+        return None
+    offer = Offer.model_validate(convert_offer_row(row))
+    return make_resource(offer, row.get("updatedAt") or row.get("createdAt"))
+
+
+def _insert_offer(data: Dict[str, Any]) -> Offer:
+    now = datetime.utcnow()
 
-    # Create ETag based on deterministic JSON encoding
-    body = json.dumps([o.model_dump(by_alias=True) for o in offers], default=str)
-    etag = hashlib.sha1(body.encode()).hexdigest()
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        cur.execute(
+            """
+            INSERT INTO offers (match_id, recipient_id, status, created_at, updated_at)
+            VALUES (%s, %s, %s, %s, %s)
+            """,
+            (
+                data["matchId"],
+                data["recipientId"],
+                data.get("status") or "pending",
+                now,
+                now,
+            ),
+        )
+        new_id = cur.lastrowid
+        bump_version(cur, OFFERS_COLLECTION)
+        conn.commit()
+
+        # Fetch inserted record on the same connection
+        offer = _fetch_offer(cur, new_id)
+        cur.close()
+
+    # The match's full view embeds its offers
+    invalidate_offer(new_id, data["matchId"])
+    return offer
+
+
+def _upsert_offers(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    match_ids = [str(item["matchId"]) for item in items]
+    rows = [
+        (
+            item["matchId"],
+            item["recipientId"],
+            item.get("status") or "pending",
+            now,
+            now,
+        )
+        for item in items
+    ]
+
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            existing = set(offer_ids_by_match(cur, match_ids))
+            insert_rows(
+                cur,
+                "offers",
+                ("match_id", "recipient_id", "status", "created_at", "updated_at"),
+                rows,
+                suffix=(
+                    "ON DUPLICATE KEY UPDATE recipient_id = VALUES(recipient_id), "
+                    "status = VALUES(status), updated_at = VALUES(updated_at)"
+                ),
+            )
+            ids = offer_ids_by_match(cur, match_ids)
+            bump_version(cur, OFFERS_COLLECTION)
+            conn.commit()
+        finally:
+            cur.close()
+
+    results = []
+    for index, match_id in enumerate(match_ids):
+        results.append({
+            "index": index,
+            "id": str(ids[match_id]),
+            "result": "updated" if match_id in existing else "created",
+        })
+        existing.add(match_id)
+        invalidate_offer(ids[match_id], match_id)
+    return results
+
+
+def _update_offer(offer_id: int, updates: Dict[str, Any]) -> Optional[Offer]:
+    # Build SET clause dynamically
+    set_clause = ", ".join([f"{key}=%s" for key in updates.keys()])
 
-    return offers, etag
+    with db_connection() as conn:
+        cur = conn.cursor(dictionary=True)
+        # A matchId change moves the offer out of the old match's full view
+        cur.execute(
+            "SELECT match_id FROM offers WHERE id = %s FOR UPDATE", (offer_id,)
+        )
+        row = cur.fetchone()
+        cur.execute(
+            f"""
+            UPDATE offers
+            SET {set_clause}, updated_at = %s
+            WHERE id = %s
+            """,
+            (*updates.values(), datetime.utcnow(), offer_id),
+        )
+        if cur.rowcount:
+            bump_version(cur, OFFERS_COLLECTION)
+        conn.commit()
+
+        offer = _fetch_offer(cur, offer_id)
+        cur.close()
+
+    invalidate_offer(offer_id, offer.match_id if offer else None)
+    if row and (offer is None or row["match_id"] != offer.match_id):
+        invalidate_offer(offer_id, row["match_id"])
+    return offer
+
+
+def _delete_offer(offer_id: int) -> bool:
+    with db_cursor(commit=True) as cur:
+        cur.execute("SELECT match_id FROM offers WHERE id = %s", (offer_id,))
+        row = cur.fetchone()
+        cur.execute("DELETE FROM offers WHERE id = %s", (offer_id,))
+        deleted = cur.rowcount > 0
+        if deleted:
+            bump_version(cur, OFFERS_COLLECTION)
+
+    invalidate_offer(offer_id, row[0] if row else None)
+    return deleted
 
 
 # ---------------------------------------------------------
-# GET /offers/{id}
+# GET /offers
 # ---------------------------------------------------------
-async def get_offer(offer_id: int) -> Optional[Offer]:
+def parse_offers_cursor(after: Optional[str]) -> Optional[int]:
+    """Offer id encoded in an `after` cursor. Raises ValueError if malformed."""
+    if not after:
+        return None
+    try:
+        return int(decode_cursor(after, 1)[0])
+    except (TypeError, ValueError) as exc:
+        # Also catches well-formed JSON of the wrong type, e.g. [null]
+        raise ValueError("malformed cursor") from exc
+
+
+async def get_offers_etag(
+    limit: int,
+    offset: int = 0,
+    after: Optional[str] = None,
+    status: Optional[str] = None,
+    recipient_id: Optional[str] = None,
+) -> str:
     """
-    Retrieve a single offer.
+    ETag of a page, from the offers version stamp and the query alone:
+    one primary-key lookup, no rows fetched. Read it *before* the page so
+    a concurrent write can only make the tag stale, never the content.
     """
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-
-    cur.execute(
-        """
-        SELECT
-            id,
-            match_id AS matchId,
-            recipient_id AS recipientId,
-            status,
-            created_at AS createdAt,
-            updated_at AS updatedAt
-        FROM offers
-        WHERE id = %s
-        """,
-        (offer_id,),
+    version = await run_db(read_version, OFFERS_COLLECTION)
+    return make_etag(
+        OFFERS_COLLECTION, version, limit, offset, after, status, recipient_id
     )
 
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
 
-    if not row:
-        return None
+async def get_offers(
+    limit: int,
+    offset: int = 0,
+    after: Optional[str] = None,
+    status: Optional[str] = None,
+    recipient_id: Optional[str] = None,
+) -> Tuple[List[Offer], Optional[str]]:
+    """
+    Fetch one page of offers from DB.
+    `after` is the cursor of the previous page (offset is ignored with it).
+    Returns: (list of Offer, next cursor or None)
+    Raises ValueError for a malformed cursor.
+    """
+    after_id = parse_offers_cursor(after)
+
+    # One extra row tells whether a next page exists
+    rows = await run_db(
+        _select_offers, limit + 1, offset, after_id, status, recipient_id
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]["id"]])
 
-    return Offer.model_validate(_convert_row(row))
+    converted = [convert_offer_row(r) for r in rows]
+    offers = [Offer.model_validate(c) for c in converted]
+
+    return offers, next_cursor
 
 
 # ---------------------------------------------------------
-# POST /offers
+# GET /offers/{id}
 # ---------------------------------------------------------
-async def create_offer(payload: OfferCreate) -> Offer:
+async def get_offer(offer_id: int) -> Optional[Offer]:
     """
-    Insert a new offer and return the full Offer record.
+    Retrieve a single offer.
     """
+    return await run_db(_select_offer, offer_id)
 
-    data = payload.model_dump(by_alias=True)
-    now = datetime.utcnow()
 
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-
-    cur.execute(
-        """
-        INSERT INTO offers (match_id, recipient_id, status, created_at, updated_at)
-        VALUES (%s, %s, %s, %s, %s)
-        """,
-        (
-            data["matchId"],
-            data["recipientId"],
-            data.get("status") or "pending",
-            now,
-            now,
-        ),
+async def get_offer_resource(offer_id: int) -> Optional[CachedResource]:
+    """
+    Offer + ETag/Last-Modified from the read cache; only misses go to the DB.
+    """
+    key = offer_key(offer_id)
+    cached = resource_cache.get(key)
+    if cached is not None:
+        return cached
+    return await run_db(
+        load_resource, key, functools.partial(_select_offer_resource, offer_id)
     )
 
-    conn.commit()
-    new_id = cur.lastrowid
 
-    # Fetch inserted record
-    cur.execute(
-        """
-        SELECT
-            id,
-            match_id AS matchId,
-            recipient_id AS recipientId,
-            status,
-            created_at AS createdAt,
-            updated_at AS updatedAt
-        FROM offers
-        WHERE id = %s
-        """,
-        (new_id,),
-    )
+# ---------------------------------------------------------
+# POST /offers
+# ---------------------------------------------------------
+async def create_offer(payload: OfferCreate) -> Offer:
+    """
+    Insert a new offer and return the full Offer record.
+    """
+    return await run_db(_insert_offer, payload.model_dump(by_alias=True))
 
-    row = cur.fetchone()
-    cur.close()
-    conn.close()
 
-    return Offer.model_validate(_convert_row(row))
+# ---------------------------------------------------------
+# POST /offers:batch
+# ---------------------------------------------------------
+async def create_offers_batch(payloads: List[OfferCreate]) -> List[Dict[str, Any]]:
+    """
+    Upsert many offers in one transaction with multi-row statements.
+    unique_offer_per_match decides create vs update: an offer for an
+    existing matchId, or one repeated earlier in the batch, is updated.
+    Returns one {"index", "id", "result"} per payload, in order.
+    """
+    if not payloads:
+        return []
+    items = [p.model_dump(by_alias=True) for p in payloads]
+    return await run_db(_upsert_offers, items)
 
 
 # ---------------------------------------------------------
@@ -177,28 +371,7 @@ async def update_offer(offer_id: int, payload: OfferUpdate) -> Optional[Offer]:
     if not updates:
         return await get_offer(offer_id)
 
-    # Build SET clause dynamically
-    set_clause = ", ".join([f"{key}=%s" for key in updates.keys()])
-    values = list(updates.values())
-    values.append(offer_id)
-
-    conn = get_connection()
-    cur = conn.cursor(dictionary=True)
-
-    cur.execute(
-        f"""
-        UPDATE offers
-        SET {set_clause}, updated_at = %s
-        WHERE id = %s
-        """,
-        (*updates.values(), datetime.utcnow(), offer_id),
-    )
-
-    conn.commit()
-    cur.close()
-    conn.close()
-
-    return await get_offer(offer_id)
+    return await run_db(_update_offer, offer_id, updates)
 
 
 # ---------------------------------------------------------
@@ -208,14 +381,4 @@ async def delete_offer(offer_id: int) -> bool:
     """
     Delete an offer.
     """
-    conn = get_connection()
-    cur = conn.cursor()
-
-    cur.execute("DELETE FROM offers WHERE id = %s", (offer_id,))
-    deleted = cur.rowcount > 0
-
-    conn.commit()
-    cur.close()
-    conn.close()
-
-    return deleted
+    return await run_db(_delete_offer, offer_id)
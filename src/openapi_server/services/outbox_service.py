@@ -0,0 +1,184 @@
+"""
+Transactional outbox for Pub/Sub events.
+
+Writers add events to `event_outbox` with the same cursor (and therefore the
+same transaction) as the rows the events describe, so an event exists if and
+only if its rows were committed. A background OutboxPublisher drains pending
+rows in batches through the batching publisher and marks them published.
+"""
+
+import os
+import json
+import threading
+from concurrent.futures import wait
+from typing import Dict, List, Optional
+
+from openapi_server.clients.pubsub_client import get_publisher, topic_path
+from openapi_server.db.bulk import insert_rows, placeholders
+from openapi_server.db.connection import db_connection
+from openapi_server.utils.backoff import FailureBackoff
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 200))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", 2.0))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 10))
+OUTBOX_PUBLISH_TIMEOUT = float(os.getenv("OUTBOX_PUBLISH_TIMEOUT", 30.0))
+
+
+# ---------------------------------------------------------
+# WRITE SIDE (inside the caller's transaction)
+# ---------------------------------------------------------
+def enqueue_events(cur, events: List[Dict], topic: Optional[str] = None) -> None:
+    """Add events to the outbox using the caller's cursor; caller commits."""
+    if not events:
+        return
+    insert_rows(
+        cur,
+        "event_outbox",
+        ("topic", "payload"),
+        [(topic or topic_path, json.dumps(e, default=str)) for e in events],
+    )
+
+
+# ---------------------------------------------------------
+# READ SIDE (background publisher)
+# ---------------------------------------------------------
+class OutboxPublisher:
+    """
+    Background thread that publishes pending outbox rows in batches.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED, so several instances can
+    drain the same table without publishing a row twice concurrently.
+    Delivery is at-least-once: a crash after publish but before commit
+    republishes the batch.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = OUTBOX_BATCH_SIZE,
+        poll_seconds: float = OUTBOX_POLL_SECONDS,
+        max_attempts: int = OUTBOX_MAX_ATTEMPTS,
+    ):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backoff = FailureBackoff("OUTBOX DRAIN")
+        self.published = 0
+        self.failed = 0
+
+    def drain_once(self) -> int:
+        """Publish one batch. Returns the number of rows claimed."""
+        with db_connection() as conn:
+            cur = conn.cursor(dictionary=True)
+            try:
+                cur.execute(
+                    """
+                    SELECT id, topic, payload, attempts
+                    FROM event_outbox
+                    WHERE status = 'pending'
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    (self.batch_size,),
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    conn.commit()
+                    return 0
+
+                publisher = get_publisher()
+                futures = {}
+                for row in rows:
+                    data = row["payload"]
+                    if isinstance(data, str):
+                        data = data.encode("utf-8")
+                    futures[row["id"]] = publisher.publish(row["topic"], bytes(data))
+
+                wait(futures.values(), timeout=OUTBOX_PUBLISH_TIMEOUT)
+
+                published, errors = [], {}
+                for outbox_id, future in futures.items():
+                    if future.done() and future.exception() is None:
+                        published.append(outbox_id)
+                    elif future.done():
+                        errors[outbox_id] = repr(future.exception())
+                    else:
+                        errors[outbox_id] = "publish timeout"
+
+                if published:
+                    cur.execute(
+                        f"""
+                        UPDATE event_outbox
+                        SET status = 'published', published_at = CURRENT_TIMESTAMP
+                        WHERE id IN ({placeholders(len(published))})
+                        """,
+                        published,
+                    )
+
+                attempts = {row["id"]: row["attempts"] for row in rows}
+                for outbox_id, error in errors.items():
+                    cur.execute(
+                        """
+                        UPDATE event_outbox
+                        SET attempts = attempts + 1, last_error = %s, status = %s
+                        WHERE id = %s
+                        """,
+                        (
+                            error[:512],
+                            "failed"
+                            if attempts[outbox_id] + 1 >= self.max_attempts
+                            else "pending",
+                            outbox_id,
+                        ),
+                    )
+
+                conn.commit()
+                self.published += len(published)
+                self.failed += len(errors)
+                return len(rows)
+            finally:
+                cur.close()
+
+    def wake(self) -> None:
+        """Ask the publisher to drain now instead of at the next poll."""
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                claimed = self.drain_once()
+            except Exception as exc:
+                # DB or broker down: retry on the backoff, ignoring wakes
+                self._backoff.failed(exc)
+                self._stop.wait(self._backoff.delay(self.poll_seconds))
+                continue
+            self._backoff.succeeded()
+
+            # A full batch means there is probably more waiting
+            if claimed >= self.batch_size:
+                continue
+
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="outbox-publisher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+outbox_publisher = OutboxPublisher()
@@ -0,0 +1,125 @@
+"""
+In-process read cache for single match / full match / offer resources.
+
+Entries hold the response body with its ETag and Last-Modified, so a hit
+answers both 200s and 304s without touching MySQL. Every write path in this
+service invalidates the keys it touches; the TTL bounds staleness for writes
+made by other processes.
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence
+
+from openapi_server.utils.http_cache import make_etag
+from openapi_server.utils.ttl_cache import TTLCache
+
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", 10000))
+READ_CACHE_TTL = float(os.getenv("READ_CACHE_TTL", 30))
+
+resource_cache = TTLCache(maxsize=READ_CACHE_SIZE, ttl=READ_CACHE_TTL)
+
+# Bumped on every invalidation; a load that raced one is not cached
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+class CachedResource(NamedTuple):
+    body: Any
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def make_resource(body: Any, last_modified: Optional[datetime]) -> CachedResource:
+    return CachedResource(body, make_etag(body), last_modified)
+
+
+def get_or_load(
+    key: Hashable, loader: Callable[[], Optional[CachedResource]]
+) -> Optional[CachedResource]:
+    """Cached resource, or loader() cached if nothing was invalidated meanwhile."""
+    cached = resource_cache.get(key)
+    if cached is not None:
+        return cached
+    return load_resource(key, loader)
+
+
+def load_resource(
+    key: Hashable, loader: Callable[[], Optional[CachedResource]]
+) -> Optional[CachedResource]:
+    """loader(), cached unless an invalidation ran while it was loading."""
+    generation = _generation
+    resource = loader()
+    if resource is not None and generation == _generation:
+        resource_cache.set(key, resource)
+    return resource
+
+
+def get_or_load_many(
+    ids: Sequence,
+    key_fn: Callable[[Any], Hashable],
+    loader: Callable[[List], Dict[Any, CachedResource]],
+) -> Dict[Any, CachedResource]:
+    """
+    Batched get_or_load: cached resources by id, with every miss loaded by
+    one loader(missing_ids) call. Ids the loader does not return are absent.
+    """
+    found: Dict[Any, CachedResource] = {}
+    missing = []
+    for resource_id in ids:
+        cached = resource_cache.get(key_fn(resource_id))
+        if cached is None:
+            missing.append(resource_id)
+        else:
+            found[resource_id] = cached
+
+    if missing:
+        generation = _generation
+        loaded = loader(missing)
+        if generation == _generation:
+            for resource_id, resource in loaded.items():
+                resource_cache.set(key_fn(resource_id), resource)
+        found.update(loaded)
+    return found
+
+
+def match_key(match_id) -> tuple:
+    return ("match", int(match_id))
+
+
+def full_match_key(match_id) -> tuple:
+    return ("full_match", int(match_id))
+
+
+def offer_key(offer_id) -> tuple:
+    return ("offer", int(offer_id))
+
+
+def _invalidate(key_fn, resource_id) -> None:
+    global _generation
+    try:
+        key = key_fn(resource_id)
+    except (TypeError, ValueError):
+        # offers.match_id is free text; non-numeric ids are never cached
+        return
+    with _generation_lock:
+        _generation += 1
+    resource_cache.invalidate(key)
+
+
+def invalidate_match(match_id) -> None:
+    """Drop a match and its full view."""
+    _invalidate(match_key, match_id)
+    _invalidate(full_match_key, match_id)
+
+
+def invalidate_offer(offer_id, match_id=None) -> None:
+    """Drop an offer and the full view of its match, which embeds it."""
+    _invalidate(offer_key, offer_id)
+    if match_id is not None:
+        _invalidate(full_match_key, match_id)
+
+
+def cache_stats() -> Dict[str, Any]:
+    return resource_cache.stats()
@@ -0,0 +1,233 @@
+"""
+Retention for tables that only ever grow.
+
+Finished async tasks, published outbox events and (with the db job store)
+expired jobs are deleted once older than their policy's age, or moved to
+an archive table instead. A run walks each policy in small chunks, one
+short transaction each, with a pause in between, so it never holds locks
+for long or starves the request path. Runs happen on a background thread
+every RETENTION_INTERVAL_SECONDS and on demand (POST /internal/retention/run
+wakes that thread; the request does not wait for the run).
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from openapi_server.db.bulk import placeholders
+from openapi_server.db.connection import db_connection
+from openapi_server.services.job_store import JOB_STORE_BACKEND, DbJobStore
+
+RETENTION_TASK_SECONDS = float(os.getenv("RETENTION_TASK_SECONDS", 7 * 86400))
+RETENTION_OUTBOX_SECONDS = float(os.getenv("RETENTION_OUTBOX_SECONDS", 3 * 86400))
+RETENTION_ARCHIVE_TASKS = os.getenv("RETENTION_ARCHIVE_TASKS", "false") == "true"
+RETENTION_CHUNK_SIZE = int(os.getenv("RETENTION_CHUNK_SIZE", 500))
+# Pause between chunks, giving other transactions the rows' pages
+RETENTION_PAUSE_SECONDS = float(os.getenv("RETENTION_PAUSE_SECONDS", 0.05))
+# Upper bound on chunks per policy per run; the rest waits for the next run
+RETENTION_MAX_CHUNKS = int(os.getenv("RETENTION_MAX_CHUNKS", 2000))
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", 3600))
+
+_CUTOFF = "TIMESTAMPADD(SECOND, %s, CURRENT_TIMESTAMP)"
+
+
+class RetentionPolicy(NamedTuple):
+    name: str
+    table: str
+    # Rows to reclaim; `{cutoff}` is replaced by now - max_age_seconds
+    where: str
+    max_age_seconds: Optional[float] = None
+    archive_table: Optional[str] = None
+    # Deletes up to n matching rows itself, in place of reclaim_chunk
+    reclaim: Optional[Callable[[int], int]] = None
+
+
+def default_policies() -> List[RetentionPolicy]:
+    policies = [
+        RetentionPolicy(
+            "async_tasks",
+            "async_tasks",
+            "status IN ('completed', 'failed') AND updated_at < {cutoff}",
+            RETENTION_TASK_SECONDS,
+            "async_tasks_archive" if RETENTION_ARCHIVE_TASKS else None,
+        ),
+        RetentionPolicy(
+            "event_outbox",
+            "event_outbox",
+            "status = 'published' AND published_at < {cutoff}",
+            RETENTION_OUTBOX_SECONDS,
+        ),
+    ]
+    if JOB_STORE_BACKEND == "db":
+        # The job store's own purge, in expiry order along idx_jobs_expires
+        policies.append(
+            RetentionPolicy(
+                "jobs",
+                "jobs",
+                "expires_at <= CURRENT_TIMESTAMP",
+                reclaim=DbJobStore().purge_expired,
+            )
+        )
+    return policies
+
+
+def reclaim_chunk(policy: RetentionPolicy, chunk_size: int) -> int:
+    """
+    Archive (optionally) and delete one chunk of rows. SKIP LOCKED keeps
+    concurrent runs on other instances off each other's rows.
+    Returns the number of rows reclaimed.
+    """
+    where, params = policy.where, []
+    if policy.max_age_seconds is not None:
+        where = where.format(cutoff=_CUTOFF)
+        params.append(-policy.max_age_seconds)
+
+    with db_connection() as conn:
+        cur = conn.cursor()
+        try:
+            # No ORDER BY: the index range is read in order and stops at LIMIT
+            cur.execute(
+                f"""
+                SELECT id FROM {policy.table}
+                WHERE {where}
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (*params, chunk_size),
+            )
+            ids = [row[0] for row in cur.fetchall()]
+            if ids:
+                id_list = placeholders(len(ids))
+                if policy.archive_table:
+                    cur.execute(
+                        f"INSERT IGNORE INTO {policy.archive_table} "
+                        f"SELECT * FROM {policy.table} WHERE id IN ({id_list})",
+                        ids,
+                    )
+                cur.execute(
+                    f"DELETE FROM {policy.table} WHERE id IN ({id_list})", ids
+                )
+            conn.commit()
+            return len(ids)
+        finally:
+            cur.close()
+
+
+class RetentionService:
+    """Runs the retention policies periodically on a background thread."""
+
+    def __init__(
+        self,
+        policies: Optional[List[RetentionPolicy]] = None,
+        chunk_size: int = RETENTION_CHUNK_SIZE,
+        pause_seconds: float = RETENTION_PAUSE_SECONDS,
+        max_chunks: int = RETENTION_MAX_CHUNKS,
+        interval_seconds: float = RETENTION_INTERVAL_SECONDS,
+    ):
+        self.policies = policies if policies is not None else default_policies()
+        self.chunk_size = chunk_size
+        self.pause_seconds = pause_seconds
+        self.max_chunks = max_chunks
+        self.interval_seconds = interval_seconds
+        self._run_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.runs = 0
+        self.reclaimed_total: Dict[str, int] = {p.name: 0 for p in self.policies}
+        self.last_run: Optional[Dict] = None
+
+    def run_once(self) -> Dict:
+        """
+        One pass over every policy. Returns rows reclaimed per policy and
+        the run's duration; an overlapping call waits for the running one.
+        """
+        with self._run_lock:
+            started = time.monotonic()
+            reclaimed: Dict[str, int] = {}
+            for policy in self.policies:
+                count = 0
+                for _ in range(self.max_chunks):
+                    if self._stop.is_set():
+                        break
+                    if policy.reclaim is not None:
+                        chunk = policy.reclaim(self.chunk_size)
+                    else:
+                        chunk = reclaim_chunk(policy, self.chunk_size)
+                    count += chunk
+                    if chunk < self.chunk_size:
+                        break
+                    time.sleep(self.pause_seconds)
+                reclaimed[policy.name] = count
+                self.reclaimed_total[policy.name] += count
+
+            self.runs += 1
+            self.last_run = {
+                "reclaimed": reclaimed,
+                "seconds": round(time.monotonic() - started, 3),
+                "finished_at": time.time(),
+            }
+            print("RETENTION RUN:", self.last_run)
+            return self.last_run
+
+    def _run_safely(self) -> None:
+        try:
+            self.run_once()
+        except Exception as exc:
+            print("RETENTION RUN FAILED:", repr(exc))
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            self._run_safely()
+
+    def trigger(self) -> bool:
+        """
+        Start a run in the background. False if one is already running
+        (it covers this request). Without the periodic thread (background
+        workers disabled) the run gets a one-off thread.
+        """
+        if self._run_lock.locked():
+            return False
+        if self._thread is not None and self._thread.is_alive():
+            self._wake.set()
+        else:
+            threading.Thread(
+                target=self._run_safely, name="retention-once", daemon=True
+            ).start()
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="retention", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict:
+        return {
+            "policies": [
+                {k: v for k, v in p._asdict().items() if k != "reclaim"}
+                for p in self.policies
+            ],
+            "running": self._run_lock.locked(),
+            "runs": self.runs,
+            "reclaimed_total": dict(self.reclaimed_total),
+            "last_run": self.last_run,
+        }
+
+
+retention_service = RetentionService()
@@ -0,0 +1,217 @@
+"""
+Vectorized compatibility + scoring for the matcher.
+
+Organs and needs are encoded once into integer/float NumPy arrays (organ type,
+ABO, Rh, urgency, days on the waitlist) so compatibility masks and scores for
+a whole organ batch against the waitlist come out of a single broadcast.
+
+Score of a compatible (organ, need) pair, in [0, 1]:
+
+    priority(need)  = w_urgency * (urgency - 1) / 4
+                    + w_waitlist * min(days_waiting / WAITLIST_CAP_DAYS, 1)
+    bonus(organ, need) = w_abo_identical * [same ABO] + w_rh_match * [same Rh]
+    score = priority + bonus
+
+The need-only part and the small (ABO, Rh) class bonus are exposed separately
+so the greedy matcher can rank candidates without building a full matrix.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from openapi_server.services.waitlist_index import (
+    ABO_COMPATIBILITY,
+    abo_group,
+    rh_factor,
+)
+
+ABO_CODES: Dict[str, int] = {"O": 0, "A": 1, "B": 2, "AB": 3}
+RH_CODES: Dict[str, int] = {"-": 0, "+": 1}
+
+# ABO_COMPATIBLE[donor_abo, recipient_abo]
+ABO_COMPATIBLE = np.zeros((len(ABO_CODES), len(ABO_CODES)), dtype=bool)
+for _donor, _recipients in ABO_COMPATIBILITY.items():
+    for _recipient in _recipients:
+        ABO_COMPATIBLE[ABO_CODES[_donor], ABO_CODES[_recipient]] = True
+
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    "urgency": 0.5,
+    "waitlist": 0.3,
+    "abo_identical": 0.15,
+    "rh_match": 0.05,
+}
+
+WAITLIST_CAP_DAYS = 5 * 365
+MAX_URGENCY = 5
+
+
+def _days_waiting(need: Dict, now: datetime) -> float:
+    raw = need.get("listed_at") or need.get("created_at")
+    if not raw:
+        return 0.0
+    try:
+        listed = raw if isinstance(raw, datetime) else datetime.fromisoformat(str(raw))
+    except ValueError:
+        return 0.0
+    if listed.tzinfo is not None:
+        listed = listed.astimezone(timezone.utc).replace(tzinfo=None)
+    return max((now - listed).total_seconds() / 86400.0, 0.0)
+
+
+class EncodedOrgans:
+    """Column arrays for a batch of organs."""
+
+    def __init__(self, organ_type: np.ndarray, abo: np.ndarray, rh: np.ndarray):
+        self.organ_type = organ_type
+        self.abo = abo
+        self.rh = rh
+
+    def __len__(self) -> int:
+        return len(self.organ_type)
+
+    def take(self, idx: np.ndarray) -> "EncodedOrgans":
+        return EncodedOrgans(self.organ_type[idx], self.abo[idx], self.rh[idx])
+
+
+class EncodedNeeds:
+    """Column arrays for a waitlist."""
+
+    def __init__(
+        self,
+        organ_type: np.ndarray,
+        abo: np.ndarray,
+        rh: np.ndarray,
+        urgency: np.ndarray,
+        days_waiting: np.ndarray,
+    ):
+        self.organ_type = organ_type
+        self.abo = abo
+        self.rh = rh
+        self.urgency = urgency
+        self.days_waiting = days_waiting
+
+    def __len__(self) -> int:
+        return len(self.organ_type)
+
+    def take(self, idx: np.ndarray) -> "EncodedNeeds":
+        return EncodedNeeds(
+            self.organ_type[idx],
+            self.abo[idx],
+            self.rh[idx],
+            self.urgency[idx],
+            self.days_waiting[idx],
+        )
+
+
+class ScoringEngine:
+    """
+    Encodes organs/needs and scores them. Organ type codes are assigned on
+    first sight, so encode organs and needs with the same engine instance.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self._organ_type_codes: Dict[str, int] = {}
+
+    # ---------------------------------------------------------
+    # ENCODING
+    # ---------------------------------------------------------
+    def _organ_type_code(self, organ_type: str) -> int:
+        return self._organ_type_codes.setdefault(
+            organ_type, len(self._organ_type_codes)
+        )
+
+    @staticmethod
+    def _blood_codes(blood_types: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        abo = np.fromiter(
+            (ABO_CODES.get(abo_group(bt), -1) for bt in blood_types),
+            dtype=np.int8, count=len(blood_types),
+        )
+        rh = np.fromiter(
+            (RH_CODES[rh_factor(bt)] for bt in blood_types),
+            dtype=np.int8, count=len(blood_types),
+        )
+        return abo, rh
+
+    def encode_organs(self, organs: Sequence[Dict]) -> EncodedOrgans:
+        organs = [o.get("data", o) for o in organs]
+        organ_type = np.fromiter(
+            (self._organ_type_code(o["organ_type"]) for o in organs),
+            dtype=np.int32, count=len(organs),
+        )
+        abo, rh = self._blood_codes([o.get("blood_type", "O+") for o in organs])
+        return EncodedOrgans(organ_type, abo, rh)
+
+    def encode_needs(
+        self, needs: Sequence[Dict], now: Optional[datetime] = None
+    ) -> EncodedNeeds:
+        now = now or datetime.utcnow()
+        organ_type = np.fromiter(
+            (self._organ_type_code(n["organ_type"]) for n in needs),
+            dtype=np.int32, count=len(needs),
+        )
+        abo, rh = self._blood_codes([n["blood_type"] for n in needs])
+        urgency = np.fromiter(
+            (n.get("urgency") or 1 for n in needs), dtype=np.float32, count=len(needs)
+        )
+        days = np.fromiter(
+            (_days_waiting(n, now) for n in needs), dtype=np.float32, count=len(needs)
+        )
+        return EncodedNeeds(organ_type, abo, rh, urgency, days)
+
+    # ---------------------------------------------------------
+    # SCORING
+    # ---------------------------------------------------------
+    def need_priority(self, needs: EncodedNeeds) -> np.ndarray:
+        """Need-only part of the score, one value per waitlisted need."""
+        w = self.weights
+        urgency = np.clip((needs.urgency - 1.0) / (MAX_URGENCY - 1), 0.0, 1.0)
+        waiting = np.minimum(needs.days_waiting / WAITLIST_CAP_DAYS, 1.0)
+        return (w["urgency"] * urgency + w["waitlist"] * waiting).astype(np.float32)
+
+    def blood_bonus(self, donor_blood_type: str) -> Dict[Tuple[str, str], float]:
+        """(recipient ABO group, recipient Rh) -> bonus for this donor."""
+        w = self.weights
+        d_abo, d_rh = abo_group(donor_blood_type), rh_factor(donor_blood_type)
+        return {
+            (r_abo, r_rh): w["abo_identical"] * (r_abo == d_abo)
+            + w["rh_match"] * (r_rh == d_rh)
+            for r_abo in ABO_CODES
+            for r_rh in RH_CODES
+        }
+
+    def compatibility(self, organs: EncodedOrgans, needs: EncodedNeeds) -> np.ndarray:
+        """Boolean mask, shape (len(organs), len(needs))."""
+        o_abo = organs.abo[:, None]
+        n_abo = needs.abo[None, :]
+        known = (o_abo >= 0) & (n_abo >= 0)
+        return (
+            (organs.organ_type[:, None] == needs.organ_type[None, :])
+            & known
+            & ABO_COMPATIBLE[np.maximum(o_abo, 0), np.maximum(n_abo, 0)]
+        )
+
+    def score_matrix(
+        self,
+        organs: EncodedOrgans,
+        needs: EncodedNeeds,
+        priority: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (mask, scores) for every organ in the batch against every need.
+        Scores are 0 where the pair is incompatible.
+        """
+        w = self.weights
+        if priority is None:
+            priority = self.need_priority(needs)
+
+        mask = self.compatibility(organs, needs)
+        scores = (
+            priority[None, :]
+            + w["abo_identical"] * (organs.abo[:, None] == needs.abo[None, :])
+            + w["rh_match"] * (organs.rh[:, None] == needs.rh[None, :])
+        ).astype(np.float32)
+        scores[~mask] = 0.0
+        return mask, scores
@@ -0,0 +1,83 @@
+"""
+In-process notifications of async task status changes.
+
+The async_tasks write paths call `task_hub.notify(task_id)` after commit,
+from whatever thread they run on; long-poll and SSE handlers subscribe and
+re-read the row only when told it changed. Changes made by other instances
+are not seen here, so waiters still re-check the row every
+TASK_WAIT_RECHECK_SECONDS.
+"""
+
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Set, Tuple
+
+TASK_WAIT_RECHECK_SECONDS = float(os.getenv("TASK_WAIT_RECHECK_SECONDS", 10))
+
+
+class TaskNotificationHub:
+    """Per-task subscriber queues, fed thread-safely into their event loops."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Tuple]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.notified = 0
+
+    @contextmanager
+    def subscribe(self, task_id: str) -> Iterator[asyncio.Queue]:
+        """Queue receiving one item per change of task_id, for this block."""
+        entry = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[task_id].add(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(task_id)
+                if subscribers is not None:
+                    subscribers.discard(entry)
+                    if not subscribers:
+                        del self._subscribers[task_id]
+
+    def notify(self, task_id: str) -> None:
+        """Wake every subscriber of task_id. Safe from any thread."""
+        with self._lock:
+            entries = list(self._subscribers.get(task_id, ()))
+            self.notified += len(entries)
+        for loop, queue in entries:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, task_id)
+            except RuntimeError:
+                # The subscriber's loop has closed
+                continue
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "tasks": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+                "notified": self.notified,
+            }
+
+
+task_hub = TaskNotificationHub()
+
+
+async def next_change(changes: asyncio.Queue, timeout: float) -> bool:
+    """
+    Wait up to `timeout` (capped at the re-check interval) for a change.
+    True if notified; False means re-check the row anyway.
+    """
+    try:
+        await asyncio.wait_for(
+            changes.get(), max(0.0, min(timeout, TASK_WAIT_RECHECK_SECONDS))
+        )
+    except asyncio.TimeoutError:
+        return False
+    # Collapse a burst of notifications into one re-read
+    while not changes.empty():
+        changes.get_nowait()
+    return True
@@ -0,0 +1,217 @@
+"""
+Durable worker pool for rows in `async_tasks`.
+
+A dispatcher thread leases queued tasks (FOR UPDATE SKIP LOCKED) up to the
+number of free worker slots and runs them on a thread pool. While tasks run
+their leases are extended by heartbeats; a lease that runs out (the instance
+died or stalled) is requeued by whichever instance notices first, and a
+late finish from the old owner is ignored. Tasks therefore survive restarts
+and spread across every instance running a pool.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from openapi_server.services.async_tasks_service import (
+    claim_tasks,
+    fail_task,
+    finish_task,
+    heartbeat_tasks,
+    process_match_task,
+    release_tasks,
+    requeue_expired_tasks,
+)
+from openapi_server.utils.backoff import FailureBackoff
+
+# Tasks run at once by this instance
+TASK_WORKER_CONCURRENCY = int(os.getenv("TASK_WORKER_CONCURRENCY", 4))
+TASK_LEASE_SECONDS = float(os.getenv("TASK_LEASE_SECONDS", 30))
+TASK_HEARTBEAT_SECONDS = float(os.getenv("TASK_HEARTBEAT_SECONDS", 10))
+TASK_POLL_SECONDS = float(os.getenv("TASK_POLL_SECONDS", 1.0))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", 3))
+
+
+class TaskWorkerPool:
+    """
+    Runs `handler(task)` for leased tasks; its return value is stored as
+    the task result, an exception requeues the task until max_attempts.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Dict], Dict],
+        concurrency: int = TASK_WORKER_CONCURRENCY,
+        lease_seconds: float = TASK_LEASE_SECONDS,
+        heartbeat_seconds: float = TASK_HEARTBEAT_SECONDS,
+        poll_seconds: float = TASK_POLL_SECONDS,
+        max_attempts: int = TASK_MAX_ATTEMPTS,
+    ):
+        self.handler = handler
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._running: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._backoff = FailureBackoff("TASK DISPATCH")
+        self.completed = 0
+        # Out of attempts, after a handler error or an expired lease
+        self.failed = 0
+        # Handler errors sent back to the queue for another attempt
+        self.retried = 0
+        # Expired leases sent back to the queue
+        self.requeued = 0
+        self.lost_leases = 0
+
+    # -----------------------------------------------------
+    # Task execution (worker threads)
+    # -----------------------------------------------------
+    def _execute(self, task: Dict) -> None:
+        try:
+            result = self.handler(task)
+        except Exception as exc:
+            print("ASYNC TASK FAILED:", task["id"], repr(exc))
+            status = fail_task(self.worker_id, task["id"], repr(exc), self.max_attempts)
+            owned = status is not None
+            outcome = "failed" if status == "failed" else "retried"
+        else:
+            owned = finish_task(self.worker_id, task["id"], result)
+            outcome = "completed"
+        if not owned:
+            print("ASYNC TASK LEASE LOST:", task["id"])
+            outcome = "lost_leases"
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def _done(self, task_id: str, future: Future) -> None:
+        with self._lock:
+            self._running.pop(task_id, None)
+        # A slot is free: claim the next task now rather than at the next poll
+        self._wake.set()
+
+    # -----------------------------------------------------
+    # Dispatcher (one thread)
+    # -----------------------------------------------------
+    def free_slots(self) -> int:
+        with self._lock:
+            return self.concurrency - len(self._running)
+
+    def dispatch_once(self) -> int:
+        """Lease tasks for the free slots and start them. Returns how many."""
+        free = self.free_slots()
+        if free <= 0:
+            return 0
+        tasks = claim_tasks(self.worker_id, free, self.lease_seconds)
+        for task in tasks:
+            # Registered before _done can run, so the slot is always released
+            with self._lock:
+                future = self._executor.submit(self._execute, task)
+                self._running[task["id"]] = future
+            future.add_done_callback(
+                lambda f, task_id=task["id"]: self._done(task_id, f)
+            )
+        return len(tasks)
+
+    def heartbeat(self) -> None:
+        with self._lock:
+            task_ids = list(self._running)
+        extended = heartbeat_tasks(self.worker_id, task_ids, self.lease_seconds)
+        if extended < len(task_ids):
+            print(f"ASYNC TASK HEARTBEAT: {len(task_ids) - extended} leases lost")
+
+    def _run(self):
+        next_heartbeat = next_requeue = 0.0
+        while not self._stop.is_set():
+            claimed = 0
+            try:
+                now = time.monotonic()
+                if now >= next_heartbeat:
+                    self.heartbeat()
+                    next_heartbeat = now + self.heartbeat_seconds
+                if now >= next_requeue:
+                    expired = requeue_expired_tasks(self.max_attempts)
+                    with self._lock:
+                        self.requeued += len(expired["queued"])
+                        self.failed += len(expired["failed"])
+                    next_requeue = now + self.lease_seconds / 2
+                claimed = self.dispatch_once()
+            except Exception as exc:
+                # DB down: retry on the backoff, ignoring wakes
+                self._backoff.failed(exc)
+                self._stop.wait(self._backoff.delay(self.poll_seconds))
+                continue
+            self._backoff.succeeded()
+
+            # Slots still free after a claim: there may be more queued
+            if claimed and self.free_slots() > 0:
+                continue
+
+            self._wake.wait(min(self.poll_seconds, self.heartbeat_seconds))
+            self._wake.clear()
+
+    def wake(self) -> None:
+        """Ask the dispatcher to claim now (a task was just queued)."""
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="async-task"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="task-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop claiming, give running tasks `timeout` seconds, then requeue
+        whatever is still running so another instance picks it up now
+        instead of after the lease expires.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            deadline = time.monotonic() + timeout
+            while self.free_slots() < self.concurrency and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        try:
+            released = release_tasks(self.worker_id)
+        except Exception as exc:
+            print("ASYNC TASK RELEASE FAILED:", repr(exc))
+            released = []
+        if released:
+            print(f"ASYNC TASKS RELEASED: {len(released)}")
+
+    def stats(self) -> Dict:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": self.concurrency - self.free_slots(),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retried": self.retried,
+            "requeued": self.requeued,
+            "lost_leases": self.lost_leases,
+        }
+
+
+task_worker = TaskWorkerPool(process_match_task)
@@ -0,0 +1,136 @@
+"""
+Waitlist index for the matcher.
+
+Buckets the MS2 waitlist by (organ_type, ABO group, Rh) so the matcher can find
+the best compatible need for an organ by looking at a handful of bucket heads
+instead of scanning the whole waitlist.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Donor ABO group -> recipient ABO groups that can receive the organ
+ABO_COMPATIBILITY: Dict[str, Tuple[str, ...]] = {
+    "O": ("O", "A", "B", "AB"),
+    "A": ("A", "AB"),
+    "B": ("B", "AB"),
+    "AB": ("AB",),
+}
+
+RH_FACTORS = ("+", "-")
+
+BloodBonus = Dict[Tuple[str, str], float]
+
+
+def abo_group(blood_type: str) -> str:
+    """Strip the Rh factor: 'AB+' -> 'AB'."""
+    return blood_type.replace("+", "").replace("-", "")
+
+
+def rh_factor(blood_type: str) -> str:
+    """'O-' -> '-'; anything without an explicit '-' counts as '+'."""
+    return "-" if "-" in blood_type else "+"
+
+
+class WaitlistIndex:
+    """
+    Needs grouped by (organ_type, ABO group, Rh).
+
+    Each bucket is an OrderedDict keyed by the need's position in the original
+    waitlist and filled in (priority desc, position asc) order, so the bucket
+    head is always its best remaining need and consumed needs are removed in
+    O(1). Without priorities this is plain waitlist order.
+    """
+
+    def __init__(
+        self, needs: Sequence[Dict], priorities: Optional[Sequence[float]] = None
+    ):
+        self._buckets: Dict[Tuple[str, str, str], "OrderedDict[int, Dict]"] = {}
+        self._location: Dict[str, Tuple[Tuple[str, str, str], int]] = {}
+        self._priority = (
+            [0.0] * len(needs)
+            if priorities is None
+            else [float(p) for p in priorities]
+        )
+
+        order = range(len(needs))
+        if priorities is not None:
+            order = sorted(order, key=lambda i: -self._priority[i])
+
+        for position in order:
+            need = needs[position]
+            bt = need["blood_type"]
+            key = (need["organ_type"], abo_group(bt), rh_factor(bt))
+            self._buckets.setdefault(key, OrderedDict())[position] = need
+            self._location[need["id"]] = (key, position)
+
+    def __len__(self) -> int:
+        return len(self._location)
+
+    def pop_best_compatible(
+        self,
+        organ_type: str,
+        donor_blood_type: str,
+        bonus: Optional[BloodBonus] = None,
+    ) -> Optional[Tuple[Dict, float]]:
+        """
+        Remove and return (need, score) for the compatible need with the
+        highest priority + blood bonus, earliest waitlist position on ties.
+        Returns None when nothing on the waitlist fits the organ.
+        """
+        best = None  # (score, -position, key)
+
+        for recipient_abo in ABO_COMPATIBILITY.get(abo_group(donor_blood_type), ()):
+            for recipient_rh in RH_FACTORS:
+                key = (organ_type, recipient_abo, recipient_rh)
+                bucket = self._buckets.get(key)
+                if not bucket:
+                    continue
+                position = next(iter(bucket))
+                score = float(self._priority[position])
+                if bonus:
+                    score += bonus[(recipient_abo, recipient_rh)]
+                candidate = (score, -position, key)
+                if best is None or candidate > best:
+                    best = candidate
+
+        if best is None:
+            return None
+
+        score, neg_position, key = best
+        need = self._buckets[key].pop(-neg_position)
+        self._location.pop(need["id"], None)
+        return need, score
+
+
+def greedy_pairs(
+    organs: Iterable[Dict],
+    needs: Sequence[Dict],
+    priorities: Optional[Sequence[float]] = None,
+    blood_bonus: Optional[Callable[[str], BloodBonus]] = None,
+) -> List[Tuple[Dict, Dict, float]]:
+    """
+    Pair each organ (in MS1 order) with the best compatible need still on the
+    waitlist. Returns (organ, need, score) tuples; organs are flattened MS1
+    records. Without priorities/bonus this is first-compatible-in-list-order.
+    """
+    waitlist = WaitlistIndex(needs, priorities)
+    bonus_cache: Dict[str, BloodBonus] = {}
+    pairs: List[Tuple[Dict, Dict, float]] = []
+
+    for organ in organs:
+        o = organ.get("data", organ)
+        donor_bt = o.get("blood_type", "O+")
+
+        bonus = None
+        if blood_bonus is not None:
+            bonus = bonus_cache.get(donor_bt)
+            if bonus is None:
+                bonus = bonus_cache[donor_bt] = blood_bonus(donor_bt)
+
+        found = waitlist.pop_best_compatible(o["organ_type"], donor_bt, bonus)
+        if found is not None:
+            pairs.append((o, found[0], found[1]))
+
+    return pairs
@@ -0,0 +1,37 @@
+"""
+Exponential backoff for background loops whose DB or broker is down.
+"""
+
+import os
+
+WORKER_BACKOFF_MAX_SECONDS = float(os.getenv("WORKER_BACKOFF_MAX_SECONDS", 60))
+
+
+class FailureBackoff:
+    """
+    Counts consecutive failures of a polling loop. While healthy the loop
+    waits its normal interval; each failure in a row doubles it, up to
+    `max_seconds`. Failures are logged when the wait grows, not every poll.
+    """
+
+    def __init__(self, name: str, max_seconds: float = WORKER_BACKOFF_MAX_SECONDS):
+        self.name = name
+        self.max_seconds = max_seconds
+        self.failures = 0
+
+    def failed(self, exc: Exception) -> None:
+        self.failures += 1
+        # 1st, 2nd, 4th, 8th... failure in a row
+        if self.failures & (self.failures - 1) == 0:
+            print(f"{self.name} FAILED ({self.failures} in a row):", repr(exc))
+
+    def succeeded(self) -> None:
+        if self.failures:
+            print(f"{self.name} RECOVERED after {self.failures} failures")
+        self.failures = 0
+
+    def delay(self, seconds: float) -> float:
+        """The wait before the next poll, given the normal interval."""
+        if not self.failures:
+            return seconds
+        return max(seconds, min(self.max_seconds, seconds * 2 ** self.failures))
@@ -0,0 +1,28 @@
+"""
+Opaque pagination cursors: a JSON list of sort-key values, base64url-encoded.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Sequence
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, datetime) else v for v in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """Raises ValueError if the token is not a cursor of `size` values."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as exc:
+        raise ValueError("malformed cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("malformed cursor")
+    return values
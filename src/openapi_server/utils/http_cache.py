@@ -0,0 +1,92 @@
+"""
+ETag helpers for conditional GETs.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong, quoted ETag over the given parts."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, lists and `*` accepted)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == bare:
+            return True
+    return False
+
+
+def _as_utc(value: datetime) -> datetime:
+    # DB timestamps are naive UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(microsecond=0)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value), usegmt=True)
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag}
+    if isinstance(last_modified, datetime):
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def is_not_modified(
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+    etag: str,
+    last_modified: Optional[datetime],
+) -> bool:
+    """
+    Conditional GET evaluation: If-None-Match wins when present,
+    otherwise If-Modified-Since is compared at one-second precision.
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if not if_modified_since or not isinstance(last_modified, datetime):
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return _as_utc(last_modified) <= since
+
+
+def conditional_response(
+    resource,
+    response: Response,
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+):
+    """
+    304 with validators if the client's copy of `resource` (a read cache
+    CachedResource) is current, else its body with ETag/Last-Modified set.
+    """
+    headers = validator_headers(resource.etag, resource.last_modified)
+    if is_not_modified(
+        if_none_match, if_modified_since, resource.etag, resource.last_modified
+    ):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return resource.body
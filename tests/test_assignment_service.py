@@ -0,0 +1,65 @@
+from openapi_server.services.assignment_service import optimal_pairs
+from openapi_server.services.waitlist_index import greedy_pairs
+
+
+def _organ(organ_id, organ_type, blood_type):
+    return {"id": organ_id, "organ_type": organ_type, "blood_type": blood_type}
+
+
+def _need(need_id, organ_type, blood_type, urgency=1):
+    return {
+        "id": need_id,
+        "organ_type": organ_type,
+        "blood_type": blood_type,
+        "urgency": urgency,
+    }
+
+
+def _ids(pairs):
+    return [(organ["id"], need["id"]) for organ, need, _ in pairs]
+
+
+def test_optimal_maximises_match_count_over_greedy():
+    # Greedy gives the O donor to the urgent A recipient and strands the
+    # O recipient; optimal pairs both
+    organs = [_organ("o-O", "kidney", "O+"), _organ("o-A", "kidney", "A+")]
+    needs = [_need("n-A", "kidney", "A+", urgency=5), _need("n-O", "kidney", "O+")]
+
+    assert len(greedy_pairs(organs, needs, [5.0, 1.0])) == 1
+    assert _ids(optimal_pairs(organs, needs)) == [("o-O", "n-O"), ("o-A", "n-A")]
+
+
+def test_optimal_never_pairs_across_organ_types():
+    organs = [_organ("heart", "heart", "O+"), _organ("liver", "liver", "O+")]
+    needs = [_need("n-liver", "liver", "O+"), _need("n-lung", "lung", "O+")]
+
+    assert _ids(optimal_pairs(organs, needs)) == [("liver", "n-liver")]
+
+
+def test_optimal_respects_abo_compatibility():
+    organs = [_organ("o-AB", "kidney", "AB+")]
+    needs = [_need("n-O", "kidney", "O+"), _need("n-A", "kidney", "A+")]
+
+    assert optimal_pairs(organs, needs) == []
+
+
+def test_optimal_prefers_higher_priority_at_equal_count():
+    organs = [_organ("o", "kidney", "O+")]
+    needs = [_need("low", "kidney", "O+", 1), _need("high", "kidney", "O+", 9)]
+
+    assert _ids(optimal_pairs(organs, needs)) == [("o", "high")]
+
+
+def test_optimal_returns_pairs_in_organ_order_and_unwraps_ms1_records():
+    organs = [
+        {"data": _organ("second", "kidney", "O+")},
+        {"data": _organ("first", "heart", "O+")},
+    ]
+    needs = [_need("h", "heart", "O+"), _need("k", "kidney", "O+")]
+
+    assert _ids(optimal_pairs(organs, needs)) == [("second", "k"), ("first", "h")]
+
+
+def test_optimal_handles_empty_inputs():
+    assert optimal_pairs([], [_need("n", "kidney", "O+")]) == []
+    assert optimal_pairs([_organ("o", "kidney", "O+")], []) == []
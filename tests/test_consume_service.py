@@ -0,0 +1,128 @@
+import asyncio
+
+import httpx
+import pytest
+
+from openapi_server.services import consume_service
+from openapi_server.services.consume_service import consume_matched, is_transient
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("DELETE", "http://upstream/item")
+    return httpx.HTTPStatusError(
+        f"{status}", request=request, response=httpx.Response(status, request=request)
+    )
+
+
+class FakeClient:
+    """delete_organ/delete_need that fail per item with scripted errors."""
+
+    def __init__(self, errors=None):
+        self.errors = {k: list(v) for k, v in (errors or {}).items()}
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def _delete(self, item_id):
+        self.calls.append(item_id)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0)
+            pending = self.errors.get(item_id)
+            if pending:
+                raise pending.pop(0)
+        finally:
+            self.in_flight -= 1
+
+    delete_organ = _delete
+    delete_need = _delete
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(consume_service, "CONSUME_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(consume_service, "CONSUME_MAX_ATTEMPTS", 3)
+
+
+def _consume(ms1, ms2, pairs, **kwargs):
+    return asyncio.run(consume_matched(ms1, ms2, pairs, **kwargs))
+
+
+def test_deletes_organ_and_need_of_every_pair_in_order():
+    ms1, ms2 = FakeClient(), FakeClient()
+
+    outcomes = _consume(ms1, ms2, [("o1", "n1"), ("o2", "n2")])
+
+    assert ms1.calls == ["o1", "o2"] and ms2.calls == ["n1", "n2"]
+    assert outcomes == [
+        {
+            "organ": {"status": "deleted", "attempts": 1},
+            "need": {"status": "deleted", "attempts": 1},
+        }
+    ] * 2
+
+
+def test_404_counts_as_already_consumed_without_retry():
+    ms1 = FakeClient({"o1": [_status_error(404)]})
+
+    outcome = _consume(ms1, FakeClient(), [("o1", "n1")])[0]
+
+    assert outcome["organ"] == {"status": "not_found", "attempts": 1}
+    assert ms1.calls == ["o1"]
+
+
+@pytest.mark.parametrize(
+    "error", [_status_error(503), httpx.ConnectError("refused")]
+)
+def test_transient_failures_are_retried(error):
+    ms2 = FakeClient({"n1": [error, error]})
+
+    outcome = _consume(FakeClient(), ms2, [("o1", "n1")])[0]
+
+    assert outcome["need"] == {"status": "deleted", "attempts": 3}
+    assert ms2.calls == ["n1"] * 3
+
+
+def test_transient_failures_give_up_after_max_attempts():
+    ms1 = FakeClient({"o1": [_status_error(502)] * 5})
+
+    outcome = _consume(ms1, FakeClient(), [("o1", "n1")])[0]
+
+    assert outcome["organ"]["status"] == "failed"
+    assert outcome["organ"]["attempts"] == 3
+    assert "502" in outcome["organ"]["error"]
+    assert outcome["need"] == {"status": "deleted", "attempts": 1}
+
+
+def test_permanent_failures_are_not_retried():
+    ms1 = FakeClient({"o1": [_status_error(400)]})
+
+    outcome = _consume(ms1, FakeClient(), [("o1", "n1")])[0]
+
+    assert outcome["organ"]["status"] == "failed"
+    assert outcome["organ"]["attempts"] == 1
+    assert ms1.calls == ["o1"]
+
+
+def test_concurrency_is_bounded_across_organs_and_needs():
+    upstream = FakeClient()
+    pairs = [(f"o{i}", f"n{i}") for i in range(20)]
+
+    _consume(upstream, upstream, pairs, max_concurrency=3)
+
+    assert len(upstream.calls) == 40
+    assert upstream.peak == 3
+
+
+def test_no_pairs_makes_no_calls():
+    ms1, ms2 = FakeClient(), FakeClient()
+    assert _consume(ms1, ms2, []) == []
+    assert ms1.calls == ms2.calls == []
+
+
+def test_is_transient():
+    assert is_transient(_status_error(429))
+    assert is_transient(httpx.ReadTimeout("slow"))
+    assert not is_transient(_status_error(409))
+    assert not is_transient(ValueError("bug"))
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+
+from openapi_server.services.matcher_service import list_matches
+from openapi_server.utils.cursors import decode_cursor, encode_cursor
+
+
+def _raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678000)
+    token = encode_cursor([created_at, 42])
+
+    assert "=" not in token
+    assert decode_cursor(token, 2) == [created_at.isoformat(), 42]
+
+
+@pytest.mark.parametrize("token", ["not-base64!", _raw_cursor({"a": 1}), "e30"])
+def test_decode_cursor_rejects_malformed_tokens(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token, 2)
+
+
+def test_decode_cursor_rejects_wrong_size():
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor([1, 2, 3]), 2)
+
+
+@pytest.mark.parametrize(
+    "values", [[None, None], [[1], 2], ["2026-01-01T00:00:00", "x"], ["x", 1]]
+)
+def test_list_matches_rejects_cursor_values_of_wrong_type(values):
+    # Raised before any query is run
+    with pytest.raises(ValueError):
+        list_matches(10, after=_raw_cursor(values))
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Response
+
+from openapi_server.services.read_cache import make_resource
+from openapi_server.utils.http_cache import (
+    conditional_response,
+    etag_matches,
+    http_date,
+    is_not_modified,
+    make_etag,
+)
+
+ETAG = make_etag({"id": 1})
+MODIFIED = datetime(2024, 5, 1, 12, 0, 0, 750000)  # naive UTC, as from MySQL
+
+
+def test_make_etag_is_quoted_and_stable():
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert make_etag({"id": 1}) == ETAG
+    assert make_etag({"id": 2}) != ETAG
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (None, False),
+        ("", False),
+        ("*", True),
+        (" * ", True),
+        (ETAG, True),
+        (ETAG.strip('"'), True),
+        (f"W/{ETAG}", True),
+        (f'"other", W/{ETAG}', True),
+        ('"other", W/"another"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, ETAG) is expected
+
+
+@pytest.mark.parametrize(
+    "since, expected",
+    [
+        # Last-Modified is sent truncated to the second
+        (MODIFIED.replace(microsecond=0), True),
+        (MODIFIED + timedelta(seconds=1), True),
+        (MODIFIED - timedelta(seconds=1), False),
+    ],
+)
+def test_if_modified_since_one_second_precision(since, expected):
+    header = http_date(since)
+    assert is_not_modified(None, header, ETAG, MODIFIED) is expected
+
+
+def test_http_date_treats_naive_as_utc():
+    assert http_date(MODIFIED) == "Wed, 01 May 2024 12:00:00 GMT"
+    aware = MODIFIED.replace(tzinfo=timezone(timedelta(hours=2)))
+    assert http_date(aware) == "Wed, 01 May 2024 10:00:00 GMT"
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    current = http_date(MODIFIED)
+    assert is_not_modified('"stale"', current, ETAG, MODIFIED) is False
+    assert is_not_modified(ETAG, "garbage", ETAG, MODIFIED) is True
+
+
+@pytest.mark.parametrize("header", [None, "", "not a date"])
+def test_unusable_if_modified_since(header):
+    assert is_not_modified(None, header, ETAG, MODIFIED) is False
+
+
+def test_if_modified_since_without_last_modified():
+    assert is_not_modified(None, http_date(MODIFIED), ETAG, None) is False
+
+
+def test_conditional_response_not_modified():
+    resource = make_resource({"id": 1}, MODIFIED)
+    result = conditional_response(resource, Response(), resource.etag, None)
+    assert result.status_code == 304
+    assert result.headers["ETag"] == resource.etag
+    assert result.headers["Last-Modified"] == http_date(MODIFIED)
+
+
+def test_conditional_response_sends_body_with_validators():
+    resource = make_resource({"id": 1}, MODIFIED)
+    response = Response()
+    result = conditional_response(resource, response, '"stale"', None)
+    assert result == {"id": 1}
+    assert response.headers["etag"] == resource.etag
+    assert response.headers["last-modified"] == http_date(MODIFIED)
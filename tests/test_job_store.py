@@ -0,0 +1,170 @@
+from contextlib import contextmanager
+
+import pytest
+
+from openapi_server.services import job_store
+from openapi_server.services.job_store import (
+    DbJobStore,
+    InMemoryJobStore,
+    JobStore,
+    JobStoreFull,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_job_store_is_abstract():
+    with pytest.raises(TypeError):
+        JobStore()
+
+
+def test_finished_jobs_expire_in_finish_order(clock):
+    store = InMemoryJobStore(max_jobs=10, ttl=10, clock=clock)
+    for job_id in ("a", "b", "c"):
+        store.create(job_id)
+    store.finish("b", "done", 1)
+    clock.now = 5
+    store.finish("a", "done", 2)
+
+    clock.now = 10
+    assert store.get("b") is None
+    assert store.get("a") == {"status": "done", "result": 2}
+    clock.now = 15
+    assert store.get("a") is None
+    # Pending jobs never expire
+    assert store.get("c") == {"status": "pending"}
+    assert store.stats()["expired"] == 2
+
+
+def test_full_store_evicts_oldest_finished_job(clock):
+    store = InMemoryJobStore(max_jobs=3, ttl=100, clock=clock)
+    for job_id in ("a", "b", "c"):
+        store.create(job_id)
+    store.finish("b", "done")
+    store.finish("a", "done")
+
+    store.create("d")
+
+    assert store.get("b") is None
+    assert store.get("a") == {"status": "done", "result": None}
+    assert store.get("d") == {"status": "pending"}
+    assert store.stats()["evicted"] == 1
+
+
+def test_full_store_of_pending_jobs_rejects_new_ones(clock):
+    store = InMemoryJobStore(max_jobs=2, ttl=100, clock=clock)
+    store.create("a")
+    store.create("b")
+
+    with pytest.raises(JobStoreFull):
+        store.create("c")
+
+    assert store.get("a") == {"status": "pending"}
+    assert store.get("c") is None
+    stats = store.stats()
+    assert (stats["size"], stats["pending"], stats["rejected"]) == (2, 2, 1)
+
+
+def test_expired_jobs_free_room_before_rejecting(clock):
+    store = InMemoryJobStore(max_jobs=1, ttl=10, clock=clock)
+    store.create("a")
+    store.finish("a", "done")
+    clock.now = 11
+
+    store.create("b")
+
+    stats = store.stats()
+    assert (stats["expired"], stats["evicted"], stats["rejected"]) == (1, 0, 0)
+
+
+def test_refinishing_a_job_moves_it_to_the_back(clock):
+    store = InMemoryJobStore(max_jobs=10, ttl=10, clock=clock)
+    store.create("a")
+    store.create("b")
+    store.finish("a", "done")
+    store.finish("b", "done")
+    clock.now = 5
+    store.finish("a", "failed")
+
+    clock.now = 10
+    assert store.get("b") is None
+    assert store.get("a") == {"status": "failed", "result": None}
+
+
+class FakeJobsCursor:
+    """Answers the COUNT and evicting DELETE of DbJobStore.create."""
+
+    def __init__(self, rows, evictable):
+        self.rows = rows
+        self.evictable = evictable
+        self.counts = 0
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        sql = " ".join(sql.split())
+        self.rowcount = 0
+        if sql.startswith("SELECT COUNT(*)"):
+            self.counts += 1
+        elif sql.startswith("DELETE FROM jobs WHERE status"):
+            self.rowcount = min(params[0], self.evictable)
+            self.evictable -= self.rowcount
+            self.rows -= self.rowcount
+        elif sql.startswith("INSERT INTO jobs"):
+            self.rows += 1
+
+    def fetchone(self):
+        return (self.rows,)
+
+
+@pytest.fixture
+def jobs_cursor(monkeypatch):
+    cur = FakeJobsCursor(rows=0, evictable=0)
+
+    @contextmanager
+    def fake_db_cursor(**kwargs):
+        yield cur
+
+    monkeypatch.setattr(job_store, "db_cursor", fake_db_cursor)
+    return cur
+
+
+def test_db_store_counts_only_every_nth_create(jobs_cursor):
+    store = DbJobStore(max_jobs=100, cap_check_every=5)
+    for i in range(10):
+        store.create(str(i))
+    assert jobs_cursor.counts == 2
+
+
+def test_db_store_evicts_overshoot_back_below_cap(jobs_cursor):
+    jobs_cursor.rows, jobs_cursor.evictable = 12, 12
+    store = DbJobStore(max_jobs=10, cap_check_every=1)
+    store.create("a")
+    assert jobs_cursor.rows == 10
+
+
+def test_db_store_full_of_pending_checks_every_create(jobs_cursor):
+    jobs_cursor.rows = 10
+    store = DbJobStore(max_jobs=10, cap_check_every=5)
+    for i in range(4):
+        store.create(str(i))
+    with pytest.raises(JobStoreFull):
+        store.create("full")
+    with pytest.raises(JobStoreFull):
+        store.create("still-full")
+
+    # Pending jobs finished and expired: the next create finds room again
+    jobs_cursor.evictable = 14
+    store.create("room")
+    store.create("unchecked")
+    assert jobs_cursor.counts == 3
@@ -0,0 +1,147 @@
+from contextlib import contextmanager
+
+import pytest
+
+from openapi_server.services import offer_expiry
+from openapi_server.services.offer_expiry import OfferExpiryScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeCursor:
+    """Returns the scripted result sets, one per execute()."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((sql, list(params)))
+
+    def fetchall(self):
+        return self.results.pop(0)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = False
+
+    def cursor(self, dictionary=False):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return OfferExpiryScheduler(poll_seconds=5, batch_size=3, clock=clock)
+
+
+def _use_cursor(monkeypatch, cursor):
+    @contextmanager
+    def db_connection():
+        yield FakeConnection(cursor)
+
+    monkeypatch.setattr(offer_expiry, "db_connection", db_connection)
+
+
+def test_pop_due_returns_due_offers_in_deadline_order(scheduler, clock):
+    scheduler._push(1, 30)
+    scheduler._push(2, 10)
+    scheduler._push(3, 20)
+
+    assert scheduler._pop_due() == []
+    clock.now += 20
+    assert scheduler._pop_due() == [2, 3]
+    assert scheduler.next_due_in() == pytest.approx(10)
+
+
+def test_pop_due_takes_at_most_one_batch(scheduler, clock):
+    for offer_id in range(1, 6):
+        scheduler._push(offer_id, -offer_id)
+
+    assert scheduler._pop_due() == [5, 4, 3]
+    assert scheduler._pop_due() == [2, 1]
+    assert scheduler.next_due_in() is None
+
+
+def test_push_ignores_offers_already_scheduled(scheduler):
+    scheduler._push(1, 10)
+    scheduler._push(1, 1)
+
+    assert scheduler.stats()["scheduled"] == 1
+    assert scheduler.next_due_in() == pytest.approx(10)
+
+
+def test_failed_batch_is_pushed_back_as_due(scheduler, monkeypatch):
+    @contextmanager
+    def db_connection():
+        raise ConnectionError("db down")
+        yield
+
+    monkeypatch.setattr(offer_expiry, "db_connection", db_connection)
+    scheduler._push(1, -1)
+    scheduler._push(2, -1)
+
+    with pytest.raises(ConnectionError):
+        scheduler.expire_due()
+
+    assert sorted(scheduler._pop_due()) == [1, 2]
+
+
+def test_locked_offers_are_retried_and_settled_ones_dropped(
+    scheduler, clock, monkeypatch
+):
+    cursor = FakeCursor([
+        # FOR UPDATE SKIP LOCKED: only offer 1 is pending and unlocked,
+        # its deadline moved 60s out
+        [{"id": 1, "match_id": 10, "recipient_id": "r", "remaining": 60}],
+        # Plain read of the skipped ones: 2 is still pending (locked),
+        # 3 was accepted meanwhile
+        [{"id": 2}],
+    ])
+    _use_cursor(monkeypatch, cursor)
+    for offer_id in (1, 2, 3):
+        scheduler._push(offer_id, -1)
+
+    assert scheduler.expire_due() == 0
+
+    assert cursor.executed[1][1] == [2, 3]
+    assert scheduler.stats()["scheduled"] == 2
+    clock.now += 5
+    assert scheduler._pop_due() == [2]
+    clock.now += 55
+    assert scheduler._pop_due() == [1]
+
+
+def test_resync_clears_the_heap(scheduler, monkeypatch):
+    cursor = FakeCursor([[(7, 30)]])
+
+    @contextmanager
+    def db_cursor(**kwargs):
+        yield cursor
+
+    monkeypatch.setattr(offer_expiry, "db_cursor", db_cursor)
+    scheduler._push(1, 10)
+
+    assert scheduler.resync() == 1
+
+    stats = scheduler.stats()
+    assert (stats["scheduled"], stats["high_water_id"]) == (1, 7)
+    assert scheduler.next_due_in() == pytest.approx(30)
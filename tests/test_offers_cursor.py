@@ -0,0 +1,25 @@
+import base64
+import json
+
+import pytest
+
+from openapi_server.services.offers_service import parse_offers_cursor
+from openapi_server.utils.cursors import encode_cursor
+
+
+def _raw_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def test_parse_offers_cursor_round_trip():
+    assert parse_offers_cursor(encode_cursor([1234])) == 1234
+    assert parse_offers_cursor(None) is None
+    assert parse_offers_cursor("") is None
+
+
+@pytest.mark.parametrize(
+    "token", [_raw_cursor([None]), _raw_cursor([[1]]), _raw_cursor(["x"]), "%%%"]
+)
+def test_parse_offers_cursor_rejects_malformed(token):
+    with pytest.raises(ValueError):
+        parse_offers_cursor(token)
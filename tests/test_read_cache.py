@@ -0,0 +1,95 @@
+import pytest
+
+from openapi_server.services import read_cache
+from openapi_server.services.read_cache import (
+    full_match_key,
+    get_or_load,
+    get_or_load_many,
+    invalidate_match,
+    invalidate_offer,
+    make_resource,
+    match_key,
+    offer_key,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    read_cache.resource_cache.clear()
+    yield
+    read_cache.resource_cache.clear()
+
+
+def test_hit_skips_loader():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return make_resource({"id": 1}, None)
+
+    first = get_or_load(match_key(1), loader)
+    assert get_or_load(match_key(1), loader) is first
+    assert len(calls) == 1
+
+
+def test_missing_resource_is_not_cached():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return None
+
+    assert get_or_load(match_key(1), loader) is None
+    assert get_or_load(match_key(1), loader) is None
+    assert len(calls) == 2
+
+
+def test_load_racing_an_invalidation_is_not_cached():
+    def loader():
+        # A write commits and invalidates while this load reads old rows
+        invalidate_match(7)
+        return make_resource({"id": 7, "stale": True}, None)
+
+    assert get_or_load(match_key(7), loader).body["stale"]
+    assert read_cache.resource_cache.get(match_key(7)) is None
+
+
+def test_batched_load_racing_an_invalidation_is_not_cached():
+    def loader(ids):
+        invalidate_offer(99)
+        return {i: make_resource({"id": i}, None) for i in ids}
+
+    found = get_or_load_many([1, 2], offer_key, loader)
+    assert sorted(found) == [1, 2]
+    assert read_cache.resource_cache.get(offer_key(1)) is None
+    assert read_cache.resource_cache.get(offer_key(2)) is None
+
+
+def test_batched_load_only_loads_misses():
+    cached = make_resource({"id": 1}, None)
+    read_cache.resource_cache.set(offer_key(1), cached)
+    requested = []
+
+    def loader(ids):
+        requested.extend(ids)
+        return {i: make_resource({"id": i}, None) for i in ids if i != 3}
+
+    found = get_or_load_many([1, 2, 3], offer_key, loader)
+    assert requested == [2, 3]
+    assert found[1] is cached and sorted(found) == [1, 2]
+    assert read_cache.resource_cache.get(offer_key(2)) is found[2]
+
+
+def test_invalidate_offer_drops_full_match_view():
+    for key in (offer_key(5), full_match_key(3), match_key(3)):
+        read_cache.resource_cache.set(key, make_resource({}, None))
+    invalidate_offer(5, "3")
+    assert read_cache.resource_cache.get(offer_key(5)) is None
+    assert read_cache.resource_cache.get(full_match_key(3)) is None
+    assert read_cache.resource_cache.get(match_key(3)) is not None
+
+
+def test_invalidate_ignores_non_numeric_match_id():
+    read_cache.resource_cache.set(offer_key(5), make_resource({}, None))
+    invalidate_offer(5, "not-a-number")
+    assert read_cache.resource_cache.get(offer_key(5)) is None
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from openapi_server.services.scoring_engine import (
+    ABO_CODES,
+    RH_CODES,
+    WAITLIST_CAP_DAYS,
+    ScoringEngine,
+)
+
+NOW = datetime(2026, 1, 1)
+
+
+def _need(organ_type, blood_type, urgency=1, days=0):
+    return {
+        "organ_type": organ_type,
+        "blood_type": blood_type,
+        "urgency": urgency,
+        "listed_at": (NOW - timedelta(days=days)).isoformat(),
+    }
+
+
+def _organ(organ_type, blood_type):
+    return {"organ_type": organ_type, "blood_type": blood_type}
+
+
+def test_encoding_shares_organ_type_codes_and_splits_abo_rh():
+    engine = ScoringEngine()
+    organs = engine.encode_organs(
+        [{"data": _organ("kidney", "AB-")}, _organ("liver", "O+")]
+    )
+    needs = engine.encode_needs(
+        [_need("liver", "B+"), _need("kidney", "X+")], now=NOW
+    )
+
+    assert list(organs.organ_type) == [0, 1]
+    assert list(needs.organ_type) == [1, 0]
+    assert list(organs.abo) == [ABO_CODES["AB"], ABO_CODES["O"]]
+    assert list(organs.rh) == [RH_CODES["-"], RH_CODES["+"]]
+    # Unknown ABO groups encode as -1
+    assert list(needs.abo) == [ABO_CODES["B"], -1]
+
+
+def test_encoding_defaults_missing_organ_blood_type_to_o_positive():
+    organs = ScoringEngine().encode_organs([{"organ_type": "heart"}])
+    assert (organs.abo[0], organs.rh[0]) == (ABO_CODES["O"], RH_CODES["+"])
+
+
+RECIPIENTS = ["O+", "A-", "B+", "AB-", "A+", "AB+"]
+
+
+@pytest.mark.parametrize(
+    "donor, compatible",
+    [
+        ("O-", RECIPIENTS),
+        ("A+", ["A-", "AB-", "A+", "AB+"]),
+        ("B-", ["B+", "AB-", "AB+"]),
+        ("AB+", ["AB-", "AB+"]),
+    ],
+)
+def test_compatibility_follows_abo_and_ignores_rh(donor, compatible):
+    engine = ScoringEngine()
+    organs = engine.encode_organs([_organ("kidney", donor)])
+    needs = engine.encode_needs([_need("kidney", bt) for bt in RECIPIENTS], now=NOW)
+
+    mask = engine.compatibility(organs, needs)[0]
+
+    assert [bt for bt, ok in zip(RECIPIENTS, mask) if ok] == compatible
+
+
+def test_compatibility_requires_same_organ_type_and_known_abo():
+    engine = ScoringEngine()
+    organs = engine.encode_organs([_organ("kidney", "O+"), _organ("kidney", "Z+")])
+    needs = engine.encode_needs(
+        [_need("liver", "O+"), _need("kidney", "Q-"), _need("kidney", "O-")],
+        now=NOW,
+    )
+
+    mask = engine.compatibility(organs, needs)
+
+    assert mask.tolist() == [[False, False, True], [False, False, False]]
+
+
+def test_need_priority_weights_urgency_and_capped_waiting_time():
+    engine = ScoringEngine()
+    needs = engine.encode_needs(
+        [
+            _need("kidney", "O+", urgency=1, days=0),
+            _need("kidney", "O+", urgency=5, days=WAITLIST_CAP_DAYS * 2),
+            _need("kidney", "O+", urgency=3, days=WAITLIST_CAP_DAYS / 2),
+            _need("kidney", "O+", urgency=9),
+        ],
+        now=NOW,
+    )
+
+    assert engine.need_priority(needs) == pytest.approx(
+        [0.0, 0.5 + 0.3, 0.25 + 0.15, 0.5], abs=1e-4
+    )
+
+
+def test_blood_bonus_rewards_identical_abo_and_rh():
+    bonus = ScoringEngine().blood_bonus("A-")
+
+    assert bonus[("A", "-")] == pytest.approx(0.2)
+    assert bonus[("A", "+")] == pytest.approx(0.15)
+    assert bonus[("AB", "-")] == pytest.approx(0.05)
+    assert bonus[("AB", "+")] == 0
+    assert len(bonus) == len(ABO_CODES) * len(RH_CODES)
+
+
+def test_score_matrix_is_priority_plus_bonus_and_zero_when_incompatible():
+    engine = ScoringEngine()
+    organs = engine.encode_organs([_organ("kidney", "A+")])
+    needs = engine.encode_needs(
+        [
+            _need("kidney", "A+", urgency=5),
+            _need("kidney", "AB-"),
+            _need("kidney", "O+"),
+        ],
+        now=NOW,
+    )
+
+    mask, scores = engine.score_matrix(organs, needs)
+
+    assert mask.tolist() == [[True, True, False]]
+    assert scores[0] == pytest.approx([0.5 + 0.2, 0.0, 0.0], abs=1e-4)
+    assert scores.dtype == np.float32
@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from openapi_server.services.scoring_engine import ScoringEngine
+from openapi_server.services.waitlist_index import (
+    ABO_COMPATIBILITY,
+    WaitlistIndex,
+    abo_group,
+    greedy_pairs,
+    rh_factor,
+)
+
+BLOOD_TYPES = ["O+", "O-", "A+", "A-", "B+", "B-", "AB+", "AB-"]
+ORGAN_TYPES = ["kidney", "liver", "heart"]
+
+
+def _random_case(seed, organs=40, needs=60):
+    rng = random.Random(seed)
+    return (
+        [
+            {
+                "id": f"o{i}",
+                "organ_type": rng.choice(ORGAN_TYPES),
+                "blood_type": rng.choice(BLOOD_TYPES),
+            }
+            for i in range(organs)
+        ],
+        [
+            {
+                "id": f"n{i}",
+                "organ_type": rng.choice(ORGAN_TYPES),
+                "blood_type": rng.choice(BLOOD_TYPES),
+                "urgency": rng.randint(1, 5),
+            }
+            for i in range(needs)
+        ],
+    )
+
+
+def _compatible(organ, need):
+    return organ["organ_type"] == need["organ_type"] and abo_group(
+        need["blood_type"]
+    ) in ABO_COMPATIBILITY[abo_group(organ["blood_type"])]
+
+
+def _first_compatible_scan(organs, needs):
+    """The matcher loop before the index: first compatible need in list order."""
+    pairs, remaining = [], list(needs)
+    for organ in organs:
+        need = next((n for n in remaining if _compatible(organ, n)), None)
+        if need is not None:
+            pairs.append((organ["id"], need["id"]))
+            remaining.remove(need)
+    return pairs
+
+
+def _argmax_scan(organs, needs, priorities, blood_bonus):
+    """Row argmax over the unconsumed needs, earliest position on ties."""
+    pairs, consumed = [], set()
+    for organ in organs:
+        bonus = blood_bonus(organ["blood_type"])
+        best = None
+        for position, need in enumerate(needs):
+            if position in consumed or not _compatible(organ, need):
+                continue
+            bt = need["blood_type"]
+            score = float(priorities[position]) + bonus[(abo_group(bt), rh_factor(bt))]
+            if best is None or (score, -position) > best:
+                best = (score, -position)
+        if best is not None:
+            consumed.add(-best[1])
+            pairs.append((organ["id"], needs[-best[1]]["id"]))
+    return pairs
+
+
+def _ids(pairs):
+    return [(organ["id"], need["id"]) for organ, need, _ in pairs]
+
+
+def test_blood_type_parsing():
+    assert (abo_group("AB+"), rh_factor("AB+")) == ("AB", "+")
+    assert (abo_group("O-"), rh_factor("O-")) == ("O", "-")
+    assert rh_factor("A") == "+"
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_unscored_greedy_matches_the_first_compatible_scan(seed):
+    organs, needs = _random_case(seed)
+    assert _ids(greedy_pairs(organs, needs)) == _first_compatible_scan(organs, needs)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_scored_greedy_takes_the_row_argmax_among_unconsumed(seed):
+    organs, needs = _random_case(seed)
+    engine = ScoringEngine()
+    priorities = engine.need_priority(engine.encode_needs(needs))
+
+    pairs = greedy_pairs(organs, needs, priorities, engine.blood_bonus)
+
+    assert _ids(pairs) == _argmax_scan(organs, needs, priorities, engine.blood_bonus)
+
+
+def test_pop_best_compatible_breaks_ties_by_waitlist_position():
+    needs = [
+        {"id": "first", "organ_type": "kidney", "blood_type": "A+"},
+        {"id": "second", "organ_type": "kidney", "blood_type": "O-"},
+    ]
+    index = WaitlistIndex(needs, priorities=[0.5, 0.5])
+
+    assert index.pop_best_compatible("kidney", "O+")[0]["id"] == "first"
+    assert index.pop_best_compatible("kidney", "O+")[0]["id"] == "second"
+    assert index.pop_best_compatible("kidney", "O+") is None
+    assert len(index) == 0
+
+
+def test_pop_best_compatible_adds_the_blood_bonus():
+    needs = [
+        {"id": "urgent", "organ_type": "kidney", "blood_type": "AB+"},
+        {"id": "identical", "organ_type": "kidney", "blood_type": "A-"},
+    ]
+    index = WaitlistIndex(needs, priorities=[0.3, 0.2])
+    bonus = ScoringEngine().blood_bonus("A-")
+
+    need, score = index.pop_best_compatible("kidney", "A-", bonus)
+
+    assert need["id"] == "identical"
+    assert score == pytest.approx(0.4)